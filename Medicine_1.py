@@ -1,3 +1,13 @@
+from collections import namedtuple
+
+from prefix_index import PrefixIndex
+
+# Результат продажи корзины: ok — проведена ли продажа, sold — кортеж (лекарство, количество),
+# missing — ненайденные названия, short — кортеж (лекарство, запрошено, доступно),
+# invalid — позиции (название, количество) с количеством не больше нуля
+OrderResult = namedtuple('OrderResult', 'ok sold missing short invalid')
+
+
 class Medicine:
     """Класс для описания лекарства в аптеке."""
 
@@ -31,18 +41,24 @@ class Pharmacy:
     def __init__(self, name):
         self.name = name  # Название аптеки
         self.medicines = []  # Список лекарств
+        self._by_name = {}  # Индекс: название в casefold -> лекарство
+        self._prefixes = PrefixIndex()  # Индекс для поиска по началу названия
 
     def add_medicine(self, medicine):
         """Добавляет лекарство в ассортимент."""
         self.medicines.append(medicine)
+        # При совпадении названий находится первое добавленное, как и при переборе списка
+        if self._by_name.setdefault(medicine.name.casefold(), medicine) is medicine:
+            self._prefixes.add(medicine.name, medicine)
         return f"Лекарство {medicine.name} добавлено в {self.name}"
 
     def find_medicine(self, name):
-        """Ищет лекарство по названию."""
-        for med in self.medicines:
-            if med.name.lower() == name.lower():
-                return med
-        return None
+        """Ищет лекарство по названию (без учета регистра) за O(1)."""
+        return self._by_name.get(name.casefold())
+
+    def search_medicines(self, prefix, k=10):
+        """Возвращает до k лекарств, названия которых начинаются с prefix (регистр и ё/е не важны)."""
+        return self._prefixes.search(prefix, k)
 
     def sell_medicine(self, name, amount):
         """Продает лекарство, если оно есть в наличии."""
@@ -52,6 +68,38 @@ class Pharmacy:
         else:
             return f"Лекарство {name} не найдено."
 
+    def sell_many(self, order_lines):
+        """
+        Продает корзину лекарств целиком или не продает ничего.
+
+        order_lines — последовательность пар (название, количество). Сначала за один
+        проход находятся все лекарства и суммируется запрошенное количество, затем
+        проверяются остатки всей корзины, и только если всего хватает, остатки
+        уменьшаются. Позиция с количеством не больше нуля отклоняет всю корзину.
+        Возвращает OrderResult.
+        """
+        requested = {}  # лекарство -> суммарное количество по корзине
+        missing = []
+        invalid = []
+        for name, amount in order_lines:
+            if amount <= 0:
+                invalid.append((name, amount))
+                continue
+            medicine = self._by_name.get(name.casefold())
+            if medicine is None:
+                missing.append(name)
+            else:
+                requested[medicine] = requested.get(medicine, 0) + amount
+
+        short = tuple((med, amount, med.quantity)
+                      for med, amount in requested.items() if med.quantity < amount)
+        if missing or short or invalid:
+            return OrderResult(False, (), tuple(missing), short, tuple(invalid))
+
+        for med, amount in requested.items():
+            med.quantity -= amount
+        return OrderResult(True, tuple(requested.items()), (), (), ())
+
 
 if __name__ == '__main__':
     # Тестирование классов
@@ -68,7 +116,12 @@ if __name__ == '__main__':
 
     print("\nПоиск лекарств:")
     print(apteka.find_medicine("Аспирин").get_info() if apteka.find_medicine("Аспирин") else "Не найдено")
+    print([med.name for med in apteka.search_medicines("асп")])
 
     print("\nПопытка продажи:")
     print(apteka.sell_medicine("Ибупрофен", 10))
-    print(apteka.sell_medicine("Парацетамол", 5))  # Несуществующее
\ No newline at end of file
+    print(apteka.sell_medicine("Парацетамол", 5))  # Несуществующее
+
+    print("\nПродажа корзины:")
+    order = apteka.sell_many([("Аспирин", 5), ("ибупрофен", 2)])
+    print("Корзина продана" if order.ok else f"Корзина не продана: {order}")
\ No newline at end of file
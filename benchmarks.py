@@ -0,0 +1,628 @@
+"""
+Модуль benchmarks содержит замеры производительности для модулей аптеки.
+
+Запуск всех замеров:        python benchmarks.py
+Запуск отдельного замера:   python benchmarks.py find_medicine
+"""
+
+import csv
+import gc
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import threading
+import tracemalloc
+from contextlib import redirect_stdout
+
+import Medicine_1
+import pharmacy26
+import pharmacy27
+import pharmacy28
+import snapshot_codec
+from bulk_import import import_medicines
+from compact_medicine import MedicineColumns
+from log_sink import deletion_log
+from mapped_store import MappedPharmacy, save_mapped
+from metrics import Counter, metrics
+from prefix_index import PrefixIndex
+from sqlite_store import SqliteStore
+from wal_store import WalStore
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Декоратор для регистрации замера по имени функции без префикса bench_"""
+    BENCHMARKS[func.__name__[len('bench_'):]] = func
+    return func
+
+
+def in_temp_dir(func):
+    """
+    Выполняет func() во временном каталоге.
+
+    Классы pharmacy24-26 пишут журналы удаления в текущий каталог, поэтому
+    после func() собираем мусор и сбрасываем журнал, пока каталог временный.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            func()
+            gc.collect()
+            deletion_log.flush()
+        finally:
+            os.chdir(cwd)
+
+
+def make_pharmacy(size, operations=4):
+    """Создает аптеку pharmacy26 из size лекарств с operations операциями у каждого"""
+    pharmacy = pharmacy26.Pharmacy("Бенчмарк")
+    for i in range(size):
+        med = pharmacy26.Medicine(f"Лекарство-{i}", 100.0, 1000, "2030-01-01")
+        for _ in range(operations // 2):
+            med.sell(1)
+            med.restock(1)
+        pharmacy.add_medicine(med)
+    return pharmacy
+
+
+def measure(func, repeat=5):
+    """Возвращает лучшее время выполнения func() в секундах из repeat попыток"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@benchmark
+def bench_find_medicine(size=50_000, lookups=1_000):
+    """Поиск по названию: линейный перебор с lower() против словаря-индекса"""
+    pharmacy = Medicine_1.Pharmacy("Бенчмарк")
+    for i in range(size):
+        pharmacy.add_medicine(Medicine_1.Medicine(f"Лекарство-{i}", 100, 10, "2030-01-01"))
+    # Худший случай для перебора — последние добавленные названия
+    names = [f"ЛЕКАРСТВО-{size - 1 - i % 100}" for i in range(lookups)]
+
+    def scan():
+        for name in names:
+            for med in pharmacy.medicines:
+                if med.name.lower() == name.lower():
+                    break
+
+    def indexed():
+        for name in names:
+            pharmacy.find_medicine(name)
+
+    scan_time = measure(scan, repeat=1)
+    index_time = measure(indexed)
+    print(f"find_medicine, {size} лекарств, {lookups} поисков:")
+    print(f"  перебор: {scan_time / lookups * 1e6:10.1f} мкс/поиск")
+    print(f"  индекс:  {index_time / lookups * 1e6:10.3f} мкс/поиск")
+
+
+@benchmark
+def bench_sell_many(size=50_000, baskets=2_000, basket_size=20):
+    """Продажа корзин: отдельные вызовы sell_medicine против sell_many"""
+    pharmacy = Medicine_1.Pharmacy("Бенчмарк")
+    for i in range(size):
+        pharmacy.add_medicine(Medicine_1.Medicine(f"Лекарство-{i}", 100, 10 ** 9, "2030-01-01"))
+    basket = [(f"Лекарство-{i * 997 % size}", 1) for i in range(basket_size)]
+
+    def per_line():
+        for _ in range(baskets):
+            for name, amount in basket:
+                pharmacy.sell_medicine(name, amount)
+
+    def batched():
+        for _ in range(baskets):
+            pharmacy.sell_many(basket)
+
+    line_time = measure(per_line)
+    batch_time = measure(batched)
+    print(f"sell_many, корзина из {basket_size} позиций, {baskets} корзин:")
+    print(f"  по одной позиции: {line_time / baskets * 1e6:8.1f} мкс/корзина")
+    print(f"  sell_many:        {batch_time / baskets * 1e6:8.1f} мкс/корзина")
+
+
+@benchmark
+def bench_prefix_search(size=100_000, queries=10_000, k=10):
+    """Поиск первых k лекарств по началу названия в каталоге из size названий"""
+    syllables = ["ас", "пи", "рин", "ибу", "про", "фен", "ме", "ло", "кс", "ём"]
+    names = []
+    for i in range(size):
+        parts, n = [], i
+        for _ in range(6):
+            parts.append(syllables[n % 10])
+            n //= 10
+        names.append("".join(parts).capitalize() + f"-{i}")
+    index = PrefixIndex((name, name) for name in names)
+    prefixes = [names[i * 7919 % size][:3] for i in range(queries)]
+
+    def search():
+        for prefix in prefixes:
+            index.search(prefix, k)
+
+    search_time = measure(search)
+    print(f"prefix_search, {size} названий, top-{k}:")
+    print(f"  {search_time / queries * 1e6:8.2f} мкс/запрос")
+
+
+def measure_bytes(setup, build, size):
+    """
+    Возвращает число байт на объект, выделенных выражением build в отдельном процессе.
+
+    Процесс запускается во временном каталоге, чтобы журналы удаления лекарств,
+    которые пишут старые классы, не попадали в каталог проекта.
+    """
+    code = (f"import tracemalloc\n{setup}\n"
+            f"tracemalloc.start()\n"
+            f"objects = {build}\n"
+            f"print(tracemalloc.get_traced_memory()[0], flush=True)\n"
+            f"import os; os._exit(0)\n")  # без обработчиков atexit и деструкторов
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = subprocess.run([sys.executable, '-c', code], cwd=tmp, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    return int(out) / size
+
+
+@benchmark
+def bench_medicine_memory(size=100_000):
+    """Память на одно лекарство: классы pharmacy23/26 против компактных представлений"""
+    args = f"((f'Лекарство-{{i}}', 100.0, 10, '2030-01-01') for i in range({size}))"
+    cases = [
+        ("pharmacy23.Medicine", "from pharmacy23 import Medicine", f"[Medicine(*a) for a in {args}]"),
+        ("pharmacy26.Medicine", "from pharmacy26 import Medicine", f"[Medicine(*a) for a in {args}]"),
+        ("CompactMedicine", "from compact_medicine import CompactMedicine",
+         f"[CompactMedicine(*a) for a in {args}]"),
+        ("MedicineColumns", "from compact_medicine import MedicineColumns",
+         f"MedicineColumns()\nfor a in {args}: objects.append(*a)"),
+    ]
+    print(f"medicine_memory, {size} лекарств:")
+    for title, setup, build in cases:
+        print(f"  {title:20} {measure_bytes(setup, build, size):8.1f} байт/лекарство")
+
+
+@benchmark
+def bench_mapped_load(size=100_000, working_set=100):
+    """Холодный старт: загрузка pickle целиком против открытия файла с индексом"""
+    def run():
+        pharmacy = make_pharmacy(size)
+        pharmacy.save_to_file('store.pkl')
+        save_mapped(pharmacy, 'store.idx')
+        ids = [med.id for med in pharmacy.medicines[::size // working_set]]
+        del pharmacy
+
+        def load_pickle():
+            loaded = pharmacy26.Pharmacy.load_from_file('store.pkl')
+            for med in loaded.medicines[::size // working_set]:
+                med.get_transactions()[0]
+
+        def open_mapped():
+            with MappedPharmacy('store.idx') as mapped:
+                for med_id in ids:
+                    mapped.get(med_id).get_transactions()[0]
+
+        print(f"mapped_load, {size} лекарств, рабочий набор {working_set}:")
+        print(f"  pickle целиком:    {measure(load_pickle, repeat=1) * 1e3:8.1f} мс "
+              f"({os.path.getsize('store.pkl') / 2**20:.1f} МБ)")
+        print(f"  файл с индексом:   {measure(open_mapped) * 1e3:8.1f} мс "
+              f"({os.path.getsize('store.idx') / 2**20:.1f} МБ)")
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_reprice(size=200_000, factor=1.03):
+    """Переоценка ассортимента: оператор * у каждого лекарства против Pharmacy.reprice"""
+    def run():
+        pharmacy = make_pharmacy(size, operations=0)
+
+        def by_operator():
+            repriced = pharmacy26.Pharmacy(pharmacy.name)
+            for med in pharmacy.medicines:
+                repriced.add_medicine(med * factor)
+
+        print(f"reprice, {size} лекарств:")
+        print(f"  оператор *:        {measure(by_operator, repeat=1) * 1e3:8.1f} мс")
+        print(f"  Pharmacy.reprice:  {measure(lambda: pharmacy.reprice(factor, ndigits=2)) * 1e3:8.1f} мс")
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_expiry_remove(sizes=(10_000, 100_000, 400_000), removals=1_000):
+    """Удаление лекарств по одному (pharmacy - med): время одного удаления не зависит от размера аптеки"""
+    def run():
+        print(f"expiry_remove, {removals} удалений по одному:")
+        for size in sizes:
+            pharmacy = pharmacy26.Pharmacy("Бенчмарк")
+            days = [f"2030-{month:02}-{day:02}" for month in range(1, 13) for day in range(1, 29)]
+            medicines = [pharmacy26.Medicine(f"Лекарство-{i}", 100.0, 10, days[i % len(days)]) for i in range(size)]
+            pharmacy.add_many(medicines)
+            victims = random.Random(size).sample(medicines, removals)
+            gc.collect()  # сборка после создания size объектов не должна попасть в замер
+            start = time.perf_counter()
+            for med in victims:
+                pharmacy - med
+            elapsed = time.perf_counter() - start
+            print(f"  {size:7} лекарств: {elapsed / removals * 1e6:6.2f} мкс на удаление")
+            del pharmacy, medicines, victims
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_poll_views(sizes=(1_000, 10_000, 100_000), polls=100):
+    """Опрос medicines и get_transactions(): копии списков против живых представлений"""
+    def allocated(func):
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def run():
+        print(f"poll_views, пик выделенной памяти за опрос (len и первый элемент), байт:")
+        for size in sizes:
+            pharmacy = make_pharmacy(size, operations=0)
+
+            def poll_copies():
+                for _ in range(polls):
+                    medicines, history = pharmacy.medicines.snapshot(), pharmacy.get_transactions().snapshot()
+                    len(medicines), medicines[0], len(history), history[0]
+
+            def poll_views():
+                for _ in range(polls):
+                    medicines, history = pharmacy.medicines, pharmacy.get_transactions()
+                    len(medicines), medicines[0], len(history), history[0]
+
+            print(f"  {size:7} лекарств: копии {allocated(poll_copies):10}, "
+                  f"представления {allocated(poll_views):6}")
+            del pharmacy
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_bulk_import(size=1_000_000):
+    """Импорт CSV: построчное создание и добавление против bulk_import"""
+    def run():
+        with open('store.csv', 'w', encoding='utf-8') as f:
+            f.write("name,price,quantity,expiry_date\n")
+            for i in range(size):
+                f.write(f"Лекарство-{i},{100 + i % 500}.5,{i % 1000},2030-{i % 12 + 1:02}-01\n")
+            f.write("Плохое,-1,1,2030-01-01\n")
+
+        def row_by_row():
+            pharmacy = pharmacy26.Pharmacy("Построчно")
+            with open('store.csv', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        medicine = pharmacy26.Medicine(row['name'], float(row['price']),
+                                                       int(row['quantity']), row['expiry_date'])
+                    except pharmacy26.PharmacyError:
+                        continue
+                    pharmacy.add_medicine(medicine)
+
+        def bulk(make_target, factory):
+            # Хранилище удаляется после замера: деструкторы миллиона лекарств не относятся к импорту
+            targets = []
+            def run_import():
+                targets.append(make_target())
+                import_medicines('store.csv', targets[-1], factory, reject_path='rejects.jsonl')
+            return run_import
+
+        print(f"bulk_import, {size} строк CSV:")
+        print(f"  построчно в pharmacy26:     {measure(row_by_row, repeat=1):6.2f} с")
+        gc.collect()
+        print(f"  bulk_import в pharmacy26:   {measure(bulk(pharmacy26.Pharmacy, pharmacy26.Medicine), repeat=1):6.2f} с")
+        gc.collect()
+        print(f"  bulk_import в pharmacy28:   "
+              f"{measure(bulk(pharmacy28.MedicineDatabase, pharmacy28.Medicine), repeat=1):6.2f} с")
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_call_counters(calls=200_000, threads=4):
+    """Накладные расходы подсчета вызовов: print-декоратор против счетчиков metrics"""
+    def print_counter(func):
+        # Прежний call_counter_decorator
+        def wrapper(self, *args, **kwargs):
+            if not hasattr(self, '_call_counts'):
+                self._call_counts = {}
+            self._call_counts[func.__name__] = self._call_counts.get(func.__name__, 0) + 1
+            print(f"Метод {func.__name__} вызван {self._call_counts[func.__name__]} раз")
+            return func(self, *args, **kwargs)
+        return wrapper
+
+    class Plain:
+        def method(self):
+            pass
+
+    class Printed:
+        method = print_counter(Plain.method)
+
+    class Counted:
+        _call_counts = {}
+        method = pharmacy27.call_counter_decorator(Plain.method)
+
+    def per_call(obj):
+        method = obj.method
+        return measure(lambda: [method() for _ in range(calls)], repeat=3) / calls * 1e9
+
+    print(f"call_counters, нс на вызов ({calls} вызовов):")
+    print(f"  без счетчика:            {per_call(Plain()):8.0f}")
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        printed = per_call(Printed())
+    print(f"  print-декоратор:         {printed:8.0f}  (вывод в /dev/null)")
+    print(f"  metrics, включен:        {per_call(Counted()):8.0f}")
+    metrics.disable()
+    try:
+        print(f"  metrics, выключен:       {per_call(Counted()):8.0f}")
+    finally:
+        metrics.enable()
+
+    def contended(increment):
+        def work():
+            for _ in range(calls):
+                increment()
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return (time.perf_counter() - start) / (calls * threads) * 1e9
+
+    lock, total = threading.Lock(), [0]
+
+    def locked_increment():
+        with lock:
+            total[0] += 1
+
+    print(f"  {threads} потока, общий счетчик с блокировкой: {contended(locked_increment):6.0f}")
+    print(f"  {threads} потока, Counter по потокам:          {contended(Counter().inc):6.0f}")
+
+
+@benchmark
+def bench_restock_lookup(sizes=(1_000, 10_000, 100_000), lines=1_000):
+    """Пополнение pharmacy27: время строки поставки при росте каталога и числа поставщиков"""
+    print(f"restock_lookup, мкс на строку поставки ({lines} строк):")
+    metrics.disable()
+    try:
+        for size in sizes:
+            pharmacy = pharmacy27.Pharmacy("Бенчмарк")
+            for i in range(size):
+                pharmacy.add_supplier(pharmacy27.Supplier(f"Поставщик-{i}", "88000000000"))
+                pharmacy.add_medicine(pharmacy27.Medicine(f"Лекарство-{i}", 100.0, 0, "2030-01-01"))
+            supplier = pharmacy.suppliers[-1]
+            names = [f"Лекарство-{i}" for i in range(size - lines, size)]
+            for name in names:
+                supplier.add_supplied_medicine(name)
+
+            def restock():
+                for name in names:
+                    pharmacy.restock_from_supplier(supplier, name, 1)
+
+            print(f"  {size:7} лекарств и поставщиков: {measure(restock) / lines * 1e6:6.2f}")
+    finally:
+        metrics.enable()
+
+
+@benchmark
+def bench_restock_manifest(catalogue=10_000, lines=1_000):
+    """Поставка из lines строк: отдельные вызовы restock_from_supplier против restock_from_manifest"""
+    def setup():
+        pharmacy = pharmacy27.Pharmacy("Бенчмарк")
+        supplier = pharmacy27.Supplier("Поставщик", "88000000000")
+        pharmacy.add_supplier(supplier)
+        for i in range(catalogue):
+            pharmacy.add_medicine(pharmacy27.Medicine(f"Лекарство-{i}", 100.0, 0, "2030-01-01"))
+        # Половина строк — лекарства из каталога, половина — новые
+        manifest = [(f"Лекарство-{i}", 10) for i in range(catalogue - lines // 2, catalogue + lines // 2)]
+        for name, _ in manifest:
+            supplier.add_supplied_medicine(name)
+        return pharmacy, supplier, manifest
+
+    def line_by_line():
+        pharmacy, supplier, manifest = setup()
+        start = time.perf_counter()
+        for name, quantity in manifest:
+            pharmacy.restock_from_supplier(supplier, name, quantity)
+        return time.perf_counter() - start
+
+    def by_manifest():
+        pharmacy, supplier, manifest = setup()
+        start = time.perf_counter()
+        pharmacy.restock_from_manifest(supplier, manifest)
+        return time.perf_counter() - start
+
+    print(f"restock_manifest, {lines} строк, каталог {catalogue}:")
+    print(f"  по строкам:               {min(line_by_line() for _ in range(3)) * 1e3:7.2f} мс")
+    print(f"  restock_from_manifest:    {min(by_manifest() for _ in range(3)) * 1e3:7.2f} мс")
+
+
+@benchmark
+def bench_snapshot_codec(size=1_000_000):
+    """Снимок столбцов лекарств: обычный pickle против pickle 5 с внеполосными буферами и сжатием"""
+    columns = MedicineColumns()
+    for i in range(size):
+        columns.append(f'Лекарство-{i}', 100.0 + i % 500, i % 1000, '2030-01-01')
+
+    def run():
+        def case(title, save, load):
+            save_time = measure(save, repeat=1)
+            load_time = measure(load, repeat=1)
+            print(f"  {title:16} запись {save_time * 1e3:8.1f} мс, чтение {load_time * 1e3:8.1f} мс, "
+                  f"{os.path.getsize('store.snap') / 2**20:6.1f} МБ")
+
+        def pickle_save():
+            with open('store.snap', 'wb') as f:
+                pickle.dump(columns, f, protocol=4)
+
+        def pickle_load():
+            with open('store.snap', 'rb') as f:
+                pickle.load(f)
+
+        def codec_load():
+            with open('store.snap', 'rb') as f:
+                snapshot_codec.load(f)
+
+        print(f"snapshot_codec, {size} строк:")
+        case("pickle 4", pickle_save, pickle_load)
+        for compression in [None, 'zlib', 'lzma']:
+            def codec_save():
+                with open('store.snap', 'wb') as f:
+                    snapshot_codec.dump(columns, f, compression)
+            case(f"pickle 5 {compression or 'none'}", codec_save, codec_load)
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_wal_writes(size=100_000, writes=200):
+    """Одно изменение в базе pharmacy28: перезапись файла целиком против записи в журнал"""
+    medicines = {f'Лекарство-{i}': pharmacy28.Medicine(f'Лекарство-{i}', 100.0, 10, '2030-01-01')
+                 for i in range(size)}
+
+    def run():
+        def rewrite():
+            # Прежний MedicineDatabase.save() после каждого изменения
+            for i in range(writes):
+                medicines[f'Лекарство-{i}'].quantity += 1
+                with open('rewrite.pkl', 'wb') as f:
+                    snapshot_codec.dump(medicines, f)
+
+        store = WalStore('wal.pkl')
+        store.put_many(medicines.items())
+
+        def append():
+            for i in range(writes):
+                medicine = medicines[f'Лекарство-{i}']
+                medicine.quantity += 1
+                store.put(medicine.name, medicine)
+
+        print(f"Запись одного изменения, база из {size} лекарств:")
+        print(f"  перезапись файла: {measure(rewrite, repeat=1) / writes * 1e3:8.3f} мс")
+        print(f"  журнал (fsync):   {measure(append, repeat=1) / writes * 1e3:8.3f} мс")
+        store.close()
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_shared_reads(size=100_000, reads=100_000):
+    """Чтение WalStore, общего для нескольких процессов: проверка изменений и дочитывание журнала"""
+    def run():
+        writer = WalStore('shared.pkl')
+        writer.put_many((f'Лекарство-{i}', pharmacy28.Medicine(f'Лекарство-{i}', 100.0, 10, '2030-01-01'))
+                        for i in range(size))
+        writer.compact()
+        reader = WalStore('shared.pkl')
+
+        def get_many():
+            for _ in range(reads):
+                reader.get('Лекарство-1')
+
+        def changed():
+            medicine = writer.get('Лекарство-1')
+            medicine.quantity += 1
+            writer.put(medicine.name, medicine)
+            reader.get('Лекарство-1')
+
+        print(f"Общее хранилище из {size} лекарств:")
+        print(f"  get() без чужих изменений:    {measure(get_many, repeat=3) / reads * 1e6:8.2f} мкс")
+        print(f"  get() после чужой записи:     {measure(changed) * 1e3:8.3f} мс (вместе с записью)")
+        print(f"  полная загрузка:              {measure(reader.load, repeat=1) * 1e3:8.1f} мс")
+        writer.close()
+        reader.close()
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_batch_writes(writes=2000, threads=8):
+    """Записей в секунду в зависимости от размера группы batch() и числа потоков (group commit)"""
+    medicine = pharmacy28.Medicine('Аспирин', 50.0, 100, '2030-01-01')
+
+    def run():
+        store = WalStore('batch.pkl')
+
+        def batched(size, offset=0):
+            def write():
+                for start in range(0, writes, size):
+                    with store.batch():
+                        for i in range(start, min(start + size, writes)):
+                            store.put(offset + i, medicine)
+            return write
+
+        print(f"Запись {writes} изменений:")
+        for size in [1, 10, 100, 1000]:
+            print(f"  группа {size:4}:                 {writes / measure(batched(size), repeat=1):10.0f} записей/с")
+
+        def concurrent():
+            workers = [threading.Thread(target=batched(1, n * writes)) for n in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        total = writes * threads
+        print(f"  {threads} потоков без групп:      {total / measure(concurrent, repeat=1):10.0f} записей/с")
+        store.close()
+
+    in_temp_dir(run)
+
+
+@benchmark
+def bench_sqlite_store(size=200_000):
+    """Хранилища pharmacy28: WalStore (все в памяти) против SqliteStore (строки в файле)"""
+    def run():
+        print(f"Хранилище из {size} лекарств:")
+        for title, make_store in [('WalStore', lambda: WalStore('medicines.pkl')),
+                                  ('SqliteStore', lambda: SqliteStore('pharmacy.db', 'medicines'))]:
+            store = make_store()
+            store.put_many((f'Лекарство-{i}', pharmacy28.Medicine(f'Лекарство-{i}', 100.0, 10, '2030-01-01'))
+                           for i in range(size))
+            store.compact()
+            store.close()
+
+            def open_store():
+                make_store().close()
+            opened = measure(open_store, repeat=1)
+
+            tracemalloc.start()
+            store = make_store()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            medicine = store.get(f'Лекарство-{size // 2}')
+
+            def update():
+                medicine.quantity += 1
+                store.put(medicine.name, medicine)
+
+            def iterate():
+                for _ in store.values():
+                    pass
+
+            print(f"  {title:12} открытие {opened * 1e3:8.1f} мс, память {memory / 2**20:6.1f} МБ, "
+                  f"изменение {measure(update) * 1e3:6.3f} мс, перебор {measure(iterate, repeat=1):5.2f} с")
+            store.close()
+
+    in_temp_dir(run)
+
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
@@ -0,0 +1,201 @@
+"""
+Модуль bulk_import реализует потоковый импорт лекарств из CSV и JSONL.
+
+Файл читается пачками по chunk_size строк. Каждая пачка проверяется по
+столбцам: значения столбца переводятся в нужный тип одним проходом, а
+ошибки собираются по строкам и не прерывают импорт. Строки с ошибками
+дописываются в файл отказов (JSONL: номер строки, ошибки, исходные данные).
+Лекарства из всех верных строк добавляются в хранилище одним вызовом
+add_many() в конце, поэтому файл базы или история аптеки обновляются один раз.
+
+Сборщик мусора импорт не отключает: это настройка всего процесса. Программа,
+импортирующая миллионы строк, может сама вызвать gc.freeze() перед импортом.
+
+Пример:
+    result = import_medicines('store.csv', pharmacy, pharmacy26.Medicine,
+                              reject_path='store.rejects.jsonl')
+"""
+
+import csv
+import json
+import math
+from collections import namedtuple
+from itertools import islice
+from operator import itemgetter
+
+from expiry_index import expiry_ordinal
+
+# Обязательные столбцы в порядке аргументов конструктора лекарства
+COLUMNS = ('name', 'price', 'quantity', 'expiry_date')
+
+ImportResult = namedtuple('ImportResult', 'imported rejected')
+
+_BAD = object()  # значение, не прошедшее проверку
+
+
+# Чтение файла: функция f -> (итератор пар (номер строки, строка),
+#                              функция строка -> значения COLUMNS,
+#                              функция строка -> словарь для файла отказов)
+
+def _read_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, [])
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"В файле нет столбцов: {', '.join(missing)}")
+    width = len(header)
+
+    def rows():
+        # Первая строка файла — заголовок; короткие строки дополняются пустыми значениями
+        for line, row in enumerate(reader, 2):
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            yield line, row
+
+    return rows(), itemgetter(*(header.index(column) for column in COLUMNS)), \
+        lambda row: dict(zip(header, row))
+
+
+def _read_jsonl(f):
+    def rows():
+        for line, text in enumerate(f, 1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = {'raw': text.rstrip('\n')}
+            yield line, row if isinstance(row, dict) else {'raw': row}
+
+    return rows(), lambda row: tuple(row.get(column) for column in COLUMNS), lambda row: row
+
+
+_READERS = {'.csv': _read_csv, '.jsonl': _read_jsonl}
+
+
+def _to_name(value):
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return _BAD
+
+
+def _to_price(value):
+    if isinstance(value, bool):
+        return _BAD
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return _BAD
+    return price if math.isfinite(price) and price >= 0 else _BAD
+
+
+def _to_quantity(value):
+    if isinstance(value, (bool, float)):
+        return _BAD
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        return _BAD
+    return quantity if quantity >= 0 else _BAD
+
+
+class _ExpiryChecker:
+    """Проверка сроков годности с запоминанием уже проверенных дат (их в файле немного)"""
+
+    def __init__(self):
+        self._seen = {}
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return _BAD
+        result = self._seen.get(value)
+        if result is None:
+            try:
+                expiry_ordinal(value)
+                result = value
+            except ValueError:
+                result = _BAD
+            self._seen[value] = result
+        return result
+
+
+def validate_chunk(columns, check_expiry=None):
+    """
+    Проверяет пачку строк по столбцам.
+
+    Args:
+        columns: Последовательности значений столбцов в порядке COLUMNS
+        check_expiry: Проверка срока годности (по умолчанию новая _ExpiryChecker)
+
+    Returns:
+        tuple: (список верных строк — кортежей (позиция в пачке, *значения в порядке COLUMNS),
+                список отказов (позиция в пачке, ошибки))
+    """
+    checks = (_to_name, _to_price, _to_quantity, check_expiry or _ExpiryChecker())
+    checked = [list(map(check, column)) for column, check in zip(columns, checks)]
+
+    # Ошибки ищем поиском по списку, без прохода по каждой строке на Python
+    errors = {}
+    for column, values in zip(COLUMNS, checked):
+        i = -1
+        for _ in range(values.count(_BAD)):
+            i = values.index(_BAD, i + 1)
+            errors.setdefault(i, []).append(f"Недопустимое значение {column}")
+
+    valid = zip(range(len(checked[0])), *checked) if checked[0] else []
+    if errors:
+        valid = [row for row in valid if row[0] not in errors]
+    return list(valid), sorted(errors.items())
+
+
+def import_medicines(path, target, factory, reject_path=None, chunk_size=50_000):
+    """
+    Импортирует лекарства из файла CSV или JSONL.
+
+    Args:
+        path (str): Файл с расширением .csv или .jsonl и полями name, price, quantity, expiry_date
+        target: Хранилище с методом add_many() (pharmacy26.Pharmacy, pharmacy28.MedicineDatabase)
+        factory: Конструктор лекарства factory(name, price, quantity, expiry_date)
+        reject_path (str): Файл отказов в формате JSONL (None — не записывать)
+        chunk_size (int): Число строк в пачке
+
+    Returns:
+        ImportResult: Число импортированных и отклоненных строк
+
+    Raises:
+        ValueError: Если формат файла неизвестен или в CSV нет обязательных столбцов
+    """
+    extension = path[path.rfind('.'):].lower()
+    if extension not in _READERS:
+        raise ValueError(f"Неизвестный формат файла: {path}")
+
+    medicines = []
+    rejected = 0
+    check_expiry = _ExpiryChecker()
+    rejects_file = open(reject_path, 'w', encoding='utf-8') if reject_path else None
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            rows, pick, as_dict = _READERS[extension](f)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                columns = list(zip(*(pick(row) for _, row in chunk)))
+                valid, rejects = validate_chunk(columns, check_expiry)
+                for i, name, price, quantity, expiry_date in valid:
+                    try:
+                        medicines.append(factory(name, price, quantity, expiry_date))
+                    except Exception as e:
+                        # Ограничения самого класса лекарства, не известные импорту
+                        rejects.append((i, [str(e)]))
+                rejected += len(rejects)
+                if rejects_file:
+                    for i, errors in rejects:
+                        line, row = chunk[i]
+                        rejects_file.write(json.dumps({'line': line, 'errors': errors, 'row': as_dict(row)},
+                                                      ensure_ascii=False, default=str) + '\n')
+        target.add_many(medicines)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    return ImportResult(len(medicines), rejected)
@@ -0,0 +1,336 @@
+"""
+Модуль compact_medicine реализует компактные представления лекарств для больших
+каталогов:
+- CompactMedicine - лекарство с __slots__ и тем же интерфейсом, что pharmacy26.Medicine
+- MedicineColumns - колоночное хранилище: цены, количества и сроки годности
+  лежат в типизированных массивах array, а не в отдельных объектах
+"""
+
+import sys
+from array import array
+
+from expiry_index import add_watcher, expiry_ordinal, notify_watchers
+from journal import TransactionJournal, make_journal
+from pharmacy26 import InvalidMedicineError, Medicine, OperationNotAllowedError
+from snapshot_codec import ArrayPickleMixin
+
+
+def _parse_expiry(value):
+    """Проверяет срок годности и возвращает его порядковый номер дня"""
+    if not isinstance(value, str):
+        raise InvalidMedicineError("срок годности", value)
+    try:
+        return expiry_ordinal(value)
+    except ValueError:
+        raise InvalidMedicineError("срок годности", value) from None
+
+
+class CompactMedicine:
+    """
+    Лекарство без __dict__, атрибуты хранятся в __slots__.
+
+    Интерфейс совпадает с pharmacy26.Medicine (свойства с проверкой значений,
+    version, sell/restock, журнал операций, операторы), поэтому лекарство можно
+    добавить в pharmacy26.Pharmacy. В отличие от Medicine объект не регистрирует
+    обработчик atexit, а журнал операций создается только при первой операции.
+    ID выдаются тем же Medicine.id_allocator, поэтому не пересекаются с Medicine.
+    """
+
+    __slots__ = ('_id', '_name', '_price', '_quantity', '_expiry_date',
+                 '_expiry_ordinal', '_transactions', '_version', '_watchers')
+
+    def __init__(self, name="Неизвестно", price=0, quantity=0, expiry_date="2023-12-31"):
+        """
+        Инициализация лекарства.
+
+        Args:
+            name (str): Название лекарства
+            price (float): Цена за единицу
+            quantity (int): Количество на складе
+            expiry_date (str): Срок годности 'YYYY-MM-DD'
+
+        Raises:
+            InvalidMedicineError: Если цена или количество отрицательные
+                или срок годности не является датой
+        """
+        if price < 0:
+            raise InvalidMedicineError("цена", price)
+        if quantity < 0:
+            raise InvalidMedicineError("количество", quantity)
+        self._expiry_ordinal = _parse_expiry(expiry_date)
+        self._id = Medicine.id_allocator.next_id()
+        self._name = name
+        self._price = price
+        self._quantity = quantity
+        self._expiry_date = expiry_date
+        self._transactions = None
+        self._version = 0
+        self._watchers = ()
+
+    @property
+    def id(self):
+        """Уникальный идентификатор лекарства (только для чтения)"""
+        return self._id
+
+    @property
+    def name(self):
+        """Название лекарства"""
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if not isinstance(value, str):
+            raise InvalidMedicineError("название", value)
+        self._name = value
+        self._version += 1
+
+    @property
+    def price(self):
+        """Цена за единицу (должна быть положительной)"""
+        return self._price
+
+    @price.setter
+    def price(self, value):
+        if not isinstance(value, (int, float)) or value < 0:
+            raise InvalidMedicineError("цена", value)
+        self._price = value
+        self._version += 1
+
+    @property
+    def quantity(self):
+        """Количество на складе (должно быть неотрицательным)"""
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, value):
+        if not isinstance(value, int) or value < 0:
+            raise InvalidMedicineError("количество", value)
+        self._quantity = value
+        self._version += 1
+
+    @property
+    def expiry_date(self):
+        """Срок годности в формате строки 'YYYY-MM-DD'"""
+        return self._expiry_date
+
+    @expiry_date.setter
+    def expiry_date(self, value):
+        self._expiry_ordinal = _parse_expiry(value)
+        self._expiry_date = value
+        self._version += 1
+        notify_watchers(self._watchers, self, self._expiry_ordinal)
+
+    @property
+    def expiry_ordinal(self):
+        """Срок годности как порядковый номер дня"""
+        return self._expiry_ordinal
+
+    @property
+    def version(self):
+        """Номер изменения: растет при каждом изменении полей, продаже и пополнении"""
+        return self._version
+
+    def _watch_expiry(self, index):
+        """Подписывает индекс сроков годности аптеки на смену срока годности лекарства"""
+        self._watchers = add_watcher(self._watchers, index)
+
+    def __getstate__(self):
+        # Подписки аптек не сохраняются: аптека подписывается заново при загрузке
+        return {name: getattr(self, name) for name in self.__slots__ if name != '_watchers'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._watchers = ()
+        # Новые лекарства после загрузки не должны получить ID загруженных
+        Medicine.id_allocator.advance(self._id)
+
+    def __str__(self):
+        return (f"Лекарство #{self._id}: {self._name}, Цена: {self._price} руб., "
+                f"Количество: {self._quantity}, Годен до: {self._expiry_date}")
+
+    def __add__(self, amount):
+        """Оператор + пополняет запасы и возвращает self"""
+        self.restock(amount)
+        return self
+
+    def __sub__(self, amount):
+        """Оператор - продает лекарство и возвращает self"""
+        self.sell(amount)
+        return self
+
+    def __mul__(self, factor):
+        """Оператор * возвращает новое лекарство с ценой, умноженной на factor"""
+        if factor < 0:
+            raise InvalidMedicineError("множитель цены", factor)
+        return CompactMedicine(self._name, self._price * factor, self._quantity, self._expiry_date)
+
+    def __truediv__(self, divisor):
+        """Оператор / возвращает новое лекарство с ценой, деленной на divisor"""
+        if divisor <= 0:
+            raise InvalidMedicineError("делитель цены", divisor)
+        return CompactMedicine(self._name, self._price / divisor, self._quantity, self._expiry_date)
+
+    def sell(self, amount=1):
+        """
+        Продажа указанного количества лекарства.
+
+        Returns:
+            bool: True если продажа прошла успешно
+
+        Raises:
+            OperationNotAllowedError: Если недостаточно товара
+            InvalidMedicineError: Если количество отрицательное
+        """
+        if amount <= 0:
+            raise InvalidMedicineError("количество для продажи", amount)
+        if self._quantity < amount:
+            raise OperationNotAllowedError(f"Недостаточно товара (доступно: {self._quantity}, запрошено: {amount})")
+        old_quantity = self._quantity
+        self._quantity -= amount
+        self._log_transaction('Продажа', old_quantity, self._quantity, amount)
+        self._version += 1
+        return True
+
+    def restock(self, amount=1):
+        """
+        Пополнение запасов лекарства.
+
+        Raises:
+            InvalidMedicineError: Если количество отрицательное
+        """
+        if amount <= 0:
+            raise InvalidMedicineError("количество для пополнения", amount)
+        old_quantity = self._quantity
+        self._quantity += amount
+        self._log_transaction('Пополнение', old_quantity, self._quantity, amount)
+        self._version += 1
+
+    def _journal(self):
+        if self._transactions is None:
+            self._transactions = make_journal(self._id, **Medicine.journal_options)
+        return self._transactions
+
+    def _log_transaction(self, operation, old_value, new_value, amount):
+        self._journal().append(operation, old_value, new_value, amount)
+
+    def get_transactions(self):
+        """Возвращает ленивое представление журнала операций (только для чтения)"""
+        return self._journal().view()  # представление живое, поэтому журнал нужен уже сейчас
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоковое чтение истории операций по курсору (как Medicine.iter_transactions)"""
+        journal = self._transactions if self._transactions is not None else TransactionJournal()
+        return journal.iter_transactions(cursor, since, limit)
+
+    def journal_records(self, start=0):
+        """Перебирает записи журнала (время в нс, Operation, старое, новое, объем) со сквозного номера start"""
+        if self._transactions is None:
+            return iter(())
+        return (record for _, record in self._transactions.numbered_records(start))
+
+    @property
+    def journal_position(self):
+        """Сквозной номер следующей записи журнала (для journal_records)"""
+        return 0 if self._transactions is None else self._transactions.next_position
+
+    def _set_price(self, price):
+        """Записывает уже проверенную цену (для Pharmacy.reprice)"""
+        self._price = price
+        self._version += 1
+
+    def _restore(self, name, price, quantity, expiry_date, records):
+        """Восстанавливает состояние из разностного снимка и дописывает записи журнала"""
+        self._expiry_ordinal = _parse_expiry(expiry_date)
+        self._name = name
+        self._price = price
+        self._quantity = quantity
+        self._expiry_date = expiry_date
+        if records:
+            self._journal().extend(records)
+        self._version += 1
+
+
+class MedicineColumns(ArrayPickleMixin):
+    """
+    Колоночное хранилище лекарств.
+
+    Каждое поле хранится в отдельном столбце: ID, количества и сроки годности —
+    в целочисленных массивах array, цены — в массиве double, названия — в списке.
+    Строка занимает несколько десятков байт против сотен у объекта Medicine.
+    При сохранении через snapshot_codec столбцы пишутся внеполосными буферами.
+
+    Атрибуты:
+    - ids, names, prices, quantities, expiry: столбцы одинаковой длины;
+      строки добавляются только через append()/from_medicines()
+    """
+
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+        self.prices = array('d')
+        self.quantities = array('q')
+        self.expiry = array('i')  # порядковые номера дней
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, name, price, quantity, expiry_date):
+        """
+        Добавляет строку и возвращает ее номер.
+
+        Raises:
+            InvalidMedicineError: Если значения недопустимы
+        """
+        if not isinstance(name, str):
+            raise InvalidMedicineError("название", name)
+        if not isinstance(price, (int, float)) or price < 0:
+            raise InvalidMedicineError("цена", price)
+        if not isinstance(quantity, int) or quantity < 0:
+            raise InvalidMedicineError("количество", quantity)
+        ordinal = _parse_expiry(expiry_date)
+        self.ids.append(Medicine.id_allocator.next_id())
+        self.names.append(name)
+        self.prices.append(price)
+        self.quantities.append(quantity)
+        self.expiry.append(ordinal)
+        return len(self.ids) - 1
+
+    @classmethod
+    def from_medicines(cls, medicines):
+        """Создает хранилище из последовательности лекарств (новые ID не выдаются)"""
+        columns = cls()
+        for med in medicines:
+            columns.ids.append(med.id)
+            columns.names.append(med.name)
+            columns.prices.append(med.price)
+            columns.quantities.append(med.quantity)
+            columns.expiry.append(med.expiry_ordinal)
+        return columns
+
+    def row(self, index):
+        """Возвращает строку index как кортеж (id, название, цена, количество, номер дня)"""
+        return (self.ids[index], self.names[index], self.prices[index],
+                self.quantities[index], self.expiry[index])
+
+    def sell(self, index, amount=1):
+        """
+        Продажа amount единиц лекарства из строки index.
+
+        Raises:
+            OperationNotAllowedError: Если недостаточно товара
+            InvalidMedicineError: Если количество отрицательное
+        """
+        if amount <= 0:
+            raise InvalidMedicineError("количество для продажи", amount)
+        available = self.quantities[index]
+        if available < amount:
+            raise OperationNotAllowedError(f"Недостаточно товара (доступно: {available}, запрошено: {amount})")
+        self.quantities[index] = available - amount
+        return True
+
+    def nbytes(self):
+        """Приблизительный объем памяти хранилища в байтах (с учетом строк названий)"""
+        arrays = (self.ids, self.prices, self.quantities, self.expiry)
+        return (sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+                + sys.getsizeof(self.names) + sum(sys.getsizeof(n) for n in self.names))
@@ -0,0 +1,130 @@
+"""
+Модуль expiry_index реализует индекс сроков годности. Дата 'YYYY-MM-DD' один раз
+переводится в порядковый номер дня (date.toordinal), а записи раскладываются
+по дням; различные дни хранятся в отсортированном списке. Запросы «истекает
+до даты D» и «уже просрочено» выполняются двоичным поиском по дням за
+O(log d + k), добавление и удаление одного объекта — за O(1).
+
+Объект, срок годности которого может меняться, хранит кортеж слабых ссылок
+на индексы, в которых он лежит (add_watcher), и при смене срока переставляет
+себя в них (notify_watchers). Отдельный WeakSet на каждый объект не нужен:
+лекарство обычно лежит в одной-двух аптеках.
+"""
+
+import weakref
+from bisect import bisect_left, insort
+from datetime import date
+
+
+def expiry_ordinal(value):
+    """
+    Переводит срок годности в порядковый номер дня.
+
+    Args:
+        value: строка 'YYYY-MM-DD' или объект date/datetime
+
+    Raises:
+        ValueError: Если строка не является датой в формате ISO
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal()
+
+
+def add_watcher(watchers, index):
+    """Возвращает кортеж слабых ссылок watchers с добавленным index (мертвые ссылки отбрасываются)"""
+    alive = tuple(ref for ref in watchers if ref() is not None and ref() is not index)
+    return alive + (weakref.ref(index),)
+
+
+def notify_watchers(watchers, item, ordinal):
+    """Переставляет item на новый срок годности ordinal во всех живых индексах из watchers"""
+    for ref in watchers:
+        index = ref()
+        if index is not None:
+            index.move(item, ordinal)
+
+
+class ExpiryIndex:
+    """
+    Индекс объектов, упорядоченных по сроку годности.
+
+    Объекты разложены по дням: для каждого номера дня — словарь его объектов
+    в порядке добавления, плюс отсортированный список различных дней. Поэтому
+    добавление и удаление одного объекта стоят O(1) (и вставку дня в список,
+    если такого дня еще не было), а не сдвиг списка из всех объектов. Дни,
+    в которых не осталось объектов, удаляются из списка лениво — при списании.
+    """
+
+    def __init__(self):
+        self._days = []  # отсортированные номера дней, для которых есть словарь в _buckets
+        self._buckets = {}  # номер дня -> {объект: None} в порядке добавления
+        self._keys = {}  # объект -> номер дня
+
+    def __setstate__(self, state):
+        if '_entries' in state:  # снимки, сохраненные до хранения по дням
+            self.__init__()
+            self.add_many((item, ordinal) for ordinal, _, item in state['_entries'])
+        else:
+            self.__dict__.update(state)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, item, ordinal):
+        """Добавляет объект со сроком годности ordinal (номер дня)"""
+        bucket = self._buckets.get(ordinal)
+        if bucket is None:
+            bucket = self._buckets[ordinal] = {}
+            insort(self._days, ordinal)
+        bucket[item] = None
+        self._keys[item] = ordinal
+
+    def add_many(self, pairs):
+        """Добавляет пары (объект, номер дня), сортируя список дней один раз"""
+        new_days = []
+        for item, ordinal in pairs:
+            bucket = self._buckets.get(ordinal)
+            if bucket is None:
+                bucket = self._buckets[ordinal] = {}
+                new_days.append(ordinal)
+            bucket[item] = None
+            self._keys[item] = ordinal
+        if new_days:
+            self._days.extend(new_days)
+            self._days.sort()
+
+    def move(self, item, ordinal):
+        """Меняет срок годности объекта, если он есть в индексе. Возвращает True, если он был в индексе"""
+        if not self.remove(item):
+            return False
+        self.add(item, ordinal)
+        return True
+
+    def remove(self, item):
+        """Удаляет объект из индекса за O(1). Возвращает True, если он был в индексе"""
+        ordinal = self._keys.pop(item, None)
+        if ordinal is None:
+            return False
+        del self._buckets[ordinal][item]
+        return True
+
+    def remove_many(self, items):
+        """Удаляет несколько объектов. Возвращает число удаленных"""
+        return sum(map(self.remove, items))
+
+    def before(self, day):
+        """Возвращает объекты со сроком годности строго раньше day, от самых старых"""
+        end = bisect_left(self._days, expiry_ordinal(day))
+        return [item for ordinal in self._days[:end] for item in self._buckets[ordinal]]
+
+    def pop_before(self, day):
+        """Удаляет из индекса и возвращает объекты со сроком годности раньше day"""
+        end = bisect_left(self._days, expiry_ordinal(day))
+        expired = []
+        for ordinal in self._days[:end]:
+            expired.extend(self._buckets.pop(ordinal))
+        del self._days[:end]
+        for item in expired:
+            del self._keys[item]
+        return expired
@@ -0,0 +1,87 @@
+"""
+Модуль history реализует потоковое чтение истории операций по курсору.
+
+iter_transactions() у лекарств и аптек отдает пары (курсор, транзакция)
+по одной, не создавая список всей истории. Курсор — непрозрачная строка:
+передав курсор последней обработанной транзакции, можно продолжить с
+места остановки (в том числе в другом процессе). Курсор опирается на
+сквозной номер операции, который не меняется при вытеснении старых записей
+из ограниченного журнала; если записи уже вытеснены, чтение начинается
+с самой старой из оставшихся.
+"""
+
+from itertools import count
+
+_PREFIX = 'h'
+
+
+def encode_cursor(position):
+    """Возвращает курсор, указывающий на операцию со сквозным номером position"""
+    return f'{_PREFIX}{position:x}'
+
+
+def decode_cursor(cursor):
+    """
+    Возвращает сквозной номер операции по курсору (None — начало истории).
+
+    Raises:
+        ValueError: Если курсор неверный
+    """
+    if cursor is None:
+        return 0
+    if isinstance(cursor, str) and cursor.startswith(_PREFIX):
+        try:
+            position = int(cursor[len(_PREFIX):], 16)
+        except ValueError:
+            pass
+        else:
+            if position >= 0:
+                return position
+    raise ValueError(f"Неверный курсор истории: {cursor!r}")
+
+
+def iter_history(numbered, cursor=None, since=None, limit=None):
+    """
+    Потоково перебирает историю с курсора.
+
+    Args:
+        numbered: Функция start -> итератор пар (сквозной номер, словарь транзакции) с номера start
+        cursor (str): Курсор, с которого продолжить (None — с начала)
+        since (datetime): Пропускать транзакции раньше этого времени
+        limit (int): Наибольшее число транзакций (None — без ограничения)
+
+    Returns:
+        Итератор пар (курсор для продолжения после этой транзакции, транзакция)
+
+    Raises:
+        ValueError: Если курсор неверный или limit отрицательный
+    """
+    # Аргументы проверяются сразу при вызове, а не при первом next()
+    start = decode_cursor(cursor)
+    if limit is not None and limit < 0:
+        raise ValueError("Ограничение числа транзакций не может быть отрицательным")
+    return _stream(numbered(start), since, limit)
+
+
+def _stream(entries, since, limit):
+    if limit == 0:
+        return
+    sent = 0
+    for position, transaction in entries:
+        if since is not None and transaction['datetime'] < since:
+            continue
+        yield encode_cursor(position + 1), transaction
+        sent += 1
+        if sent == limit:
+            return
+
+
+def iter_list_history(items, cursor=None, since=None, limit=None):
+    """Как iter_history, для истории в виде списка, который только дополняется"""
+    def numbered(start):
+        for position in count(start):
+            if position >= len(items):
+                return
+            yield position, items[position]
+
+    return iter_history(numbered, cursor, since, limit)
@@ -0,0 +1,141 @@
+"""
+Модуль id_allocator реализует потокобезопасную выдачу уникальных идентификаторов.
+
+Если указан файл, идентификаторы резервируются блоками: процесс под файловой
+блокировкой читает из файла верхнюю границу выданных ID, записывает новую
+(граница + размер блока) и дальше выдает ID из своего блока без обращений к диску.
+Так несколько процессов получают непересекающиеся ID, а нумерация продолжается
+после перезапуска.
+"""
+
+import os
+import threading
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock_file(fd):
+    """Захватывает эксклюзивную блокировку файла (ждет, пока она освободится)"""
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(fd):
+    """Освобождает блокировку файла"""
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+# Выделители с файлом; после fork дочерний процесс не должен продолжать блок родителя
+_persistent = weakref.WeakSet()
+
+
+def _after_fork():
+    for allocator in _persistent:
+        allocator._lock = threading.Lock()
+        allocator._limit = allocator._next
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class IdAllocator:
+    """
+    Выдает уникальные возрастающие идентификаторы.
+
+    Атрибуты:
+    - path: файл с верхней границей выданных ID (None — нумерация только в памяти)
+    - block_size: сколько ID резервируется за одно обращение к файлу
+    """
+
+    def __init__(self, path=None, block_size=1000):
+        """
+        Args:
+            path (str): Файл с верхней границей выданных ID или None
+            block_size (int): Размер резервируемого блока
+        """
+        if block_size < 1:
+            raise ValueError("Размер блока должен быть положительным")
+        self.path = path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 1
+        self._limit = 1 if path else float('inf')  # первый ID за пределами блока
+        if path:
+            _persistent.add(self)
+
+    def next_id(self):
+        """Возвращает следующий уникальный ID"""
+        with self._lock:
+            if self._next >= self._limit:
+                self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    def advance(self, used_id):
+        """
+        Следит, чтобы следующие ID были больше used_id.
+
+        Вызывается для ID, выданных раньше (например, у лекарств, загруженных
+        из файла): без этого нумерация в памяти после перезапуска снова
+        начинается с 1 и совпадает с загруженными ID.
+        """
+        with self._lock:
+            if used_id < self._next:
+                return
+            if used_id < self._limit:
+                self._next = used_id + 1
+            else:
+                # ID за пределами своего блока: граница в файле должна быть не ниже него
+                self._update_high_water(lambda high_water: max(high_water, used_id))
+                self._next = self._limit  # следующий next_id() зарезервирует новый блок
+
+    def reset(self, start=1):
+        """Начинает нумерацию заново с start (для тестов и демонстраций)"""
+        with self._lock:
+            self._next = start
+            if self.path:
+                self._limit = start
+                self._update_high_water(lambda _: start - 1)
+
+    def _reserve_block(self):
+        start = None
+
+        def reserve(high_water):
+            nonlocal start
+            start = high_water + 1
+            return high_water + self.block_size
+
+        self._update_high_water(reserve)
+        self._next, self._limit = start, start + self.block_size
+
+    def _update_high_water(self, update):
+        """Под файловой блокировкой заменяет верхнюю границу на update(граница)"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock_file(fd)
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                data = os.read(fd, 64).strip()
+                high_water = update(int(data) if data else 0)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, str(high_water).encode())
+                os.fsync(fd)
+            finally:
+                _unlock_file(fd)
+        finally:
+            os.close(fd)
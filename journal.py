@@ -0,0 +1,379 @@
+"""
+Модуль journal реализует компактный журнал операций с лекарством.
+
+Вместо словаря на каждую операцию записи хранятся в типизированных массивах:
+время — int64 в наносекундах, операция — код Operation, старое и новое
+количество и объем операции — int64 (или double, если в журнал пришло дробное
+значение, например количество 2.5 в pharmacy24). Журнал может быть ограничен
+по размеру:
+- без spill_path хранятся только последние capacity записей (кольцевой буфер);
+- со spill_path заполненный буфер целиком дописывается в файл, и история
+  остается доступной, занимая в памяти не больше capacity записей.
+
+get_transactions() возвращает ленивое представление JournalView: словари
+в прежнем формате создаются только при обращении к конкретной записи.
+"""
+
+import os
+import re
+import struct
+import time
+import uuid
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from enum import IntEnum
+
+from history import iter_history
+from snapshot_codec import ArrayPickleMixin
+
+
+class Operation(IntEnum):
+    """Коды операций журнала"""
+    SALE = 0
+    RESTOCK = 1
+
+    @property
+    def label(self):
+        """Название операции, как в словарях транзакций"""
+        return _LABELS[self]
+
+    @classmethod
+    def from_label(cls, label):
+        """Возвращает код операции по ее названию"""
+        return _CODES[label]
+
+
+_LABELS = {Operation.SALE: 'Продажа', Operation.RESTOCK: 'Пополнение'}
+_CODES = {label: op for op, label in _LABELS.items()}
+
+# Запись в файле: время, код операции, старое значение, новое значение, объем
+_RECORD = struct.Struct('<qBqqq')
+# То же для журнала с дробными значениями
+_REAL_RECORD = struct.Struct('<qBddd')
+# Уникальный суффикс имени файла выгрузки (см. _fresh_spill_path)
+_UUID_SUFFIX = re.compile(r'_[0-9a-f]{32}$')
+
+
+class TransactionJournal(ArrayPickleMixin):
+    """
+    Журнал операций на типизированных массивах.
+
+    Атрибуты:
+    - capacity: наибольшее число записей в памяти (None — без ограничения)
+    - spill_path: файл для вытесненных записей (None — старые записи отбрасываются)
+    """
+
+    # Число записей, перезаписанных кольцевым буфером (по умолчанию для старых файлов)
+    _dropped = 0
+    # Значения хранятся в double (по умолчанию для старых файлов — int64)
+    _real = False
+    # Формат еще не разобранных записей _packed
+    _packed_format = _RECORD
+    # Журнал сам пишет в spill_path. У журнала, загруженного из снимка, — нет:
+    # живой журнал, с которого снят снимок, мог дописать в файл новые записи
+    _owns_spill = False
+
+    def __init__(self, capacity=None, spill_path=None):
+        """
+        Args:
+            capacity (int): Наибольшее число записей в памяти
+            spill_path (str): Файл для вытесненных из памяти записей
+
+        Raises:
+            ValueError: Если capacity не положительное или spill_path задан без capacity
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("Размер журнала должен быть положительным")
+        if spill_path is not None and capacity is None:
+            raise ValueError("Выгрузка на диск требует ограничения размера журнала")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._times = array('q')
+        self._ops = array('B')
+        self._old = array('q')
+        self._new = array('q')
+        self._amounts = array('q')
+        self._start = 0  # индекс самой старой записи кольцевого буфера
+        self._spilled = 0  # число записей в файле spill_path
+        self._packed = None  # еще не разобранные записи (см. from_packed)
+        self._owns_spill = True
+
+    @classmethod
+    def from_packed(cls, data, real=False):
+        """
+        Создает журнал из записей в формате pack_records без их разбора.
+
+        Записи разбираются при первом обращении к ним или добавлении новой записи.
+        real — записи упакованы с дробными значениями (pack_records(..., real=True)).
+        """
+        journal = cls()
+        journal._packed = data
+        if real:
+            journal._packed_format = _REAL_RECORD
+        return journal
+
+    def __getstate__(self):
+        if self._packed is not None:
+            self._unpack()
+        state = self.__dict__.copy()
+        state.pop('_owns_spill', None)
+        return state
+
+    def __len__(self):
+        if self._packed is not None:
+            return len(self._packed) // self._packed_format.size
+        return self._spilled + len(self._times)
+
+    def _unpack(self):
+        data, self._packed = self._packed, None
+        record_format = self.__dict__.pop('_packed_format', _RECORD)
+        self.extend((ns, Operation(op), old, new, amount)
+                    for ns, op, old, new, amount in record_format.iter_unpack(data))
+
+    def append(self, operation, old_value, new_value, amount):
+        """Добавляет запись; operation — Operation или название операции"""
+        if self._packed is not None:
+            self._unpack()
+        if not isinstance(operation, Operation):
+            operation = Operation.from_label(operation)
+        self._push(time.time_ns(), operation, old_value, new_value, amount)
+
+    def extend(self, records):
+        """Добавляет готовые записи (время в нс, операция, старое, новое, объем), сохраняя их время"""
+        if self._packed is not None:
+            self._unpack()
+        for ns, op, old, new, amount in records:
+            self._push(ns, op, old, new, amount)
+
+    def _push(self, now, operation, old_value, new_value, amount):
+        if not (type(old_value) is int and type(new_value) is int and type(amount) is int):
+            self._check_values(old_value, new_value, amount)
+        if self.capacity is not None and len(self._times) >= self.capacity:
+            if self.spill_path is None:
+                # Кольцевой буфер: перезаписываем самую старую запись
+                i = self._start
+                self._times[i], self._ops[i] = now, operation
+                self._old[i], self._new[i], self._amounts[i] = old_value, new_value, amount
+                self._start = (i + 1) % self.capacity
+                self._dropped += 1
+                return
+            self._spill()
+        self._times.append(now)
+        self._ops.append(operation)
+        self._old.append(old_value)
+        self._new.append(new_value)
+        self._amounts.append(amount)
+
+    def _check_values(self, *values):
+        """Проверяет значения до изменения столбцов; дробное значение переводит журнал в double"""
+        for value in values:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"Значение журнала должно быть числом: {value!r}")
+        if not self._real and not all(isinstance(value, int) for value in values):
+            self._promote()
+
+    def _promote(self):
+        """Переводит столбцы значений и файл выгрузки из int64 в double"""
+        if self._spilled:
+            self._move_spill(_REAL_RECORD)
+        self._old, self._new, self._amounts = (array('d', column) for column in (self._old, self._new, self._amounts))
+        self._real = True
+
+    def _move_spill(self, record_format):
+        """
+        Копирует записи из файла выгрузки в новый файл в формате record_format
+        и переключает на него spill_path.
+
+        Прежний файл не меняется: его читают сохраненные снимки журнала.
+        """
+        old_format = self._record_format
+        data = b''
+        if self._spilled:
+            with open(self.spill_path, 'rb') as f:
+                data = f.read(self._spilled * old_format.size)
+            if record_format is not old_format:
+                data = b''.join(record_format.pack(*row) for row in old_format.iter_unpack(data))
+        spill_path = _fresh_spill_path(self.spill_path)
+        with open(spill_path, 'wb') as f:
+            f.write(data)
+        self.spill_path = spill_path
+        self._owns_spill = True
+
+    @property
+    def _record_format(self):
+        return _REAL_RECORD if self._real else _RECORD
+
+    def record(self, index):
+        """Возвращает запись index как кортеж (время в нс, Operation, старое, новое, объем)"""
+        if self._packed is not None:
+            self._unpack()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Нет записи с таким номером")
+        if index < self._spilled:
+            record_format = self._record_format
+            with open(self.spill_path, 'rb') as f:
+                f.seek(index * record_format.size)
+                ns, op, old, new, amount = record_format.unpack(f.read(record_format.size))
+            return ns, Operation(op), old, new, amount
+        i = index - self._spilled
+        if self._start:
+            i = (self._start + i) % self.capacity
+        return (self._times[i], Operation(self._ops[i]),
+                self._old[i], self._new[i], self._amounts[i])
+
+    def records(self, start=0):
+        """Лениво перебирает записи начиная с номера start"""
+        if self._packed is not None:
+            self._unpack()
+        if start < self._spilled:
+            record_format = self._record_format
+            with open(self.spill_path, 'rb') as f:
+                f.seek(start * record_format.size)
+                for _ in range(start, self._spilled):
+                    ns, op, old, new, amount = record_format.unpack(f.read(record_format.size))
+                    yield ns, Operation(op), old, new, amount
+            start = self._spilled
+        for index in range(start, len(self)):
+            yield self.record(index)
+
+    @property
+    def next_position(self):
+        """Сквозной номер, который получит следующая запись"""
+        return self._dropped + len(self)
+
+    def numbered_records(self, position=0):
+        """
+        Перебирает пары (сквозной номер, запись) начиная со сквозного номера position.
+
+        Сквозной номер записи не меняется, когда кольцевой буфер перезаписывает
+        старые записи; уже перезаписанные номера пропускаются.
+        """
+        if self._packed is not None:
+            self._unpack()
+        dropped = self._dropped
+        start = max(position - dropped, 0)
+        return enumerate(self.records(start), start + dropped)
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоково перебирает пары (курсор, словарь транзакции), см. history.iter_history"""
+        def numbered(start):
+            for position, record in self.numbered_records(start):
+                yield position, as_transaction(record)
+
+        return iter_history(numbered, cursor, since, limit)
+
+    def view(self):
+        """Возвращает ленивое представление журнала в виде последовательности словарей"""
+        return JournalView(self)
+
+    def _spill(self):
+        """Дописывает все записи из памяти в файл одним вызовом write"""
+        rows = zip(self._times, self._ops, self._old, self._new, self._amounts)
+        record_format = self._record_format
+        data = b''.join(record_format.pack(*row) for row in rows)
+        if not self._owns_spill:
+            # Загруженный журнал продолжает историю в своем файле: в прежнем за
+            # первыми _spilled записями могут лежать более поздние записи живого журнала
+            self._move_spill(record_format)
+        # Файл только дописывается: имя уникально, а начало файла читают снимки журнала
+        with open(self.spill_path, 'ab') as f:
+            f.write(data)
+        self._spilled += len(self._times)
+        for column in (self._times, self._ops, self._old, self._new, self._amounts):
+            del column[:]
+
+
+def pack_records(records, real=False):
+    """
+    Упаковывает записи журнала в байты (по 33 байта на запись, как в файле выгрузки).
+
+    real — значения пишутся как double (нужно, если среди них есть дробные).
+    """
+    record_format = _REAL_RECORD if real else _RECORD
+    return b''.join(record_format.pack(*record) for record in records)
+
+
+def as_record(transaction):
+    """Переводит словарь транзакции прежнего формата в запись журнала"""
+    return (round(transaction['datetime'].timestamp() * 1e6) * 1000,
+            Operation.from_label(transaction['operation']),
+            transaction['old_value'], transaction['new_value'], transaction['amount'])
+
+
+def as_transaction(record):
+    """Переводит запись журнала в словарь транзакции прежнего формата"""
+    ns, op, old, new, amount = record
+    return {
+        'datetime': datetime.fromtimestamp(ns / 1e9),
+        'operation': op.label,
+        'old_value': old,
+        'new_value': new,
+        'amount': amount
+    }
+
+
+class JournalView(Sequence):
+    """Ленивое представление журнала только для чтения: словарь создается при обращении"""
+
+    __slots__ = ('_journal',)
+
+    def __init__(self, journal):
+        self._journal = journal
+
+    def __len__(self):
+        return len(self._journal)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [as_transaction(self._journal.record(i)) for i in range(*index.indices(len(self)))]
+        return as_transaction(self._journal.record(index))
+
+    def __iter__(self):
+        return map(as_transaction, self._journal.records())
+
+    def __repr__(self):
+        return f"JournalView({len(self)} записей)"
+
+    def snapshot(self):
+        """Возвращает независимую копию в виде списка словарей"""
+        return list(self)
+
+
+def make_journal(owner_id, capacity=None, spill_dir=None):
+    """
+    Создает журнал для лекарства с идентификатором owner_id.
+
+    Args:
+        capacity (int): Наибольшее число записей в памяти
+        spill_dir (str): Каталог для файлов вытесненных записей ('medicine_<id>_<uuid>.journal')
+    """
+    # uuid в имени: журнал нового лекарства с тем же ID (например, после перезапуска)
+    # не должен попасть в файл журнала, загруженного из снимка
+    spill_path = None
+    if spill_dir:
+        spill_path = _fresh_spill_path(os.path.join(spill_dir, f'medicine_{owner_id}.journal'))
+    return TransactionJournal(capacity, spill_path)
+
+
+def _fresh_spill_path(path):
+    """Возвращает новое уникальное имя файла выгрузки рядом с path ('<имя>_<uuid>.journal')"""
+    root, extension = os.path.splitext(path)
+    return f'{_UUID_SUFFIX.sub("", root)}_{uuid.uuid4().hex}{extension}'
+
+
+def journal_from_list(owner_id, transactions, **options):
+    """
+    Создает журнал из списка словарей транзакций прежнего формата
+    (лекарства из файлов, сохраненных до журнала на массивах).
+
+    Args:
+        owner_id (int): ID лекарства
+        transactions (list): Словари с ключами datetime, operation, old_value, new_value, amount
+        options: Параметры make_journal
+    """
+    journal = make_journal(owner_id, **options)
+    journal.extend(map(as_record, transactions))
+    return journal
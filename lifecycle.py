@@ -0,0 +1,55 @@
+"""
+Модуль lifecycle реализует общий реестр живых объектов для закрытия при выходе.
+
+Вместо отдельного обработчика atexit на каждый объект (который держит объект
+в памяти до завершения программы) объекты попадают в WeakSet. Удаленные объекты
+освобождаются сборщиком как обычно и сами пропадают из реестра, а при выходе
+из программы один обработчик за один проход вызывает _safe_close() у всех
+оставшихся объектов.
+"""
+
+import atexit
+import threading
+import weakref
+
+
+class LifecycleRegistry:
+    """Реестр объектов со слабыми ссылками и одним проходом закрытия при выходе"""
+
+    def __init__(self):
+        self._live = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._hooked = False
+        self.shut_down = False  # True после прохода закрытия
+
+    def __len__(self):
+        return len(self._live)
+
+    def register(self, obj):
+        """Добавляет объект; при выходе у него будет вызван _safe_close()"""
+        with self._lock:
+            self._live.add(obj)
+            if not self._hooked:
+                # Регистрируем обработчик при первом объекте, то есть после импорта
+                # log_sink: обработчики atexit идут в обратном порядке, и журнал
+                # закроется уже после нашего прохода
+                atexit.register(self.shutdown)
+                self._hooked = True
+
+    def shutdown(self):
+        """Вызывает _safe_close() у всех живых объектов и очищает реестр"""
+        with self._lock:
+            if self.shut_down:
+                return
+            self.shut_down = True
+            live = list(self._live)
+            self._live.clear()
+        for obj in live:
+            try:
+                obj._safe_close()
+            except Exception as e:
+                print(f"Ошибка при закрытии объекта {obj!r}: {e}")
+
+
+# Общий реестр лекарств и аптек
+registry = LifecycleRegistry()
@@ -0,0 +1,127 @@
+"""
+Модуль log_sink реализует буферизованную запись журналов в фоновом потоке.
+
+Записи попадают в очередь, а отдельный поток забирает их пачками и дописывает
+в файлы, открывая каждый файл один раз на пачку. Поэтому запись из деструктора
+объекта стоит одной операции put в очередь, а не открытия файла.
+При завершении интерпретатора очередь сбрасывается на диск.
+
+write() вызывается из __del__, то есть в любой момент, когда сработает сборщик
+мусора, — в том числе посреди другого write() в том же потоке. Поэтому очередь —
+queue.SimpleQueue, put которой реентерабелен и никогда не ждет, а размер
+очереди ограничен проверкой: при переполнении запись идет в файл сразу.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()  # сигнал фоновому потоку завершить работу
+
+
+class LogSink:
+    """
+    Общий приемник журнальных записей с фоновым потоком записи.
+
+    Атрибуты:
+    - batch_size: сколько записей поток записывает за один проход
+    """
+
+    def __init__(self, maxsize=10000, batch_size=1000):
+        """
+        Args:
+            maxsize (int): Размер очереди; при переполнении запись идет в файл сразу
+            batch_size (int): Наибольшее число записей в одной пачке
+        """
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        # Реентерабельная: _start может сработать из __del__ внутри _start
+        self._lock = threading.RLock()
+        self._thread = None
+        self._closed = False
+
+    def write(self, filename, message):
+        """
+        Ставит сообщение в очередь на запись в файл filename.
+
+        Строка в файле получит метку времени момента вызова.
+        """
+        record = (filename, time.time(), message)
+        if self._thread is None:
+            self._start()
+        if (self._closed or threading.current_thread() is self._thread
+                or self._queue.qsize() >= self.maxsize):
+            # После закрытия, из самого потока записи или при полной очереди пишем сразу
+            self._write_batch([record])
+        else:
+            self._queue.put(record)
+
+    def flush(self):
+        """Ждет, пока все поставленные в очередь записи окажутся в файлах"""
+        if self._thread is not None and not self._closed:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+
+    def close(self):
+        """Сбрасывает очередь и останавливает поток; дальнейшие записи идут напрямую"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        # Записи, поставленные другими потоками одновременно с закрытием
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write_batch([record for record in leftovers if isinstance(record, tuple)])
+        for record in leftovers:
+            if isinstance(record, threading.Event):  # flush, совпавший с закрытием
+                record.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='log-sink', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch([record for record in batch if isinstance(record, tuple)])
+            for record in batch:
+                if isinstance(record, threading.Event):  # ожидание flush
+                    record.set()
+            if _STOP in batch:
+                return
+
+    @staticmethod
+    def _write_batch(records):
+        by_file = {}
+        for filename, timestamp, message in records:
+            by_file.setdefault(filename, []).append(f'{datetime.fromtimestamp(timestamp)}: {message}\n')
+        for filename, lines in by_file.items():
+            try:
+                with open(filename, 'a') as f:
+                    f.write(''.join(lines))
+            except Exception as e:
+                print(f"Ошибка при записи журнала {filename}: {e}")
+
+
+# Общий журнал удалений лекарств и аптек
+deletion_log = LogSink()
+atexit.register(deletion_log.close)
@@ -0,0 +1,208 @@
+"""
+Модуль mapped_store реализует формат файла аптеки с индексом фиксированного
+размера, который открывается через mmap без полной загрузки.
+
+Устройство файла (все числа little-endian):
+- заголовок: сигнатура, число лекарств, смещения и длины названия аптеки
+  и истории операций аптеки;
+- индекс: по 33 байта на лекарство — ID, смещение и длина записи лекарства,
+  смещение и длина его журнала операций, формат журнала (1 — значения
+  double, 0 — int64; в файлах 'PHX1' этого байта нет);
+- позиции индекса, упорядоченные по ID (для поиска лекарства двоичным поиском);
+- данные: записи лекарств (pickle), журналы (формат journal.pack_records)
+  и история операций аптеки (pickle).
+
+При открытии читается только заголовок. Лекарство разбирается при первом
+обращении к нему, а его журнал — при первом обращении к истории операций,
+поэтому время запуска и занимаемая память зависят от рабочего набора,
+а не от размера файла.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+
+from journal import TransactionJournal, pack_records
+from pharmacy26 import Medicine, OperationNotAllowedError, Pharmacy
+
+MAGIC = b'PHX2'
+_HEADER = struct.Struct('<4sIQIQQ')  # сигнатура, число, название (смещ., длина), история (смещ., длина)
+_ENTRY = struct.Struct('<qQIQI?')  # ID, запись (смещ., длина), журнал (смещ., длина, double ли значения)
+# Прежняя версия формата: журналы всегда int64
+_ENTRY_FORMATS = {MAGIC: _ENTRY, b'PHX1': struct.Struct('<qQIQI')}
+_POSITION = struct.Struct('<I')
+EXTENSION = '.idx'
+
+
+def _check_extension(filename):
+    if not filename.endswith(EXTENSION):
+        raise OperationNotAllowedError(f"Расширение файла должно быть {EXTENSION}")
+
+
+def save_mapped(pharmacy, filename):
+    """
+    Сохраняет аптеку в формате с индексом.
+
+    Файл сначала записывается во временный и затем атомарно заменяет прежний.
+    При ошибке временный файл удаляется, а прежний остается как был.
+
+    Args:
+        pharmacy: Аптека (pharmacy26.Pharmacy или MappedPharmacy)
+        filename (str): Имя файла (должно оканчиваться на .idx)
+
+    Raises:
+        OperationNotAllowedError: Если расширение файла не .idx
+    """
+    _check_extension(filename)
+    medicines = pharmacy.medicines
+    count = len(medicines)
+    data_start = _HEADER.size + count * (_ENTRY.size + _POSITION.size)
+    entries = []
+    tmp = filename + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.seek(data_start)
+            for med in medicines:
+                record = pickle.dumps((med.name, med.price, med.quantity, med.expiry_date))
+                records = list(med.journal_records())
+                real = any(not isinstance(value, int) for row in records for value in row[2:])
+                journal = pack_records(records, real)
+                record_offset = f.tell()
+                f.write(record)
+                f.write(journal)
+                entries.append((med.id, record_offset, len(record), record_offset + len(record), len(journal), real))
+            name = pharmacy.name.encode()
+            name_offset = f.tell()
+            f.write(name)
+            history = pickle.dumps(list(pharmacy.get_transactions()))
+            history_offset = f.tell()
+            f.write(history)
+
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, count, name_offset, len(name), history_offset, len(history)))
+            f.write(b''.join(_ENTRY.pack(*entry) for entry in entries))
+            by_id = sorted(range(count), key=lambda i: entries[i][0])
+            f.write(b''.join(_POSITION.pack(i) for i in by_id))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        # Недописанный временный файл не оставляем; прежний файл не тронут
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class MappedPharmacy:
+    """
+    Аптека, открытая из файла с индексом без полной загрузки.
+
+    Атрибуты:
+    - name: название аптеки
+    - loaded: число уже разобранных лекарств
+
+    Методы:
+    - get(): поиск лекарства по ID двоичным поиском по индексу
+    - get_transactions(): история операций аптеки (разбирается при первом вызове)
+    - to_pharmacy(): полная загрузка в pharmacy26.Pharmacy
+    """
+
+    def __init__(self, filename):
+        """
+        Открывает файл и отображает его в память.
+
+        Args:
+            filename (str): Имя файла (должно оканчиваться на .idx)
+
+        Raises:
+            OperationNotAllowedError: Если расширение или формат файла неверные
+        """
+        _check_extension(filename)
+        with open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, name_offset, name_length, history_offset, history_length = _HEADER.unpack_from(self._map)
+        if magic not in _ENTRY_FORMATS:
+            self._map.close()
+            raise OperationNotAllowedError("Файл не является аптекой в формате с индексом")
+        self._entry = _ENTRY_FORMATS[magic]
+        self._count = count
+        self._positions_offset = _HEADER.size + count * self._entry.size
+        self._history = (history_offset, history_length)
+        self._transactions = None
+        self._cache = {}  # позиция в индексе -> Medicine
+        self.name = self._map[name_offset:name_offset + name_length].decode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Закрывает отображение файла (уже разобранные лекарства остаются доступны)"""
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def __str__(self):
+        return f"{self.name}. Лекарств в ассортименте: {self._count}"
+
+    @property
+    def loaded(self):
+        """Число уже разобранных лекарств"""
+        return len(self._cache)
+
+    def __getitem__(self, position):
+        """Возвращает лекарство по его позиции в файле, разбирая запись при первом обращении"""
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("Нет лекарства с такой позицией")
+        medicine = self._cache.get(position)
+        if medicine is None:
+            medicine_id, record_offset, record_length, journal_offset, journal_length, *real = \
+                self._entry.unpack_from(self._map, _HEADER.size + position * self._entry.size)
+            name, price, quantity, expiry_date = pickle.loads(
+                self._map[record_offset:record_offset + record_length])
+            journal = TransactionJournal.from_packed(self._map[journal_offset:journal_offset + journal_length],
+                                                     real=bool(real and real[0]))
+            medicine = Medicine._from_record(medicine_id, name, price, quantity, expiry_date, journal)
+            self._cache[position] = medicine
+        return medicine
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self[position]
+
+    @property
+    def medicines(self):
+        """Список всех лекарств (разбирает все записи)"""
+        return list(self)
+
+    def get(self, medicine_id):
+        """Возвращает лекарство с указанным ID или None, разбирая только его запись"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position = _POSITION.unpack_from(self._map, self._positions_offset + middle * _POSITION.size)[0]
+            current_id = self._entry.unpack_from(self._map, _HEADER.size + position * self._entry.size)[0]
+            if current_id == medicine_id:
+                return self[position]
+            if current_id < medicine_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get_transactions(self):
+        """Возвращает историю операций аптеки (разбирается при первом вызове)"""
+        if self._transactions is None:
+            offset, length = self._history
+            self._transactions = pickle.loads(self._map[offset:offset + length])
+        return self._transactions.copy()
+
+    def to_pharmacy(self):
+        """Загружает все лекарства и возвращает обычную аптеку pharmacy26.Pharmacy"""
+        return Pharmacy._from_parts(self.name, self.medicines, self.get_transactions())
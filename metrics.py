@@ -0,0 +1,366 @@
+"""
+Модуль metrics реализует легковесный сбор метрик времени выполнения.
+
+Таймеры меряют время через time.perf_counter_ns и складывают его
+в гистограммы с фиксированными границами корзин (степени двойки от 1 мкс),
+поэтому замер стоит одного bisect и пары сложений, а не вывода на экран.
+По гистограмме оцениваются перцентили p50/p95/p99 (с точностью до корзины).
+
+Счетчики вызовов (Counter) хранят отдельную ячейку на каждый поток:
+увеличение идет без блокировок и без соперничества потоков, а значение
+складывается из всех ячеек при чтении.
+
+Сбор включается и выключается во время работы (metrics.disable()); в
+выключенном состоянии обернутый метод только проверяет один флаг.
+Снимок всех метрик выдается по запросу: snapshot() или dump() в файл JSON,
+а также в текстовом формате Prometheus (write_prometheus()) для локального
+сборщика. Каждый процесс-обработчик пишет свой файл, merge_prometheus()
+складывает их в один.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import wraps
+
+# Верхние границы корзин в наносекундах: 1 мкс, 2 мкс, 4 мкс, ... ~17 с
+BUCKETS = tuple(1000 << k for k in range(25))
+
+
+# Все реестры; дочерний процесс после fork начинает их счет с нуля, иначе
+# при сложении файлов процессов счет родителя до fork учитывался бы дважды
+_registries = weakref.WeakSet()
+
+
+def _after_fork():
+    for registry in _registries:
+        registry._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами"""
+
+    def __init__(self, bounds=BUCKETS):
+        """
+        Args:
+            bounds: Возрастающие верхние границы корзин (нс); последняя корзина — без границы
+        """
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._sum = 0
+        self._max = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Добавляет одно измерение (нс)"""
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def percentile(self, q):
+        """
+        Оценка перцентиля q (от 0 до 100): верхняя граница корзины, в которую он попадает.
+
+        Returns:
+            int: Значение в нс (0, если измерений нет)
+        """
+        with self._lock:
+            counts, total, largest = list(self._counts), self._count, self._max
+        if not total:
+            return 0
+        rank = max(1, -(-total * q // 100))  # номер измерения, округление вверх
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[i], largest) if i < len(self.bounds) else largest
+        return largest
+
+    def snapshot(self):
+        """Возвращает словарь: число, сумма, максимум, p50/p95/p99 и счетчики корзин"""
+        with self._lock:
+            counts, total, summed, largest = list(self._counts), self._count, self._sum, self._max
+        return {
+            'count': total,
+            'sum_ns': summed,
+            'max_ns': largest,
+            'p50_ns': self.percentile(50),
+            'p95_ns': self.percentile(95),
+            'p99_ns': self.percentile(99),
+            'buckets': dict(zip([*self.bounds, 'inf'], counts)),
+        }
+
+    def reset(self):
+        """Обнуляет гистограмму"""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._count = self._sum = self._max = 0
+
+
+class Counter:
+    """
+    Счетчик с отдельной ячейкой на каждый поток.
+
+    Поток увеличивает только свою ячейку, поэтому inc() не берет блокировку
+    и не теряет увеличения при одновременных вызовах из разных потоков.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []  # ячейки всех потоков, в том числе завершившихся
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Увеличивает счетчик на amount"""
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            cell = [amount]
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+
+    @property
+    def value(self):
+        """Сумма по всем потокам"""
+        with self._lock:
+            cells = list(self._cells)
+        return sum(cell[0] for cell in cells)
+
+    def reset(self):
+        """Обнуляет счетчик во всех потоках"""
+        with self._lock:
+            for cell in self._cells:
+                cell[0] = 0
+
+
+class MetricsRegistry:
+    """
+    Реестр именованных метрик.
+
+    Атрибуты:
+    - enabled: идет ли сбор (переключается enable()/disable())
+
+    Методы:
+    - histogram(): гистограмма по имени (создается при первом обращении)
+    - counter(): счетчик по имени (создается при первом обращении)
+    - timed(): декоратор замера времени выполнения функции
+    - counted(): декоратор подсчета вызовов функции
+    - snapshot(): снимок всех метрик
+    - dump(): запись снимка в файл JSON
+    - write_prometheus(): запись снимка в текстовом формате Prometheus
+    """
+
+    def __init__(self, enabled=True, namespace='pharmacy'):
+        """
+        Args:
+            enabled (bool): Включен ли сбор
+            namespace (str): Префикс имен метрик в формате Prometheus
+        """
+        self.enabled = enabled
+        self.namespace = namespace
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        _registries.add(self)
+
+    def enable(self):
+        """Включает сбор метрик"""
+        self.enabled = True
+
+    def disable(self):
+        """Выключает сбор метрик: обернутые функции только проверяют флаг"""
+        self.enabled = False
+
+    def histogram(self, name):
+        """Возвращает гистограмму с именем name, создавая ее при первом обращении"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def counter(self, name):
+        """Возвращает счетчик с именем name, создавая его при первом обращении"""
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        return counter
+
+    def counted(self, name=None):
+        """
+        Декоратор подсчета вызовов.
+
+        Args:
+            name (str): Имя счетчика (по умолчанию полное имя функции)
+        """
+        def decorator(func):
+            counter = self.counter(name or func.__qualname__)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.enabled:
+                    counter.inc()
+                return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed(self, name=None):
+        """
+        Декоратор замера времени выполнения.
+
+        Args:
+            name (str): Имя метрики (по умолчанию полное имя функции, например 'Pharmacy.add_medicine')
+        """
+        def decorator(func):
+            histogram = self.histogram(name or func.__qualname__)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter_ns() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Возвращает словарь имя -> снимок гистограммы (и 'calls' — число вызовов по счетчику)"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        result = {name: histogram.snapshot() for name, histogram in histograms.items()}
+        for name, counter in counters.items():
+            result.setdefault(name, {})['calls'] = counter.value
+        return dict(sorted(result.items()))
+
+    def prometheus_text(self):
+        """
+        Возвращает все метрики в текстовом формате Prometheus.
+
+        Счетчики — <namespace>_calls_total{method="..."}, гистограммы —
+        <namespace>_call_duration_seconds (корзины, сумма и число).
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        calls = f'{self.namespace}_calls_total'
+        duration = f'{self.namespace}_call_duration_seconds'
+        lines = [f'# HELP {calls} Число вызовов метода', f'# TYPE {calls} counter']
+        for name, counter in counters:
+            lines.append(f'{calls}{{method="{_escape(name)}"}} {counter.value}')
+        lines += [f'# HELP {duration} Время выполнения метода', f'# TYPE {duration} histogram']
+        for name, histogram in histograms:
+            snapshot = histogram.snapshot()
+            label = f'method="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in snapshot['buckets'].items():
+                cumulative += count
+                le = '+Inf' if bound == 'inf' else repr(bound / 1e9)
+                lines.append(f'{duration}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f'{duration}_sum{{{label}}} {snapshot["sum_ns"] / 1e9!r}')
+            lines.append(f'{duration}_count{{{label}}} {snapshot["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, filename):
+        """
+        Записывает метрики в файл формата Prometheus.
+
+        Файл заменяется атомарно, поэтому сборщик не прочитает его наполовину записанным.
+        """
+        _write_atomic(filename, self.prometheus_text())
+
+    def dump(self, filename):
+        """Записывает снимок всех метрик в файл JSON"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        """Обнуляет все метрики"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+        for counter in list(self._counters.values()):
+            counter.reset()
+
+    def _after_fork(self):
+        # Блокировки могли быть захвачены потоками родителя, которых в дочернем процессе нет
+        self._lock = threading.Lock()
+        for metric in [*self._histograms.values(), *self._counters.values()]:
+            metric._lock = threading.Lock()
+        self.reset()
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(filename, text):
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, filename)
+
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*(?:\{.*\})?) (\S+)$')
+
+
+def merge_prometheus(sources, filename):
+    """
+    Складывает файлы Prometheus нескольких процессов в один.
+
+    Значения одинаковых рядов (имя и метки) суммируются; это верно для
+    счетчиков и гистограмм, которые пишет MetricsRegistry.
+
+    Args:
+        sources: Имена файлов процессов
+        filename (str): Итоговый файл (заменяется атомарно)
+    """
+    families = {}  # метрика -> (строки # HELP/# TYPE, ряд -> сумма)
+    family = None
+    for source in sources:
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if line.startswith('# HELP ') or line.startswith('# TYPE '):
+                    family = line.split()[2]
+                    comments, _ = families.setdefault(family, ([], {}))
+                    if line not in comments:
+                        comments.append(line)
+                    continue
+                match = _SAMPLE.match(line)
+                if match:
+                    series, value = match.groups()
+                    totals = families.setdefault(family, ([], {}))[1]
+                    totals[series] = totals.get(series, 0) + float(value)
+    lines = []
+    for comments, totals in families.values():
+        lines += comments
+        lines += [f'{series} {_format(value)}' for series, value in totals.items()]
+    _write_atomic(filename, '\n'.join(lines) + '\n')
+
+
+def _format(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# Общий реестр метрик
+metrics = MetricsRegistry()
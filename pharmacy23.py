@@ -2,15 +2,18 @@ import pickle
 from datetime import datetime
 import builtins  # Импортируем модуль builtins для безопасного доступа к open
 
+from id_allocator import IdAllocator
+
 
 class Medicine:
     """Класс для описания лекарства в аптеке."""
 
-    _next_id = 1
+    # Выдает уникальные ID, в том числе из нескольких потоков. Для нумерации,
+    # сквозной между процессами и перезапусками: IdAllocator('medicine_ids.hwm')
+    id_allocator = IdAllocator()
 
     def __init__(self, name="Неизвестно", price=0, quantity=0, expiry_date="2023-12-31"):
-        self.id = Medicine._next_id
-        Medicine._next_id += 1
+        self.id = Medicine.id_allocator.next_id()
         self.name = name
         self.price = price
         self.quantity = quantity
@@ -60,6 +63,8 @@ class Medicine:
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        # Новые лекарства после загрузки не должны получить ID загруженных
+        Medicine.id_allocator.advance(self.id)
 
 
 class Pharmacy:
@@ -1,35 +1,43 @@
-import pickle
 from datetime import datetime
 import builtins
-import atexit
+
+from id_allocator import IdAllocator
+from history import iter_list_history
+from journal import TransactionJournal, journal_from_list, make_journal
+from lifecycle import registry
+from log_sink import deletion_log
+import snapshot_codec
 
 
 class Medicine:
     """Класс для описания лекарства в аптеке."""
 
-    _next_id = 1
+    # Выдает уникальные ID, в том числе из нескольких потоков. Для нумерации,
+    # сквозной между процессами и перезапусками: IdAllocator('medicine_ids.hwm')
+    id_allocator = IdAllocator()
+    # Параметры журнала операций, например {'capacity': 10000, 'spill_dir': 'journals'}
+    journal_options = {}
 
     def __init__(self, name="Неизвестно", price=0, quantity=0, expiry_date="2023-12-31"):
-        self.id = Medicine._next_id
-        Medicine._next_id += 1
+        self.id = Medicine.id_allocator.next_id()
         self.name = name
         self.price = price
         self.quantity = quantity
         self.expiry_date = expiry_date
-        self.transactions = []
-        atexit.register(self._safe_close)
+        self.transactions = None  # журнал создается при первой операции
+        registry.register(self)
 
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('medicine_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалено лекарство {self.name} (ID: {self.id})\n')
-                f.flush()  # Принудительно записываем в файл
+            # Запись уходит в очередь общего журнала, файл дописывает фоновый поток
+            deletion_log.write('medicine_deleted.log', f'Удалено лекарство {self.name} (ID: {self.id})')
         except Exception as e:
             print(f"Ошибка при записи лога лекарства: {e}")
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return (f"Лекарство #{self.id}: {self.name}, Цена: {self.price} руб., "
@@ -48,25 +56,32 @@ class Medicine:
         self.quantity += amount
         self._log_transaction('Пополнение', old_quantity, self.quantity, amount)
 
+    def _journal(self):
+        if self.transactions is None:
+            self.transactions = make_journal(self.id, **Medicine.journal_options)
+        return self.transactions
+
     def _log_transaction(self, operation, old_value, new_value, amount):
-        transaction = {
-            'datetime': datetime.now(),
-            'operation': operation,
-            'old_value': old_value,
-            'new_value': new_value,
-            'amount': amount
-        }
-        self.transactions.append(transaction)
+        self._journal().append(operation, old_value, new_value, amount)
 
     def get_transactions(self):
-        return self.transactions
+        return self._journal().view()
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоковое чтение истории: пары (курсор, транзакция) с курсора, не раньше since, не больше limit."""
+        journal = TransactionJournal() if self.transactions is None else self.transactions
+        return journal.iter_transactions(cursor, since, limit)
 
     def __getstate__(self):
         state = self.__dict__.copy()
         return state
 
     def __setstate__(self, state):
+        if isinstance(state.get('transactions'), list):  # файлы, сохраненные до журнала на массивах
+            state['transactions'] = journal_from_list(state['id'], state['transactions'], **Medicine.journal_options)
         self.__dict__.update(state)
+        # Новые лекарства после загрузки не должны получить ID загруженных
+        Medicine.id_allocator.advance(self.id)
 
 
 class Pharmacy:
@@ -76,18 +91,18 @@ class Pharmacy:
         self.name = name
         self.medicines = []
         self.transactions = []
-        atexit.register(self._safe_close)
+        registry.register(self)
 
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('pharmacy_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалена аптека {self.name}\n')
+            deletion_log.write('pharmacy_deleted.log', f'Удалена аптека {self.name}')
         except:
             pass
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return f"{self.name}. Лекарств в ассортименте: {len(self.medicines)}"
@@ -108,16 +123,20 @@ class Pharmacy:
     def get_transactions(self):
         return self.transactions
 
-    def save_to_file(self, filename):
-        """Сериализация объекта в файл."""
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоковое чтение истории: пары (курсор, транзакция) с курсора, не раньше since, не больше limit."""
+        return iter_list_history(self.transactions, cursor, since, limit)
+
+    def save_to_file(self, filename, compression=None):
+        """Сериализация объекта в файл (pickle 5, сжатие: None, 'zlib', 'lzma', 'bz2')."""
         with builtins.open(filename, 'wb') as f:
-            pickle.dump(self, f)
+            snapshot_codec.dump(self, f, compression)
 
     @classmethod
     def load_from_file(cls, filename):
         """Десериализация объекта из файла."""
         with builtins.open(filename, 'rb') as f:
-            return pickle.load(f)
+            return snapshot_codec.load(f)
 
 
 if __name__ == '__main__':
@@ -1,7 +1,13 @@
-import pickle
 from datetime import datetime
 import builtins
-import atexit
+
+from id_allocator import IdAllocator
+from history import iter_list_history
+from journal import TransactionJournal, journal_from_list, make_journal
+from lifecycle import registry
+from log_sink import deletion_log
+import snapshot_codec
+from views import ListView
 
 
 class PharmacyError(Exception):
@@ -28,17 +34,20 @@ class OperationNotAllowedError(PharmacyError):
 class Medicine:
     """Класс для описания лекарства в аптеке."""
 
-    __next_id = 1
+    # Выдает уникальные ID, в том числе из нескольких потоков. Для нумерации,
+    # сквозной между процессами и перезапусками: IdAllocator('medicine_ids.hwm')
+    id_allocator = IdAllocator()
+    # Параметры журнала операций, например {'capacity': 10000, 'spill_dir': 'journals'}
+    journal_options = {}
 
     def __init__(self, name="Неизвестно", price=0, quantity=0, expiry_date="2023-12-31"):
-        self.__id = Medicine.__next_id
-        Medicine.__next_id += 1
+        self.__id = Medicine.id_allocator.next_id()
         self.__name = name
         self.__price = price
         self.__quantity = quantity
         self.__expiry_date = expiry_date
-        self.__transactions = []
-        atexit.register(self._safe_close)
+        self.__transactions = None  # журнал создается при первой операции
+        registry.register(self)
 
         # Валидация при создании
         if price < 0:
@@ -90,17 +99,25 @@ class Medicine:
             raise InvalidMedicineError("срок годности", value)
         self.__expiry_date = value
 
+    def __setstate__(self, state):
+        if isinstance(state.get('_Medicine__transactions'), list):  # файлы, сохраненные до журнала на массивах
+            state['_Medicine__transactions'] = journal_from_list(
+                state['_Medicine__id'], state['_Medicine__transactions'], **Medicine.journal_options)
+        self.__dict__.update(state)
+        # Новые лекарства после загрузки не должны получить ID загруженных
+        Medicine.id_allocator.advance(self.__id)
+
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('medicine_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалено лекарство {self.__name} (ID: {self.__id})\n')
-                f.flush()
+            # Запись уходит в очередь общего журнала, файл дописывает фоновый поток
+            deletion_log.write('medicine_deleted.log', f'Удалено лекарство {self.__name} (ID: {self.__id})')
         except Exception as e:
             print(f"Ошибка при записи лога лекарства: {e}")
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return (f"Лекарство #{self.__id}: {self.__name}, Цена: {self.__price} руб., "
@@ -126,18 +143,21 @@ class Medicine:
         self.__quantity += amount
         self.__log_transaction('Пополнение', old_quantity, self.__quantity, amount)
 
+    def __journal(self):
+        if self.__transactions is None:
+            self.__transactions = make_journal(self.__id, **Medicine.journal_options)
+        return self.__transactions
+
     def __log_transaction(self, operation, old_value, new_value, amount):
-        transaction = {
-            'datetime': datetime.now(),
-            'operation': operation,
-            'old_value': old_value,
-            'new_value': new_value,
-            'amount': amount
-        }
-        self.__transactions.append(transaction)
+        self.__journal().append(operation, old_value, new_value, amount)
 
     def get_transactions(self):
-        return self.__transactions.copy()
+        return self.__journal().view()
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоковое чтение истории: пары (курсор, транзакция) с курсора, не раньше since, не больше limit."""
+        journal = TransactionJournal() if self.__transactions is None else self.__transactions
+        return journal.iter_transactions(cursor, since, limit)
 
 
 class Pharmacy:
@@ -147,7 +167,7 @@ class Pharmacy:
         self.__name = name
         self.__medicines = []
         self.__transactions = []
-        atexit.register(self._safe_close)
+        registry.register(self)
 
     @property
     def name(self):
@@ -161,19 +181,18 @@ class Pharmacy:
 
     @property
     def medicines(self):
-        return self.__medicines.copy()
+        return ListView(self.__medicines)
 
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('pharmacy_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалена аптека {self.__name}\n')
-                f.flush()
+            deletion_log.write('pharmacy_deleted.log', f'Удалена аптека {self.__name}')
         except Exception as e:
             print(f"Ошибка при записи лога аптеки: {e}")
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return f"{self.__name}. Лекарств в ассортименте: {len(self.__medicines)}"
@@ -195,15 +214,19 @@ class Pharmacy:
         self.__transactions.append(transaction)
 
     def get_transactions(self):
-        return self.__transactions.copy()
+        return ListView(self.__transactions)
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """Потоковое чтение истории: пары (курсор, транзакция) с курсора, не раньше since, не больше limit."""
+        return iter_list_history(self.__transactions, cursor, since, limit)
 
-    def save_to_file(self, filename):
-        """Сериализация объекта в файл."""
+    def save_to_file(self, filename, compression=None):
+        """Сериализация объекта в файл (pickle 5, сжатие: None, 'zlib', 'lzma', 'bz2')."""
         if not filename.endswith('.pkl'):
             raise OperationNotAllowedError("Расширение файла должно быть .pkl")
 
         with builtins.open(filename, 'wb') as f:
-            pickle.dump(self, f)
+            snapshot_codec.dump(self, f, compression)
 
     @classmethod
     def load_from_file(cls, filename):
@@ -212,4 +235,4 @@ class Pharmacy:
             raise OperationNotAllowedError("Расширение файла должно быть .pkl")
 
         with builtins.open(filename, 'rb') as f:
-            return pickle.load(f)
\ No newline at end of file
+            return snapshot_codec.load(f)
\ No newline at end of file
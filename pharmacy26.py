@@ -4,10 +4,40 @@
 - Pharmacy - класс для управления ассортиментом аптеки
 """
 
+import io
+import operator
+import os
 import pickle
-from datetime import datetime
+import struct
+import uuid
+import zlib
+from datetime import date, datetime
 import builtins
-import atexit
+
+from expiry_index import ExpiryIndex, add_watcher, expiry_ordinal, notify_watchers
+from id_allocator import IdAllocator
+from history import iter_list_history
+from journal import TransactionJournal, journal_from_list, make_journal
+from lifecycle import registry
+from log_sink import deletion_log
+import snapshot_codec
+from views import ListView, ValuesView
+
+
+_medicine_id = operator.attrgetter('id')
+
+# Файл разностных снимков: заголовок, затем снимки в рамках (длина, CRC32) + pickle снимка
+_DELTA_MAGIC = b'PHDELTA1'
+_DELTA_FRAME = struct.Struct('<II')
+
+# Что аптека использует у лекарства, кроме Medicine (например, compact_medicine.CompactMedicine)
+_MEDICINE_API = ('id', 'name', 'price', 'expiry_date', 'expiry_ordinal', 'version', 'journal_records',
+                 'journal_position', '_watch_expiry', '_restore', '_set_price')
+
+
+def _is_medicine(obj):
+    """Проверяет, что объект — Medicine или лекарство с тем же интерфейсом"""
+    return isinstance(obj, Medicine) or all(hasattr(type(obj), attr) for attr in _MEDICINE_API)
 
 
 class PharmacyError(Exception):
@@ -40,15 +70,25 @@ class Medicine:
     - name: название лекарства
     - price: цена за единицу (должна быть положительной)
     - quantity: количество на складе (должно быть неотрицательным)
-    - expiry_date: срок годности в формате строки
+    - expiry_date: срок годности в формате строки 'YYYY-MM-DD'
+    - expiry_ordinal: срок годности как порядковый номер дня (только для чтения)
 
     Методы:
     - sell(): продажа указанного количества лекарства
     - restock(): пополнение запасов лекарства
     - get_transactions(): получение истории операций
+    - iter_transactions(): потоковое чтение истории по курсору
     """
 
-    __next_id = 1
+    # Выдает уникальные ID, в том числе из нескольких потоков. Для нумерации,
+    # сквозной между процессами и перезапусками: IdAllocator('medicine_ids.hwm')
+    id_allocator = IdAllocator()
+    # Параметры журнала операций, например {'capacity': 10000, 'spill_dir': 'journals'}
+    journal_options = {}
+    # Номер изменения по умолчанию (для лекарств из старых файлов)
+    __version = 0
+    # Индексы сроков годности аптек с этим лекарством (в файл не пишутся)
+    __expiry_watchers = ()
 
     def __init__(self, name="Неизвестно", price=0, quantity=0, expiry_date="2023-12-31"):
         """
@@ -62,15 +102,16 @@ class Medicine:
 
         Raises:
             InvalidMedicineError: Если цена или количество отрицательные
+                или срок годности не является датой
         """
-        self.__id = Medicine.__next_id
-        Medicine.__next_id += 1
+        self.__id = Medicine.id_allocator.next_id()
         self.__name = name
         self.__price = price
         self.__quantity = quantity
         self.__expiry_date = expiry_date
-        self.__transactions = []
-        atexit.register(self._safe_close)
+        self.__expiry_ordinal = Medicine.__parse_expiry(expiry_date)
+        self.__transactions = None  # журнал создается при первой операции
+        registry.register(self)
 
         if price < 0:
             raise InvalidMedicineError("цена", price)
@@ -92,6 +133,7 @@ class Medicine:
         if not isinstance(value, str):
             raise InvalidMedicineError("название", value)
         self.__name = value
+        self.__version += 1
 
     @property
     def price(self):
@@ -103,6 +145,7 @@ class Medicine:
         if not isinstance(value, (int, float)) or value < 0:
             raise InvalidMedicineError("цена", value)
         self.__price = value
+        self.__version += 1
 
     @property
     def quantity(self):
@@ -114,29 +157,70 @@ class Medicine:
         if not isinstance(value, int) or value < 0:
             raise InvalidMedicineError("количество", value)
         self.__quantity = value
+        self.__version += 1
 
     @property
     def expiry_date(self):
-        """Срок годности в формате строки"""
+        """Срок годности в формате строки 'YYYY-MM-DD'"""
         return self.__expiry_date
 
     @expiry_date.setter
     def expiry_date(self, value):
+        self.__expiry_ordinal = Medicine.__parse_expiry(value)
+        self.__expiry_date = value
+        self.__version += 1
+        notify_watchers(self.__expiry_watchers, self, self.__expiry_ordinal)
+
+    @property
+    def expiry_ordinal(self):
+        """Срок годности как порядковый номер дня (date.toordinal), вычисляется один раз"""
+        return self.__expiry_ordinal
+
+    @property
+    def version(self):
+        """Номер изменения: растет при каждом изменении полей, продаже и пополнении"""
+        return self.__version
+
+    @staticmethod
+    def __parse_expiry(value):
         if not isinstance(value, str):
             raise InvalidMedicineError("срок годности", value)
-        self.__expiry_date = value
+        try:
+            return expiry_ordinal(value)
+        except ValueError:
+            raise InvalidMedicineError("срок годности", value) from None
+
+    def _watch_expiry(self, index):
+        """Подписывает индекс сроков годности аптеки на смену срока годности лекарства"""
+        self.__expiry_watchers = add_watcher(self.__expiry_watchers, index)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_Medicine__expiry_watchers', None)
+        return state
+
+    def __setstate__(self, state):
+        # Файлы, сохраненные до журнала на массивах и кэша срока годности
+        if isinstance(state.get('_Medicine__transactions'), list):
+            state['_Medicine__transactions'] = journal_from_list(
+                state['_Medicine__id'], state['_Medicine__transactions'], **Medicine.journal_options)
+        if '_Medicine__expiry_ordinal' not in state:
+            state['_Medicine__expiry_ordinal'] = Medicine.__parse_expiry(state['_Medicine__expiry_date'])
+        self.__dict__.update(state)
+        # Новые лекарства после загрузки не должны получить ID загруженных
+        Medicine.id_allocator.advance(self.__id)
 
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('medicine_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалено лекарство {self.__name} (ID: {self.__id})\n')
-                f.flush()
+            # Запись уходит в очередь общего журнала, файл дописывает фоновый поток
+            deletion_log.write('medicine_deleted.log', f'Удалено лекарство {self.__name} (ID: {self.__id})')
         except Exception as e:
             print(f"Ошибка при записи лога лекарства: {e}")
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return (f"Лекарство #{self.__id}: {self.__name}, Цена: {self.__price} руб., "
@@ -234,6 +318,7 @@ class Medicine:
         old_quantity = self.__quantity
         self.__quantity -= amount
         self.__log_transaction('Продажа', old_quantity, self.__quantity, amount)
+        self.__version += 1
         return True
 
     def restock(self, amount=1):
@@ -252,20 +337,87 @@ class Medicine:
         old_quantity = self.__quantity
         self.__quantity += amount
         self.__log_transaction('Пополнение', old_quantity, self.__quantity, amount)
+        self.__version += 1
+
+    def __journal(self):
+        if self.__transactions is None:
+            self.__transactions = make_journal(self.__id, **Medicine.journal_options)
+        return self.__transactions
 
     def __log_transaction(self, operation, old_value, new_value, amount):
-        transaction = {
-            'datetime': datetime.now(),
-            'operation': operation,
-            'old_value': old_value,
-            'new_value': new_value,
-            'amount': amount
-        }
-        self.__transactions.append(transaction)
+        self.__journal().append(operation, old_value, new_value, amount)
 
     def get_transactions(self):
-        """Возвращает копию списка транзакций"""
-        return self.__transactions.copy()
+        """Возвращает ленивое представление журнала операций (только для чтения)"""
+        return self.__journal().view()  # представление живое, поэтому журнал нужен уже сейчас
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """
+        Потоковое чтение истории операций по курсору.
+
+        Args:
+            cursor (str): Курсор из предыдущего чтения (None — с начала истории)
+            since (datetime): Пропускать операции раньше этого времени
+            limit (int): Наибольшее число операций (None — без ограничения)
+
+        Returns:
+            Итератор пар (курсор для продолжения после операции, словарь операции)
+
+        Raises:
+            ValueError: Если курсор неверный или limit отрицательный
+        """
+        journal = TransactionJournal() if self.__transactions is None else self.__transactions
+        return journal.iter_transactions(cursor, since, limit)
+
+    def journal_records(self, start=0):
+        """
+        Перебирает записи журнала (время в нс, Operation, старое, новое, объем)
+        со сквозного номера start. Сквозные номера не сдвигаются, когда журнал
+        с ограниченным размером отбрасывает старые записи.
+        """
+        if self.__transactions is None:
+            return iter(())
+        return (record for _, record in self.__transactions.numbered_records(start))
+
+    @property
+    def journal_position(self):
+        """Сквозной номер следующей записи журнала (для journal_records)"""
+        return 0 if self.__transactions is None else self.__transactions.next_position
+
+    @classmethod
+    def _from_record(cls, medicine_id, name, price, quantity, expiry_date, journal):
+        """Создает лекарство из сохраненной записи с прежним ID, без новой регистрации"""
+        medicine = cls.__new__(cls)
+        medicine.__id = medicine_id
+        Medicine.id_allocator.advance(medicine_id)
+        medicine.__name = name
+        medicine.__price = price
+        medicine.__quantity = quantity
+        medicine.__expiry_date = expiry_date
+        medicine.__expiry_ordinal = Medicine.__parse_expiry(expiry_date)
+        medicine.__transactions = journal
+        return medicine
+
+    @staticmethod
+    def _set_prices(medicines, prices):
+        """Записывает уже проверенные цены лекарствам без проверки каждой (для переоценки)"""
+        for medicine, price in zip(medicines, prices):
+            if isinstance(medicine, Medicine):
+                medicine.__price = price
+                medicine.__version += 1
+            else:
+                medicine._set_price(price)
+
+    def _restore(self, name, price, quantity, expiry_date, records):
+        """Восстанавливает состояние из разностного снимка и дописывает записи журнала"""
+        self.__name = name
+        self.__price = price
+        self.__quantity = quantity
+        self.__expiry_date = expiry_date
+        self.__expiry_ordinal = Medicine.__parse_expiry(expiry_date)
+        if records:
+            self.__journal().extend(records)
+        self.__version += 1
 
 
 class Pharmacy:
@@ -274,14 +426,27 @@ class Pharmacy:
 
     Атрибуты:
     - name: название аптеки
-    - medicines: список лекарств (только для чтения)
+    - medicines: живое представление лекарств только для чтения
 
     Методы:
     - add_medicine(): добавление лекарства в ассортимент
-    - save_to_file(): сохранение аптеки в файл
+    - add_many(): добавление нескольких лекарств одной операцией
+    - get_medicine(): поиск лекарства по ID
+    - remove_many(): удаление нескольких лекарств за один проход
+    - expiring_before(): лекарства, срок годности которых истекает до даты
+    - expired(): просроченные лекарства
+    - remove_expired(): списание всех просроченных лекарств за один проход
+    - reprice(): переоценка всего ассортимента за один проход
+    - iter_transactions(): потоковое чтение истории аптеки по курсору
+    - save_to_file(): сохранение аптеки в файл (целиком или разностным снимком)
     - load_from_file(): загрузка аптеки из файла
     """
 
+    # Состояние на момент последнего сохранения (для разностных снимков, в файл не пишется)
+    __checkpoint = None
+    # Поколение полного снимка: разностные снимки применяются только к своему поколению
+    __generation = None
+
     def __init__(self, name="Аптека"):
         """
         Инициализация аптеки.
@@ -290,9 +455,10 @@ class Pharmacy:
             name (str): Название аптеки
         """
         self.__name = name
-        self.__medicines = []
+        self.__medicines = {}  # ID -> лекарство, в порядке добавления
+        self.__expiry = ExpiryIndex()
         self.__transactions = []
-        atexit.register(self._safe_close)
+        registry.register(self)
 
     @property
     def name(self):
@@ -307,20 +473,19 @@ class Pharmacy:
 
     @property
     def medicines(self):
-        """Список лекарств (только для чтения)"""
-        return self.__medicines.copy()
+        """Живое представление лекарств только для чтения (копия — medicines.snapshot())"""
+        return ValuesView(self.__medicines, key=_medicine_id)
 
     def _safe_close(self):
         """Безопасное закрытие с записью в лог."""
         try:
-            with builtins.open('pharmacy_deleted.log', 'a') as f:
-                f.write(f'{datetime.now()}: Удалена аптека {self.__name}\n')
-                f.flush()
+            deletion_log.write('pharmacy_deleted.log', f'Удалена аптека {self.__name}')
         except Exception as e:
             print(f"Ошибка при записи лога аптеки: {e}")
 
     def __del__(self):
-        self._safe_close()
+        if not registry.shut_down:  # живые объекты уже закрыты проходом реестра при выходе
+            self._safe_close()
 
     def __str__(self):
         return f"{self.__name}. Лекарств в ассортименте: {len(self.__medicines)}"
@@ -351,8 +516,9 @@ class Pharmacy:
         Returns:
             Pharmacy: Возвращает self для цепочки операций
         """
-        if medicine in self.__medicines:
-            self.__medicines.remove(medicine)
+        if self.__medicines.get(medicine.id) is medicine:
+            del self.__medicines[medicine.id]
+            self.__expiry.remove(medicine)
             self.__log_transaction('Удаление лекарства', None, None, medicine.name)
         return self
 
@@ -368,14 +534,179 @@ class Pharmacy:
 
         Raises:
             InvalidMedicineError: Если передан не объект Medicine
+            OperationNotAllowedError: Если лекарство с таким ID уже в ассортименте
         """
-        if not isinstance(medicine, Medicine):
+        if not _is_medicine(medicine):
             raise InvalidMedicineError("тип лекарства", type(medicine))
+        if medicine.id in self.__medicines:
+            raise OperationNotAllowedError(f"Лекарство #{medicine.id} уже в ассортименте")
 
-        self.__medicines.append(medicine)
+        self.__medicines[medicine.id] = medicine
+        self.__index_expiry(medicine)
         self.__log_transaction('Добавление лекарства', None, None, medicine.name)
         return f"Добавлено: {medicine.name}"
 
+    def add_many(self, medicines):
+        """
+        Добавление нескольких лекарств одной операцией (например, при импорте).
+
+        Лекарства проверяются все до добавления: при ошибке аптека не меняется.
+        Индекс сроков годности перестраивается один раз, в историю попадает
+        одна запись.
+
+        Args:
+            medicines: Лекарства для добавления
+
+        Returns:
+            int: Число добавленных лекарств
+
+        Raises:
+            InvalidMedicineError: Если среди переданных есть не объект Medicine
+            OperationNotAllowedError: Если лекарство с таким ID уже в ассортименте
+        """
+        medicines = list(medicines)
+        batch = {}
+        for medicine in medicines:
+            if not _is_medicine(medicine):
+                raise InvalidMedicineError("тип лекарства", type(medicine))
+            if medicine.id in self.__medicines or medicine.id in batch:
+                raise OperationNotAllowedError(f"Лекарство #{medicine.id} уже в ассортименте")
+            batch[medicine.id] = medicine
+
+        self.__medicines.update(batch)
+        self.__expiry.add_many((med, med.expiry_ordinal) for med in medicines)
+        for medicine in medicines:
+            medicine._watch_expiry(self.__expiry)
+        if medicines:
+            self.__log_transaction('Добавление лекарств', None, None, [med.name for med in medicines])
+        return len(medicines)
+
+    def __index_expiry(self, medicine):
+        # Индекс следит за сменой срока годности лекарства, пока оно в аптеке
+        self.__expiry.add(medicine, medicine.expiry_ordinal)
+        medicine._watch_expiry(self.__expiry)
+
+    def get_medicine(self, medicine_id):
+        """
+        Поиск лекарства по ID.
+
+        Args:
+            medicine_id (int): ID лекарства
+
+        Returns:
+            Medicine: Найденное лекарство или None
+        """
+        return self.__medicines.get(medicine_id)
+
+    def remove_many(self, medicines):
+        """
+        Удаление нескольких лекарств за один проход (например, всей линейки поставщика).
+
+        Args:
+            medicines: Лекарства или их ID; отсутствующие в ассортименте пропускаются
+
+        Returns:
+            list: Удаленные лекарства
+        """
+        removed = []
+        for item in medicines:
+            if _is_medicine(item):
+                if self.__medicines.get(item.id) is not item:
+                    continue
+                item = item.id
+            medicine = self.__medicines.pop(item, None)
+            if medicine is not None:
+                removed.append(medicine)
+        if removed:
+            self.__expiry.remove_many(removed)
+            self.__log_transaction('Удаление лекарств', None, None, [med.name for med in removed])
+        return removed
+
+    def expiring_before(self, day):
+        """
+        Лекарства, срок годности которых истекает строго раньше указанной даты.
+
+        Args:
+            day (str | date): Дата в формате 'YYYY-MM-DD' или объект date
+
+        Returns:
+            list: Лекарства от самых старых к более свежим
+        """
+        return self.__expiry.before(day)
+
+    def expired(self, today=None):
+        """
+        Просроченные лекарства (срок годности раньше сегодняшней даты).
+
+        Args:
+            today (str | date): Текущая дата, по умолчанию date.today()
+
+        Returns:
+            list: Просроченные лекарства
+        """
+        return self.__expiry.before(today or date.today())
+
+    def remove_expired(self, today=None):
+        """
+        Списывает все просроченные лекарства за один проход.
+
+        Args:
+            today (str | date): Текущая дата, по умолчанию date.today()
+
+        Returns:
+            list: Списанные лекарства
+        """
+        removed = self.__expiry.pop_before(today or date.today())
+        if removed:
+            for med in removed:
+                del self.__medicines[med.id]
+            self.__log_transaction('Списание просроченных лекарств', None, None,
+                                   [med.name for med in removed])
+        return removed
+
+    def reprice(self, factor=1.0, factors=None, key=None, ndigits=None):
+        """
+        Переоценка всего ассортимента за один проход.
+
+        В отличие от операторов * и / у Medicine, новые объекты не создаются:
+        множители проверяются один раз, новые цены считаются одним проходом
+        и записываются в те же лекарства. В историю аптеки попадает одна
+        запись о переоценке.
+
+        Args:
+            factor (float): Множитель цены для всех лекарств (и для категорий не из factors)
+            factors (dict): Множители по категориям, например {'витамины': 1.05}
+            key: Функция, возвращающая категорию лекарства (обязательна вместе с factors)
+            ndigits (int): До скольких знаков округлять новые цены (None — не округлять)
+
+        Returns:
+            int: Число переоцененных лекарств
+
+        Raises:
+            InvalidMedicineError: Если множитель отрицательный или не число,
+                либо factors задан без key
+        """
+        for value in [factor, *(factors or {}).values()]:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+                raise InvalidMedicineError("множитель цены", value)
+        if factors and key is None:
+            raise InvalidMedicineError("функция категории", key)
+
+        medicines = list(self.__medicines.values())
+        prices = [med.price for med in medicines]
+        if factors:
+            multipliers = [factors.get(key(med), factor) for med in medicines]
+            prices = list(map(operator.mul, prices, multipliers))
+        elif factor != 1:
+            prices = [price * factor for price in prices]
+        if ndigits is not None:
+            prices = [round(price, ndigits) for price in prices]
+        Medicine._set_prices(medicines, prices)
+
+        self.__log_transaction('Переоценка', None, None,
+                               {'count': len(medicines), 'factor': factor, 'factors': dict(factors or {})})
+        return len(medicines)
+
     def __log_transaction(self, operation, old_value, new_value, details):
         transaction = {
             'datetime': datetime.now(),
@@ -385,15 +716,61 @@ class Pharmacy:
         self.__transactions.append(transaction)
 
     def get_transactions(self):
-        """Возвращает копию списка транзакций аптеки"""
-        return self.__transactions.copy()
+        """Возвращает живое представление транзакций аптеки только для чтения (копия — snapshot())"""
+        return ListView(self.__transactions)
+
+    def iter_transactions(self, cursor=None, since=None, limit=None):
+        """
+        Потоковое чтение истории аптеки по курсору (параметры как у Medicine.iter_transactions).
 
-    def save_to_file(self, filename):
+        Returns:
+            Итератор пар (курсор для продолжения после операции, словарь операции)
+        """
+        return iter_list_history(self.__transactions, cursor, since, limit)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_Pharmacy__checkpoint', None)
+        return state
+
+    def __setstate__(self, state):
+        medicines = state.get('_Pharmacy__medicines')
+        if isinstance(medicines, list):  # файлы, сохраненные до хранения по ID
+            state['_Pharmacy__medicines'] = {med.id: med for med in medicines}
+        self.__dict__.update(state)
+        if '_Pharmacy__expiry' not in state:  # файлы, сохраненные до индекса сроков годности
+            self.__expiry = ExpiryIndex()
+            self.__expiry.add_many((med, med.expiry_ordinal) for med in self.__medicines.values())
+        for medicine in self.__medicines.values():
+            medicine._watch_expiry(self.__expiry)
+
+    @classmethod
+    def _from_parts(cls, name, medicines, transactions):
+        """Собирает аптеку из готовых лекарств и истории операций без новых записей в историю"""
+        pharmacy = cls(name)
+        for medicine in medicines:
+            pharmacy.__medicines[medicine.id] = medicine
+            pharmacy.__index_expiry(medicine)
+        pharmacy.__transactions = list(transactions)
+        return pharmacy
+
+    def save_to_file(self, filename, incremental=False, compression=None):
         """
         Сериализация объекта в файл.
 
+        При incremental=True, если аптека уже сохранялась в этот файл или была
+        из него загружена, в файл <filename>.delta дописывается только разница
+        с прошлым сохранением: новые и удаленные лекарства, измененные лекарства
+        с их новыми операциями и новые операции аптеки. Иначе файл записывается
+        целиком, а накопленные разностные снимки удаляются.
+
+        Полный снимок пишется в формате snapshot_codec: pickle протокола 5,
+        журналы операций — внеполосными буферами, по желанию со сжатием.
+
         Args:
             filename (str): Имя файла (должно оканчиваться на .pkl)
+            incremental (bool): Сохранить только изменения с прошлого сохранения
+            compression (str): Сжатие полного снимка: None, 'zlib', 'lzma' или 'bz2'
 
         Raises:
             OperationNotAllowedError: Если расширение файла не .pkl
@@ -401,25 +778,153 @@ class Pharmacy:
         if not filename.endswith('.pkl'):
             raise OperationNotAllowedError("Расширение файла должно быть .pkl")
 
+        if incremental and self.__checkpoint and self.__checkpoint['filename'] == filename:
+            self.__save_delta(filename)
+        else:
+            self.__save_full(filename, compression)
+
+    def __save_full(self, filename, compression):
+        self.__generation = uuid.uuid4().hex
         with builtins.open(filename, 'wb') as f:
-            pickle.dump(self, f)
+            snapshot_codec.dump(self, f, compression)
+        # Разностные снимки прежнего поколения уже вошли в полный снимок
+        if os.path.exists(filename + '.delta'):
+            os.remove(filename + '.delta')
+        self.__mark_checkpoint(filename)
+
+    def __save_delta(self, filename):
+        seen = self.__checkpoint['medicines']
+        current = self.__medicines
+        changed = []
+        for med_id, med in current.items():
+            if med_id in seen and med.version != seen[med_id][0]:
+                records = list(med.journal_records(seen[med_id][1]))
+                changed.append((med_id, med.name, med.price, med.quantity, med.expiry_date, records))
+        segment = {
+            'generation': self.__generation,
+            'name': self.__name,
+            'added': [med for med_id, med in current.items() if med_id not in seen],
+            'removed': [med_id for med_id in seen if med_id not in current],
+            'changed': changed,
+            'transactions': self.__transactions[self.__checkpoint['transactions']:],
+        }
+        payload = pickle.dumps(segment)
+        with builtins.open(filename + '.delta', 'ab') as f:
+            if not f.tell():
+                f.write(_DELTA_MAGIC)
+            f.write(_DELTA_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self.__mark_checkpoint(filename)
+
+    def __mark_checkpoint(self, filename):
+        self.__checkpoint = {
+            'filename': filename,
+            'medicines': {med.id: (med.version, med.journal_position) for med in self.__medicines.values()},
+            'transactions': len(self.__transactions),
+        }
+
+    def __apply_delta(self, segment):
+        self.__name = segment['name']
+        removed = [self.__medicines.pop(med_id) for med_id in segment['removed']]
+        self.__expiry.remove_many(removed)
+        for med_id, name, price, quantity, expiry_date, records in segment['changed']:
+            med = self.__medicines[med_id]
+            med._restore(name, price, quantity, expiry_date, records)
+            self.__expiry.remove(med)
+            self.__expiry.add(med, med.expiry_ordinal)
+        for med in segment['added']:
+            self.__medicines[med.id] = med
+            self.__index_expiry(med)
+        self.__transactions.extend(segment['transactions'])
 
     @classmethod
     def load_from_file(cls, filename):
         """
         Десериализация объекта из файла.
 
+        Если рядом есть файл <filename>.delta, после полного снимка по порядку
+        применяются разностные снимки того же поколения. Недописанный последний
+        снимок (например, после сбоя) пропускается и обрезается, чтобы следующий
+        разностный снимок дописывался сразу за целыми.
+
+        Файл .idx (формат с индексом, см. mapped_store.save_mapped) читается
+        через mmap: записи лекарств разбираются сразу — по ним строятся словарь
+        по ID и индекс сроков годности, — а журналы операций остаются
+        упакованными до первого обращения к истории лекарства.
+
         Args:
-            filename (str): Имя файла (должно оканчиваться на .pkl)
+            filename (str): Имя файла (должно оканчиваться на .pkl или .idx)
 
         Returns:
             Pharmacy: Загруженный объект аптеки
 
         Raises:
-            OperationNotAllowedError: Если расширение файла не .pkl
+            OperationNotAllowedError: Если расширение файла не .pkl и не .idx
         """
+        if filename.endswith('.idx'):
+            from mapped_store import MappedPharmacy  # mapped_store сам импортирует этот модуль
+            with MappedPharmacy(filename) as mapped:
+                return mapped.to_pharmacy()
         if not filename.endswith('.pkl'):
-            raise OperationNotAllowedError("Расширение файла должно быть .pkl")
+            raise OperationNotAllowedError("Расширение файла должно быть .pkl или .idx")
 
         with builtins.open(filename, 'rb') as f:
-            return pickle.load(f)
\ No newline at end of file
+            pharmacy = snapshot_codec.load(f)
+
+        if os.path.exists(filename + '.delta'):
+            for segment in _load_delta(filename + '.delta'):
+                if segment['generation'] == pharmacy.__generation:
+                    pharmacy.__apply_delta(segment)
+        pharmacy.__mark_checkpoint(filename)
+        return pharmacy
+
+
+def _load_delta(path):
+    """
+    Читает разностные снимки из файла path.
+
+    Оборванный последний снимок отбрасывается и обрезается. Файл прежнего
+    формата (pickle снимков подряд, без заголовка и рамок) переписывается
+    в текущий формат.
+
+    Returns:
+        list: Разностные снимки по порядку
+    """
+    with builtins.open(path, 'rb') as f:
+        data = f.read()
+
+    if data.startswith(_DELTA_MAGIC):
+        payloads = []
+        position = len(_DELTA_MAGIC)
+        while position + _DELTA_FRAME.size <= len(data):
+            length, crc = _DELTA_FRAME.unpack_from(data, position)
+            start = position + _DELTA_FRAME.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            payloads.append(payload)
+            position = start + length
+        if position < len(data):
+            with builtins.open(path, 'r+b') as f:
+                f.truncate(position)
+        return [pickle.loads(payload) for payload in payloads]
+
+    segments = []
+    frames = [_DELTA_MAGIC]
+    stream = io.BytesIO(data)
+    while True:
+        start = stream.tell()
+        try:
+            segments.append(pickle.load(stream))
+        except (EOFError, pickle.UnpicklingError):
+            break
+        payload = data[start:stream.tell()]
+        frames.append(_DELTA_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with builtins.open(temp_path, 'wb') as f:
+        f.write(b''.join(frames))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return segments
\ No newline at end of file
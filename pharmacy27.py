@@ -5,30 +5,38 @@
 - Декораторами для логирования
 """
 
-import time
 from datetime import datetime
 from functools import wraps
 
+from metrics import metrics
+
 # Декораторы
 def timing_decorator(func):
-    """Декоратор для измерения времени выполнения метода"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        print(f"Метод {func.__name__} выполнен за {end_time - start_time:.4f} сек")
-        return result
-    return wrapper
+    """
+    Декоратор для измерения времени выполнения метода.
+
+    Время пишется в гистограмму metrics с именем вида 'Pharmacy.add_supplier'
+    (без вывода на экран); снимок — metrics.snapshot(), отключение — metrics.disable().
+    """
+    return metrics.timed()(func)
 
 def call_counter_decorator(func):
-    """Декоратор для подсчета вызовов метода"""
+    """
+    Декоратор для подсчета вызовов метода.
+
+    Общий счетчик по всем объектам и потокам ведется в metrics под именем
+    вида 'Pharmacy.add_medicine' (экспорт — metrics.write_prometheus());
+    счетчик отдельного объекта — в self._call_counts (см. get_call_count()).
+    """
+    counter = metrics.counter(func.__qualname__)
+    name = func.__name__
+
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        if not hasattr(self, '_call_counts'):
-            self._call_counts = {}
-        self._call_counts[func.__name__] = self._call_counts.get(func.__name__, 0) + 1
-        print(f"Метод {func.__name__} вызван {self._call_counts[func.__name__]} раз")
+        if metrics.enabled:
+            counter.inc()
+        counts = self._call_counts
+        counts[name] = counts.get(name, 0) + 1
         return func(self, *args, **kwargs)
     return wrapper
 
@@ -41,15 +49,22 @@ class Supplier:
         self.name = name
         self.contact_phone = contact_phone
         self.supplied_medicines = []
+        self._supplied = set()  # Индекс supplied_medicines для проверки за O(1)
         self._call_counts = {}
 
     def __str__(self):
         return f"Поставщик: {self.name}, тел: {self.contact_phone}"
 
+    def supplies(self, medicine_name):
+        """Проверяет, поставляет ли поставщик лекарство (за O(1))"""
+        return medicine_name in self._supplied
+
+    @timing_decorator
     @call_counter_decorator
     def add_supplied_medicine(self, medicine_name):
         """Добавляет лекарство в список поставляемых"""
         self.supplied_medicines.append(medicine_name)
+        self._supplied.add(medicine_name)
         return f"{medicine_name} добавлен к списку поставляемых"
 
     def get_call_count(self, method_name):
@@ -86,17 +101,22 @@ class Pharmacy:
         self.name = name
         self.medicines = []
         self.suppliers = []
+        # Индексы для пополнения за O(1); списки выше меняются только через методы
+        self._by_name = {}  # название -> первое лекарство с таким названием
+        self._supplier_set = set()
         self._call_counts = {}  # Для хранения счетчиков вызовов
 
     def __str__(self):
         return f"Аптека '{self.name}'. Лекарств: {len(self.medicines)}, Поставщиков: {len(self.suppliers)}"
 
+    @timing_decorator
     @call_counter_decorator
     def add_medicine(self, medicine):
         """Добавляет лекарство в ассортимент"""
         if not isinstance(medicine, Medicine):
             raise TypeError("Должен быть объект класса Medicine")
         self.medicines.append(medicine)
+        self._by_name.setdefault(medicine.name, medicine)
         return f"Лекарство {medicine.name} добавлено в ассортимент"
 
     @timing_decorator
@@ -106,6 +126,7 @@ class Pharmacy:
         if not isinstance(supplier, Supplier):
             raise TypeError("Должен быть объект класса Supplier")
         self.suppliers.append(supplier)
+        self._supplier_set.add(supplier)
         return f"Поставщик {supplier.name} добавлен"
 
     @timing_decorator
@@ -114,19 +135,19 @@ class Pharmacy:
         Пополняет запасы от указанного поставщика.
         Возвращает строку с информацией о пополнении.
         """
-        if supplier not in self.suppliers:
+        if supplier not in self._supplier_set:
             raise ValueError("Этот поставщик не сотрудничает с аптекой")
 
-        if medicine_name not in supplier.supplied_medicines:
+        if not supplier.supplies(medicine_name):
             raise ValueError("Этот поставщик не поставляет указанное лекарство")
 
-        # Ищем лекарство в ассортименте
-        for med in self.medicines:
-            if med.name == medicine_name:
-                med.quantity += quantity
-                if not med.supplier:
-                    med.set_supplier(supplier)
-                return f"Запас {medicine_name} пополнен на {quantity} единиц"
+        # Ищем лекарство в ассортименте по индексу
+        med = self._by_name.get(medicine_name)
+        if med is not None:
+            med.quantity += quantity
+            if not med.supplier:
+                med.set_supplier(supplier)
+            return f"Запас {medicine_name} пополнен на {quantity} единиц"
 
         # Если лекарства нет в ассортименте
         new_med = Medicine(medicine_name, 0, quantity, "2025-12-31")
@@ -134,6 +155,58 @@ class Pharmacy:
         self.add_medicine(new_med)
         return f"Запас {medicine_name} пополнен на {quantity} единиц (новое лекарство)"
 
+    @timing_decorator
+    def restock_from_manifest(self, supplier, lines):
+        """
+        Пополняет запасы по накладной поставщика за один проход.
+
+        Накладная проверяется целиком до изменений: при любой ошибке запасы
+        не меняются. Количества по одинаковым названиям складываются,
+        недостающие лекарства создаются разом и сразу связываются с поставщиком.
+
+        Args:
+            supplier (Supplier): Поставщик
+            lines: Строки накладной — пары (название лекарства, количество)
+
+        Returns:
+            str: Итог поставки
+
+        Raises:
+            ValueError: Если поставщик не сотрудничает с аптекой, не поставляет
+                какое-то лекарство или количество не целое положительное
+        """
+        if supplier not in self._supplier_set:
+            raise ValueError("Этот поставщик не сотрудничает с аптекой")
+
+        totals = {}
+        errors = []
+        for number, (medicine_name, quantity) in enumerate(lines, 1):
+            if not supplier.supplies(medicine_name):
+                errors.append(f"строка {number}: {medicine_name} не поставляется этим поставщиком")
+            elif isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+                errors.append(f"строка {number}: недопустимое количество {quantity!r}")
+            else:
+                totals[medicine_name] = totals.get(medicine_name, 0) + quantity
+        if errors:
+            raise ValueError("Накладная отклонена: " + "; ".join(errors))
+
+        created = []
+        for medicine_name, quantity in totals.items():
+            med = self._by_name.get(medicine_name)
+            if med is None:
+                med = Medicine(medicine_name, 0, quantity, "2025-12-31")
+                med.supplier = supplier  # поставщик уже проверен
+                self._by_name[medicine_name] = med
+                created.append(med)
+            else:
+                med.quantity += quantity
+                if not med.supplier:
+                    med.supplier = supplier
+        self.medicines.extend(created)
+
+        return (f"Поставка от {supplier.name}: пополнено позиций {len(totals)}, "
+                f"единиц {sum(totals.values())} (новых лекарств: {len(created)})")
+
     def get_call_count(self, method_name):
         """Возвращает количество вызовов указанного метода"""
         return self._call_counts.get(method_name, 0)
@@ -165,6 +238,7 @@ if __name__ == '__main__':
     print(apteka.restock_from_supplier(supplier1, "Аспирин", 100))
     print(apteka.restock_from_supplier(supplier1, "Ибупрофен", 50))
     print(apteka.restock_from_supplier(supplier2, "Парацетамол", 75))
+    print(apteka.restock_from_manifest(supplier1, [("Аспирин", 20), ("Ибупрофен", 10)]))
 
     # Выводим информацию о лекарствах
     print("\nАссортимент аптеки:")
@@ -175,4 +249,12 @@ if __name__ == '__main__':
     print("\nСтатистика вызовов:")
     print(f"add_supplier вызван {apteka.get_call_count('add_supplier')} раз")
     print(f"add_medicine вызван {apteka.get_call_count('add_medicine')} раз")
-    print(f"add_supplied_medicine вызван {supplier1.get_call_count('add_supplied_medicine')} раз")
\ No newline at end of file
+    print(f"add_supplied_medicine вызван {supplier1.get_call_count('add_supplied_medicine')} раз")
+
+    # Время выполнения методов и общие счетчики вызовов
+    print("\nВремя выполнения (p50 / p99, мкс):")
+    for name, stats in metrics.snapshot().items():
+        print(f"{name}: {stats['p50_ns'] / 1000:.1f} / {stats['p99_ns'] / 1000:.1f} (вызовов: {stats['count']})")
+
+    # Файл для локального сборщика Prometheus
+    metrics.write_prometheus('pharmacy27.prom')
\ No newline at end of file
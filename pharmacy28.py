@@ -6,21 +6,32 @@
 - Консольным интерфейсом
 """
 
-import pickle
 from datetime import datetime
 from functools import wraps
 
+from wal_store import WalStore
+
 
 class MedicineDatabase:
     """Класс-контейнер для хранения лекарств"""
 
-    def __init__(self):
-        self.filename = 'medicines.pkl'
-        self.medicines = {}
-        try:
-            self.load()
-        except:
-            self.save()
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Хранилище лекарств по названию (по умолчанию WalStore: снимок в medicines.pkl,
+                   изменения — в журнал medicines.pkl.wal; sqlite_store.SqliteStore — таблица SQLite)
+        """
+        self.medicines = store if store is not None else WalStore('medicines.pkl')
+        self.filename = self.medicines.path
+
+    @property
+    def compression(self):
+        """Сжатие файла: None, 'zlib', 'lzma' или 'bz2'"""
+        return self.medicines.compression
+
+    @compression.setter
+    def compression(self, value):
+        self.medicines.compression = value
 
     def __iter__(self):
         """Итератор по всем лекарствам"""
@@ -34,42 +45,62 @@ class MedicineDatabase:
         """Добавление лекарства в базу"""
         if not isinstance(medicine, Medicine):
             raise TypeError("Должен быть объект класса Medicine")
-        self.medicines[medicine.name] = medicine
-        self.save()
+        self.medicines.put(medicine.name, medicine)
+
+    def add_many(self, medicines):
+        """Добавление нескольких лекарств одной записью в журнал"""
+        medicines = list(medicines)
+        for medicine in medicines:
+            if not isinstance(medicine, Medicine):
+                raise TypeError("Должен быть объект класса Medicine")
+        self.medicines.put_many((med.name, med) for med in medicines)
+        return len(medicines)
 
     def get(self, name):
         """Получение лекарства по имени"""
         return self.medicines.get(name)
 
+    def search(self, prefix, k=10):
+        """Поиск до k лекарств по началу названия (регистр и ё/е не важны)"""
+        return self.medicines.search(prefix, k)
+
     def remove(self, name):
         """Удаление лекарства"""
-        if name in self.medicines:
-            del self.medicines[name]
-            self.save()
-            return True
-        return False
+        return self.medicines.delete(name)
+
+    def batch(self):
+        """Контекст группы изменений: в файл они записываются один раз при выходе из блока"""
+        return self.medicines.batch()
 
     def save(self):
-        """Сохранение данных в файл"""
-        with open(self.filename, 'wb') as f:
-            pickle.dump(self.medicines, f)
+        """Сохранение данных в файл (снимок базы, журнал начинается заново)"""
+        self.medicines.compact()
 
     def load(self):
-        """Загрузка данных из файла"""
-        with open(self.filename, 'rb') as f:
-            self.medicines = pickle.load(f)
+        """Загрузка данных из файла (снимок и журнал)"""
+        self.medicines.load()
 
 
 class SupplierDatabase:
     """Класс-контейнер для хранения поставщиков"""
 
-    def __init__(self):
-        self.filename = 'suppliers.pkl'
-        self.suppliers = {}
-        try:
-            self.load()
-        except:
-            self.save()
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Хранилище поставщиков по названию (по умолчанию WalStore: снимок в suppliers.pkl,
+                   изменения — в журнал suppliers.pkl.wal; sqlite_store.SqliteStore — таблица SQLite)
+        """
+        self.suppliers = store if store is not None else WalStore('suppliers.pkl')
+        self.filename = self.suppliers.path
+
+    @property
+    def compression(self):
+        """Сжатие файла: None, 'zlib', 'lzma' или 'bz2'"""
+        return self.suppliers.compression
+
+    @compression.setter
+    def compression(self, value):
+        self.suppliers.compression = value
 
     def __iter__(self):
         """Итератор по всем поставщикам"""
@@ -83,8 +114,7 @@ class SupplierDatabase:
         """Добавление поставщика в базу"""
         if not isinstance(supplier, Supplier):
             raise TypeError("Должен быть объект класса Supplier")
-        self.suppliers[supplier.name] = supplier
-        self.save()
+        self.suppliers.put(supplier.name, supplier)
 
     def get(self, name):
         """Получение поставщика по имени"""
@@ -92,21 +122,19 @@ class SupplierDatabase:
 
     def remove(self, name):
         """Удаление поставщика"""
-        if name in self.suppliers:
-            del self.suppliers[name]
-            self.save()
-            return True
-        return False
+        return self.suppliers.delete(name)
+
+    def batch(self):
+        """Контекст группы изменений: в файл они записываются один раз при выходе из блока"""
+        return self.suppliers.batch()
 
     def save(self):
-        """Сохранение данных в файл"""
-        with open(self.filename, 'wb') as f:
-            pickle.dump(self.suppliers, f)
+        """Сохранение данных в файл (снимок базы, журнал начинается заново)"""
+        self.suppliers.compact()
 
     def load(self):
-        """Загрузка данных из файла"""
-        with open(self.filename, 'rb') as f:
-            self.suppliers = pickle.load(f)
+        """Загрузка данных из файла (снимок и журнал)"""
+        self.suppliers.load()
 
 
 class Medicine:
@@ -200,10 +228,12 @@ class PharmacyManager:
             print("Поставщик не найден")
             return
 
-        med.supplier = sup
-        sup.add_medicine(med_name)
-        self.med_db.save()
-        self.sup_db.save()
+        with self.med_db.batch(), self.sup_db.batch():
+            med.supplier = sup
+            sup.add_medicine(med_name)
+            # Повторное добавление записывает в журнал только измененные объекты
+            self.med_db.add(med)
+            self.sup_db.add(sup)
         print(f"Поставщик {sup_name} назначен для {med_name}")
 
     def run(self):
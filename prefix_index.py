@@ -0,0 +1,67 @@
+"""
+Модуль prefix_index реализует индекс для поиска лекарств по началу названия
+(автодополнение). Названия хранятся в отсортированном списке, поиск выполняется
+двоичным поиском (bisect), поэтому выдача первых k совпадений занимает O(log n + k).
+"""
+
+from bisect import bisect_left, insort
+
+
+def normalize(name):
+    """Приводит название к виду для сравнения: без учета регистра и различия ё/е"""
+    return name.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """Индекс названий для поиска по префиксу"""
+
+    def __init__(self, items=()):
+        """
+        Args:
+            items: пары (название, объект) для начального заполнения
+        """
+        self._values = dict(items)  # название -> объект
+        self._keys = sorted((normalize(name), name) for name in self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, name):
+        return name in self._values
+
+    def add(self, name, value):
+        """Добавляет объект под названием name (заменяет прежний с тем же названием)"""
+        if name not in self._values:
+            insort(self._keys, (normalize(name), name))
+        self._values[name] = value
+
+    def update(self, items):
+        """Добавляет пары (название, объект), сортируя индекс один раз (для больших пачек)"""
+        added = []
+        for name, value in items:
+            if name not in self._values:
+                added.append((normalize(name), name))
+            self._values[name] = value
+        if added:
+            self._keys.extend(added)
+            self._keys.sort()
+
+    def remove(self, name):
+        """Удаляет название из индекса. Возвращает True, если оно было в индексе"""
+        if name not in self._values:
+            return False
+        del self._values[name]
+        key = (normalize(name), name)
+        del self._keys[bisect_left(self._keys, key)]
+        return True
+
+    def search(self, prefix, k=10):
+        """Возвращает до k объектов, названия которых начинаются с prefix (по алфавиту)"""
+        prefix = normalize(prefix)
+        keys = self._keys
+        result = []
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and len(result) < k and keys[i][0].startswith(prefix):
+            result.append(self._values[keys[i][1]])
+            i += 1
+        return result
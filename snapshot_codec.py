@@ -0,0 +1,134 @@
+"""
+Модуль snapshot_codec реализует формат снимков на pickle протокола 5.
+
+Объемные числовые данные (массивы журналов операций, столбцы MedicineColumns)
+передаются через внеполосные буферы протокола 5 и пишутся в файл как есть,
+без копирования внутрь потока pickle. Весь снимок может сжиматься одним из
+подключаемых алгоритмов стандартной библиотеки (zlib, lzma, bz2).
+
+Устройство файла:
+- сигнатура MAGIC, длина и название алгоритма сжатия;
+- сжатый кадр: число буферов, длины основного потока и буферов (uint64),
+  основной поток pickle и сами буферы.
+
+Файлы обычного pickle (без сигнатуры) загружаются как раньше.
+"""
+
+import bz2
+import lzma
+import pickle
+import struct
+import zlib
+from array import array
+
+MAGIC = b'PSNAP5\n'
+
+# Название -> (создание потокового компрессора, распаковка); None — без сжатия
+CODECS = {
+    'none': None,
+    'zlib': (zlib.compressobj, zlib.decompress),
+    'lzma': (lzma.LZMACompressor, lzma.decompress),
+    'bz2': (bz2.BZ2Compressor, bz2.decompress),
+}
+
+
+def _rebuild_with_arrays(cls, state, columns):
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    for name, typecode, buffer in columns:
+        column = array(typecode)
+        column.frombytes(buffer)
+        obj.__dict__[name] = column
+    return obj
+
+
+class ArrayPickleMixin:
+    """
+    Примесь для классов, хранящих данные в атрибутах-массивах array.
+
+    При pickle протокола 5 массивы передаются как PickleBuffer: при сохранении
+    через dump() они попадают во внеполосные буферы без копирования, а при
+    обычном pickle.dumps(protocol=5) записываются внутри потока.
+    """
+
+    def __reduce_ex__(self, protocol):
+        if protocol < 5:
+            return super().__reduce_ex__(protocol)
+        state = {}
+        columns = []
+        getstate = getattr(self, '__getstate__', None)  # object.__getstate__ есть только с Python 3.11
+        for name, value in (getstate() if getstate else self.__dict__).items():
+            if isinstance(value, array):
+                columns.append((name, value.typecode, pickle.PickleBuffer(value)))
+            else:
+                state[name] = value
+        return _rebuild_with_arrays, (type(self), state, columns)
+
+
+def register_codec(name, make_compressor, decompress):
+    """
+    Подключает алгоритм сжатия.
+
+    Args:
+        name (str): Название алгоритма (записывается в файл)
+        make_compressor: Функция без аргументов, возвращающая объект с методами compress() и flush()
+        decompress: Функция распаковки bytes -> bytes
+    """
+    CODECS[name] = (make_compressor, decompress)
+
+
+def dump(obj, file, compression=None):
+    """
+    Записывает объект в открытый двоичный файл.
+
+    Args:
+        obj: Сохраняемый объект
+        file: Файл, открытый на запись в двоичном режиме
+        compression (str): Название алгоритма сжатия из CODECS или None
+
+    Raises:
+        ValueError: Если алгоритм сжатия неизвестен
+    """
+    name = compression or 'none'
+    if name not in CODECS:
+        raise ValueError(f"Неизвестный алгоритм сжатия: {name}")
+    buffers = []
+    main = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    lengths = [len(main)] + [raw.nbytes for raw in raws]
+    parts = [struct.pack(f'<I{len(lengths)}Q', len(raws), *lengths), main, *raws]
+
+    file.write(MAGIC + bytes([len(name)]) + name.encode())
+    if CODECS[name] is None:
+        for part in parts:
+            file.write(part)
+    else:
+        compressor = CODECS[name][0]()
+        for part in parts:
+            file.write(compressor.compress(part))
+        file.write(compressor.flush())
+
+
+def load(file):
+    """
+    Читает объект из открытого двоичного файла (снимок этого формата или обычный pickle).
+    """
+    head = file.read(len(MAGIC))
+    if head != MAGIC:
+        file.seek(0)
+        return pickle.load(file)
+    name = file.read(file.read(1)[0]).decode()
+    if name not in CODECS:
+        raise ValueError(f"Неизвестный алгоритм сжатия: {name}")
+    frame = file.read()
+    if CODECS[name] is not None:
+        frame = CODECS[name][1](frame)
+    frame = memoryview(frame)
+    count = struct.unpack_from('<I', frame)[0]
+    lengths = struct.unpack_from(f'<{count + 1}Q', frame, 4)
+    offset = 4 + 8 * (count + 1)
+    chunks = []
+    for length in lengths:
+        chunks.append(frame[offset:offset + length])
+        offset += length
+    return pickle.loads(chunks[0], buffers=chunks[1:])
@@ -0,0 +1,194 @@
+"""
+Модуль sqlite_store реализует хранилище «ключ -> объект» в файле SQLite
+с тем же набором методов, что и wal_store.WalStore.
+
+Объекты хранятся строками таблицы (название, нормализованное название,
+pickle объекта), поэтому в памяти держится только то, что сейчас читается:
+get() находит строку по первичному ключу, перебор читает таблицу пачками
+через курсор, поиск по началу названия идет по индексу нормализованных
+названий. Изменение одного объекта меняет одну строку.
+
+База открывается в режиме журнала WAL: чтение не блокируется записью, а
+запись дописывает измененные страницы в журнал. Все запросы — постоянные
+строки с параметрами, поэтому sqlite3 компилирует каждый один раз и дальше
+берет готовый из кэша подготовленных запросов.
+
+Пример:
+    database = pharmacy28.MedicineDatabase(SqliteStore('pharmacy.db', 'medicines'))
+
+Ключи — строки. Прочитанные объекты — копии: изменения объекта
+сохраняются повторным put().
+"""
+
+import pickle
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from prefix_index import normalize
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS {table} (name TEXT PRIMARY KEY, norm TEXT NOT NULL, value BLOB NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS {table}_norm ON {table} (norm, name)',
+)
+
+_QUERIES = {
+    'get': 'SELECT value FROM {table} WHERE name = ?',
+    'contains': 'SELECT 1 FROM {table} WHERE name = ?',
+    'count': 'SELECT count(*) FROM {table}',
+    'keys': 'SELECT name FROM {table} ORDER BY rowid',
+    'values': 'SELECT value FROM {table} ORDER BY rowid',
+    'items': 'SELECT name, value FROM {table} ORDER BY rowid',
+    # Замена обновляет строку на месте и сохраняет ее порядок, как у словаря
+    'put': 'INSERT INTO {table} (name, norm, value) VALUES (?, ?, ?) '
+           'ON CONFLICT (name) DO UPDATE SET value = excluded.value',
+    'delete': 'DELETE FROM {table} WHERE name = ?',
+    'search': 'SELECT value FROM {table} WHERE norm >= ? AND norm < ? ORDER BY norm, name LIMIT ?',
+}
+
+_FETCH = 512  # строк в одной пачке при переборе
+_LAST_CHAR = chr(0x10FFFF)
+
+
+class SqliteStore(Mapping):
+    """
+    Хранилище объектов по ключу в таблице SQLite.
+
+    Атрибуты:
+    - path: файл базы SQLite
+    - table: имя таблицы (в одном файле можно держать несколько хранилищ)
+
+    Методы:
+    - put(), put_many(), delete(): изменения (каждое — своя транзакция)
+    - batch(): контекст, объединяющий изменения в одну транзакцию
+    - search(): поиск до k объектов по началу ключа
+    - compact(): перенос журнала WAL в файл базы
+    """
+
+    def __init__(self, path, table='items', compression=None):
+        """
+        Открывает (создает) базу и таблицу.
+
+        Args:
+            path (str): Файл базы
+            table (str): Имя таблицы
+            compression: Не используется (для совместимости с WalStore)
+
+        Raises:
+            ValueError: Если имя таблицы не является идентификатором
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Недопустимое имя таблицы: {table!r}")
+        self.path = path
+        self.table = table
+        self.compression = compression
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._sql = {name: query.format(table=table) for name, query in _QUERIES.items()}
+        # Транзакциями управляем сами: вне batch() каждый запрос фиксируется сразу
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        for statement in _SCHEMA:
+            self._connection.execute(statement.format(table=table))
+
+    def _one(self, query, parameters=()):
+        with self._lock:
+            return self._connection.execute(self._sql[query], parameters).fetchone()
+
+    def __getitem__(self, key):
+        row = self._one('get', (key,))
+        if row is None:
+            raise KeyError(key)
+        return pickle.loads(row[0])
+
+    def get(self, key, default=None):
+        row = self._one('get', (key,))
+        return default if row is None else pickle.loads(row[0])
+
+    def __contains__(self, key):
+        return self._one('contains', (key,)) is not None
+
+    def __len__(self):
+        return self._one('count')[0]
+
+    def _stream(self, query):
+        """Отдает строки запроса пачками по _FETCH, не читая всю таблицу в память"""
+        with self._lock:
+            cursor = self._connection.execute(self._sql[query])
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(_FETCH)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def __iter__(self):
+        return (name for name, in self._stream('keys'))
+
+    def values(self):
+        return (pickle.loads(value) for value, in self._stream('values'))
+
+    def items(self):
+        return ((name, pickle.loads(value)) for name, value in self._stream('items'))
+
+    def put(self, key, value):
+        """Сохраняет объект под ключом key (заменяет прежний)"""
+        with self._lock:
+            self._connection.execute(self._sql['put'], (key, normalize(key), pickle.dumps(value, protocol=5)))
+
+    def put_many(self, items):
+        """Сохраняет пары (ключ, объект) одной транзакцией"""
+        rows = ((key, normalize(key), pickle.dumps(value, protocol=5)) for key, value in items)
+        with self.batch():  # batch() держит блокировку, executemany идет под ней
+            self._connection.executemany(self._sql['put'], rows)
+
+    def delete(self, key):
+        """Удаляет объект. Возвращает True, если он был в хранилище"""
+        with self._lock:
+            return self._connection.execute(self._sql['delete'], (key,)).rowcount > 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Контекст группы изменений: одна транзакция, фиксируемая при выходе.
+
+        Блоки можно вкладывать друг в друга: фиксирует внешний блок. Как и в
+        WalStore, при исключении внутри блока сделанные изменения сохраняются.
+        Блок держит блокировку хранилища до фиксации: соединение общее, и
+        запросы других потоков иначе попали бы в эту транзакцию, поэтому
+        они ждут конца блока.
+        """
+        with self._lock:
+            if not self._batch_depth:
+                self._connection.execute('BEGIN IMMEDIATE')
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._connection.execute('COMMIT')
+
+    def search(self, prefix, k=10):
+        """Возвращает до k объектов, ключи которых начинаются с prefix (регистр и ё/е не важны)"""
+        prefix = normalize(prefix)
+        with self._lock:
+            rows = self._connection.execute(self._sql['search'], (prefix, prefix + _LAST_CHAR, k)).fetchall()
+        return [pickle.loads(value) for value, in rows]
+
+    def compact(self):
+        """Переносит журнал WAL в файл базы и очищает журнал"""
+        with self._lock:
+            self._connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def load(self):
+        """Ничего не делает: данные читаются из базы при каждом обращении"""
+
+    def close(self):
+        """Закрывает соединение с базой"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,68 @@
+"""
+Модуль test_Medicine_1 содержит тесты для классов Medicine и Pharmacy из Medicine_1
+"""
+
+import unittest
+from Medicine_1 import Medicine, Pharmacy
+
+
+class TestPharmacy(unittest.TestCase):
+    """Тесты для аптеки из 21 лабораторной"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.pharmacy = Pharmacy("Тестовая Аптека")
+        self.aspirin = Medicine("Аспирин", 50, 100, "2025-12-31")
+        self.pharmacy.add_medicine(self.aspirin)
+        self.pharmacy.add_medicine(Medicine("Ибупрофен", 80, 50, "2024-10-15"))
+
+    def test_find_medicine_ignores_case(self):
+        """Поиск по названию не зависит от регистра"""
+        self.assertIs(self.pharmacy.find_medicine("аспирин"), self.aspirin)
+        self.assertIs(self.pharmacy.find_medicine("АСПИРИН"), self.aspirin)
+        self.assertIsNone(self.pharmacy.find_medicine("Парацетамол"))
+
+    def test_find_medicine_returns_first_duplicate(self):
+        """При одинаковых названиях находится первое добавленное лекарство"""
+        self.pharmacy.add_medicine(Medicine("аспирин", 10, 1, "2026-01-01"))
+        self.assertIs(self.pharmacy.find_medicine("Аспирин"), self.aspirin)
+
+    def test_sell_medicine(self):
+        """Продажа через аптеку"""
+        self.assertEqual(self.pharmacy.sell_medicine("аспирин", 10),
+                         "Продано 10 шт. Аспирин. Остаток: 90")
+        self.assertEqual(self.pharmacy.sell_medicine("Парацетамол", 5),
+                         "Лекарство Парацетамол не найдено.")
+
+    def test_search_medicines(self):
+        """Поиск по началу названия"""
+        self.assertEqual(self.pharmacy.search_medicines("асп"), [self.aspirin])
+        self.assertEqual(self.pharmacy.search_medicines("Х"), [])
+
+    def test_sell_many(self):
+        """Корзина продается целиком, одинаковые позиции суммируются"""
+        result = self.pharmacy.sell_many([("Аспирин", 10), ("ибупрофен", 5), ("аспирин", 5)])
+        self.assertTrue(result.ok)
+        self.assertEqual(self.aspirin.quantity, 85)
+        self.assertEqual(self.pharmacy.find_medicine("Ибупрофен").quantity, 45)
+        self.assertIn((self.aspirin, 15), result.sold)
+
+    def test_sell_many_all_or_nothing(self):
+        """Если хотя бы одной позиции не хватает, ничего не продается"""
+        result = self.pharmacy.sell_many([("Аспирин", 10), ("Ибупрофен", 60), ("Парацетамол", 1)])
+        self.assertFalse(result.ok)
+        self.assertEqual(result.missing, ("Парацетамол",))
+        self.assertEqual(len(result.short), 1)
+        self.assertEqual(result.short[0][1:], (60, 50))
+        self.assertEqual(self.aspirin.quantity, 100)
+
+        # Количество не больше нуля отклоняет корзину, даже если остальное продается
+        result = self.pharmacy.sell_many([("Аспирин", 10), ("Ибупрофен", -5), ("Аспирин", 0)])
+        self.assertFalse(result.ok)
+        self.assertEqual(result.invalid, (("Ибупрофен", -5), ("Аспирин", 0)))
+        self.assertEqual(self.aspirin.quantity, 100)
+        self.assertEqual(self.pharmacy.find_medicine("Ибупрофен").quantity, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
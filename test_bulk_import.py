@@ -0,0 +1,88 @@
+"""
+Модуль test_bulk_import содержит тесты для импорта лекарств из CSV и JSONL
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import pharmacy26
+import pharmacy28
+from bulk_import import import_medicines, validate_chunk
+
+
+class TestBulkImport(unittest.TestCase):
+    """Тесты для bulk_import"""
+
+    def setUp(self):
+        """Подготовка временного каталога"""
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        pharmacy26.Medicine.id_allocator.reset()
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_validate_chunk(self):
+        """Проверка по столбцам собирает ошибки по строкам"""
+        columns = [
+            ['Аспирин', '', 'Но-шпа'],
+            ['80', '-1', 150],
+            ['50', '1.5', True],
+            ['2025-05-30', '30.05.2025', '2026-01-01'],
+        ]
+        valid, rejects = validate_chunk(columns)
+        self.assertEqual(valid, [(0, 'Аспирин', 80.0, 50, '2025-05-30')])
+        self.assertEqual([i for i, _ in rejects], [1, 2])
+        self.assertEqual(len(rejects[0][1]), 4)
+        self.assertEqual(rejects[1][1], ['Недопустимое значение quantity'])
+
+    def test_csv_into_pharmacy(self):
+        """Импорт CSV в аптеку с файлом отказов и одной записью в истории"""
+        with open('store.csv', 'w', encoding='utf-8') as f:
+            f.write("name,price,quantity,expiry_date\n")
+            for i in range(250):
+                f.write(f"Лекарство {i},{i},{i % 7},2030-01-01\n")
+            f.write("Плохое,abc,1,2030-01-01\n")
+        pharmacy = pharmacy26.Pharmacy("Новая аптека")
+
+        result = import_medicines('store.csv', pharmacy, pharmacy26.Medicine,
+                                  reject_path='rejects.jsonl', chunk_size=100)
+        self.assertEqual(result, (250, 1))
+        self.assertEqual(len(pharmacy.medicines), 250)
+        self.assertEqual(pharmacy.medicines[-1].price, 249.0)
+        self.assertEqual(len(pharmacy.get_transactions()), 1)
+        self.assertEqual(len(pharmacy.expiring_before("2031-01-01")), 250)
+        with open('rejects.jsonl', encoding='utf-8') as f:
+            reject = json.loads(f.readline())
+        self.assertEqual(reject['line'], 252)
+        self.assertEqual(reject['row']['name'], 'Плохое')
+
+    def test_jsonl_into_database(self):
+        """Импорт JSONL в базу pharmacy28 с одним сохранением"""
+        with open('store.jsonl', 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'name': 'Аспирин', 'price': 80, 'quantity': 50, 'expiry_date': '2025-05-30'}) + '\n')
+            f.write('{не json}\n')
+            f.write(json.dumps({'name': 'Но-шпа', 'price': 150, 'quantity': 20, 'expiry_date': '2026-01-01'}) + '\n')
+        database = pharmacy28.MedicineDatabase()
+
+        result = import_medicines('store.jsonl', database, pharmacy28.Medicine)
+        self.assertEqual(result, (2, 1))
+        self.assertEqual([med.name for med in database.search('но')], ['Но-шпа'])
+        self.assertEqual(len(pharmacy28.MedicineDatabase()), 2)
+
+    def test_bad_files(self):
+        """Неизвестный формат и нехватка столбцов"""
+        with open('store.csv', 'w', encoding='utf-8') as f:
+            f.write("name,price\nАспирин,80\n")
+        with self.assertRaises(ValueError):
+            import_medicines('store.csv', pharmacy26.Pharmacy(), pharmacy26.Medicine)
+        with self.assertRaises(ValueError):
+            import_medicines('store.xlsx', pharmacy26.Pharmacy(), pharmacy26.Medicine)
+
+
+if __name__ == '__main__':
+    unittest.main()
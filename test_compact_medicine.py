@@ -0,0 +1,87 @@
+"""
+Модуль test_compact_medicine содержит тесты для компактных представлений лекарств
+"""
+
+import os
+import tempfile
+import unittest
+from compact_medicine import CompactMedicine, MedicineColumns
+from pharmacy26 import InvalidMedicineError, Medicine, OperationNotAllowedError, Pharmacy
+
+
+class TestCompactMedicine(unittest.TestCase):
+    """Тесты для CompactMedicine и MedicineColumns"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.medicine = CompactMedicine("Ибупрофен", 120, 30, "2025-01-01")
+
+    def test_no_instance_dict(self):
+        """У компактного лекарства нет __dict__"""
+        self.assertFalse(hasattr(self.medicine, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.medicine.color = "белый"
+
+    def test_medicine_api(self):
+        """Интерфейс совпадает с pharmacy26.Medicine"""
+        self.medicine + 10
+        self.medicine - 5
+        self.assertEqual(self.medicine.quantity, 35)
+        self.assertEqual([t['operation'] for t in self.medicine.get_transactions()],
+                         ['Пополнение', 'Продажа'])
+        self.assertEqual((self.medicine * 1.5).price, 180)
+        self.assertIn("Ибупрофен", str(self.medicine))
+
+        with self.assertRaises(OperationNotAllowedError):
+            self.medicine.sell(100)
+        with self.assertRaises(InvalidMedicineError):
+            self.medicine.price = -1
+        with self.assertRaises(InvalidMedicineError):
+            CompactMedicine("Аспирин", 10, 1, "завтра")
+
+    def test_in_pharmacy(self):
+        """Компактное лекарство добавляется в аптеку, переоценивается и сохраняется"""
+        pharmacy = Pharmacy("Тестовая аптека")
+        pharmacy.add_medicine(self.medicine)
+        pharmacy.add_many([CompactMedicine("Аспирин", 80, 50, "2024-06-01"), Medicine("Нурофен", 200, 5)])
+        self.assertEqual(pharmacy.get_medicine(self.medicine.id), self.medicine)
+        pharmacy.reprice(2)
+        self.assertEqual(self.medicine.price, 240)
+        self.medicine.expiry_date = "2023-01-01"
+        self.assertEqual(pharmacy.expiring_before("2023-06-01"), [self.medicine])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'pharmacy.pkl')
+            pharmacy.save_to_file(path)
+            self.medicine.sell(5)
+            pharmacy.save_to_file(path, incremental=True)
+            loaded = Pharmacy.load_from_file(path)
+        medicine = loaded.get_medicine(self.medicine.id)
+        self.assertIsInstance(medicine, CompactMedicine)
+        self.assertEqual((medicine.price, medicine.quantity), (240, 25))
+        self.assertEqual([t['operation'] for t in medicine.get_transactions()], ['Продажа'])
+        self.assertEqual(len(list(medicine.iter_transactions())), 1)
+        self.assertEqual(pharmacy.remove_many([self.medicine]), [self.medicine])
+
+    def test_columns(self):
+        """Колоночное хранилище хранит строки и продает из них"""
+        columns = MedicineColumns()
+        row = columns.append("Аспирин", 80.0, 50, "2025-05-30")
+        self.assertEqual(len(columns), 1)
+        columns.sell(row, 10)
+        self.assertEqual(columns.row(row)[1:4], ("Аспирин", 80.0, 40))
+        with self.assertRaises(OperationNotAllowedError):
+            columns.sell(row, 100)
+        with self.assertRaises(InvalidMedicineError):
+            columns.append("Аспирин", 80.0, -1, "2025-05-30")
+
+    def test_columns_from_medicines(self):
+        """Хранилище строится из существующих лекарств с их ID"""
+        columns = MedicineColumns.from_medicines([self.medicine, Medicine("Аспирин", 80, 50)])
+        self.assertEqual(columns.ids[0], self.medicine.id)
+        self.assertEqual(columns.names, ["Ибупрофен", "Аспирин"])
+        self.assertGreater(columns.nbytes(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
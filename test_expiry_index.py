@@ -0,0 +1,80 @@
+"""
+Модуль test_expiry_index содержит тесты для индекса сроков годности
+"""
+
+import unittest
+from datetime import date
+from expiry_index import ExpiryIndex, add_watcher, expiry_ordinal, notify_watchers
+
+
+class TestExpiryIndex(unittest.TestCase):
+    """Тесты для ExpiryIndex"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.index = ExpiryIndex()
+        for name, day in [("Б", "2024-03-01"), ("А", "2024-01-15"), ("В", "2024-03-01"), ("Г", "2025-01-01")]:
+            self.index.add(name, expiry_ordinal(day))
+
+    def test_expiry_ordinal(self):
+        """Строка и объект date дают одинаковый номер дня"""
+        self.assertEqual(expiry_ordinal("2024-03-01"), date(2024, 3, 1).toordinal())
+        with self.assertRaises(ValueError):
+            expiry_ordinal("31.12.2024")
+
+    def test_before(self):
+        """Запрос возвращает объекты со сроком строго раньше даты, от старых к новым"""
+        self.assertEqual(self.index.before("2024-03-01"), ["А"])
+        self.assertEqual(self.index.before(date(2024, 3, 2)), ["А", "Б", "В"])
+        self.assertEqual(self.index.before("2000-01-01"), [])
+
+    def test_remove_and_pop_before(self):
+        """Удаление одного объекта и списание всех до даты"""
+        self.assertTrue(self.index.remove("Б"))
+        self.assertFalse(self.index.remove("Б"))
+        self.assertEqual(self.index.pop_before("2024-12-31"), ["А", "В"])
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.before("2030-01-01"), ["Г"])
+
+    def test_move(self):
+        """Смена срока годности переставляет объект; отсутствующий объект не добавляется"""
+        self.assertTrue(self.index.move("Г", expiry_ordinal("2024-01-01")))
+        self.assertEqual(self.index.before("2024-03-01"), ["Г", "А"])
+        self.assertFalse(self.index.move("Д", expiry_ordinal("2024-01-01")))
+        self.assertEqual(len(self.index), 4)
+
+    def test_watchers(self):
+        """Объект хранит кортеж слабых ссылок на свои индексы, без повторов и мертвых ссылок"""
+        other = ExpiryIndex()
+        other.add("Б", expiry_ordinal("2024-03-01"))
+        watchers = add_watcher(add_watcher((), self.index), self.index)
+        watchers = add_watcher(watchers, other)
+        self.assertEqual(len(watchers), 2)
+        notify_watchers(watchers, "Б", expiry_ordinal("2023-01-01"))
+        self.assertEqual(self.index.before("2024-01-01"), ["Б"])
+        self.assertEqual(other.before("2024-01-01"), ["Б"])
+        del other
+        self.assertEqual(add_watcher(watchers, self.index), watchers[:1])
+
+    def test_add_many(self):
+        """Пачка объектов добавляется с одной сортировкой"""
+        self.index.add_many([("Д", expiry_ordinal("2024-02-01")), ("Е", expiry_ordinal("2023-01-01"))])
+        self.assertEqual(self.index.before("2024-03-01"), ["Е", "А", "Д"])
+        self.assertTrue(self.index.remove("Д"))
+
+    def test_old_pickle(self):
+        """Индекс из снимка прежнего формата (отсортированный список записей) раскладывается по дням"""
+        index = ExpiryIndex.__new__(ExpiryIndex)
+        index.__setstate__({'_entries': [(1, 0, "А"), (2, 2, "В"), (2, 1, "Б")], '_keys': {}, '_seq': 3})
+        self.assertEqual(index.before(date.fromordinal(3)), ["А", "В", "Б"])
+        self.assertTrue(index.remove("В"))
+        self.assertEqual(len(index), 2)
+
+    def test_remove_many(self):
+        """Удаление нескольких объектов за один проход"""
+        self.assertEqual(self.index.remove_many(["А", "В", "Д"]), 2)
+        self.assertEqual(self.index.before("2030-01-01"), ["Б", "Г"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Модуль test_history содержит тесты для потокового чтения истории по курсору
+"""
+
+import unittest
+from datetime import datetime
+from history import decode_cursor, encode_cursor, iter_list_history
+from journal import TransactionJournal
+
+
+class TestHistory(unittest.TestCase):
+    """Тесты для курсоров истории"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.items = [{'datetime': datetime(2024, 1, day), 'operation': 'Добавление лекарства', 'details': day}
+                      for day in range(1, 11)]
+
+    def test_cursor(self):
+        """Курсор кодирует сквозной номер, неверный курсор отклоняется"""
+        self.assertEqual(decode_cursor(encode_cursor(12345)), 12345)
+        self.assertEqual(decode_cursor(None), 0)
+        for cursor in ['12', 'hxyz', 'h-1', 5]:
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+        with self.assertRaises(ValueError):
+            iter_list_history(self.items, cursor='bad')
+
+    def test_pages(self):
+        """Постраничное чтение с продолжением с курсора"""
+        pages, cursor = [], None
+        while True:
+            page = list(iter_list_history(self.items, cursor, limit=4))
+            if not page:
+                break
+            pages.append([transaction['details'] for _, transaction in page])
+            cursor = page[-1][0]
+        self.assertEqual(pages, [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]])
+
+        # Новые записи видны с последнего курсора
+        self.items.append({'datetime': datetime(2024, 2, 1), 'operation': 'Удаление лекарства', 'details': 11})
+        self.assertEqual([t['details'] for _, t in iter_list_history(self.items, cursor)], [11])
+
+    def test_since(self):
+        """Чтение с момента времени"""
+        since = datetime(2024, 1, 8)
+        self.assertEqual([t['details'] for _, t in iter_list_history(self.items, since=since, limit=2)], [8, 9])
+
+    def test_ring_buffer_journal(self):
+        """Курсор переживает вытеснение записей кольцевым буфером"""
+        journal = TransactionJournal(capacity=3)
+        for amount in range(1, 4):
+            journal.append('Продажа', 100, 100 - amount, amount)
+        cursor = list(journal.iter_transactions(limit=2))[-1][0]
+        for amount in range(4, 6):
+            journal.append('Пополнение', 0, amount, amount)
+        self.assertEqual([t['amount'] for _, t in journal.iter_transactions(cursor)], [3, 4, 5])
+
+        # Вытесненные записи пропускаются, курсоры остаются сквозными
+        journal.append('Продажа', 5, 4, 6)
+        page = list(journal.iter_transactions(cursor))
+        self.assertEqual([t['amount'] for _, t in page], [4, 5, 6])
+        self.assertEqual(decode_cursor(page[-1][0]), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Модуль test_id_allocator содержит тесты для выдачи уникальных идентификаторов
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from id_allocator import IdAllocator
+
+
+def allocate_ids(path, count, queue):
+    """Выдает count ID в отдельном процессе и передает их через очередь"""
+    allocator = IdAllocator(path, block_size=50)
+    queue.put([allocator.next_id() for _ in range(count)])
+
+
+class TestIdAllocator(unittest.TestCase):
+    """Тесты для IdAllocator"""
+
+    def setUp(self):
+        """Подготовка временного файла с верхней границей ID"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'ids.hwm')
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        self.tmpdir.cleanup()
+
+    def test_in_memory(self):
+        """Без файла ID идут подряд с единицы, reset начинает заново"""
+        allocator = IdAllocator()
+        self.assertEqual([allocator.next_id() for _ in range(3)], [1, 2, 3])
+        allocator.reset()
+        self.assertEqual(allocator.next_id(), 1)
+
+    def test_advance(self):
+        """Нумерация продолжается после уже использованных ID"""
+        allocator = IdAllocator()
+        allocator.advance(41)
+        allocator.advance(7)
+        self.assertEqual(allocator.next_id(), 42)
+
+        persistent = IdAllocator(self.path, block_size=10)
+        self.assertEqual(persistent.next_id(), 1)
+        persistent.advance(5)
+        self.assertEqual(persistent.next_id(), 6)
+        persistent.advance(500)
+        self.assertEqual(persistent.next_id(), 501)
+        self.assertEqual(IdAllocator(self.path, block_size=10).next_id(), 511)
+
+    def test_threads_get_unique_ids(self):
+        """Несколько потоков не получают одинаковых ID"""
+        allocator = IdAllocator(self.path, block_size=10)
+        results = [[] for _ in range(8)]
+
+        def worker(out):
+            for _ in range(1000):
+                out.append(allocator.next_id())
+
+        threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids = [i for out in results for i in out]
+        self.assertEqual(len(set(ids)), 8000)
+
+    def test_numbering_survives_restart(self):
+        """После «перезапуска» нумерация продолжается за зарезервированным блоком"""
+        first = IdAllocator(self.path, block_size=100)
+        self.assertEqual(first.next_id(), 1)
+        second = IdAllocator(self.path, block_size=100)
+        self.assertEqual(second.next_id(), 101)
+        self.assertEqual(first.next_id(), 2)
+
+    def test_processes_get_disjoint_ids(self):
+        """Процессы с общим файлом получают непересекающиеся ID"""
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=allocate_ids, args=(self.path, 500, queue))
+                     for _ in range(3)]
+        for p in processes:
+            p.start()
+        ids = [i for _ in processes for i in queue.get(timeout=30)]
+        for p in processes:
+            p.join()
+        self.assertEqual(len(set(ids)), 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Модуль test_journal содержит тесты для журнала операций на типизированных массивах
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+from datetime import datetime
+from journal import JournalView, Operation, TransactionJournal, make_journal
+
+
+class TestTransactionJournal(unittest.TestCase):
+    """Тесты для TransactionJournal"""
+
+    def fill(self, journal, count):
+        for i in range(count):
+            journal.append('Пополнение', i, i + 1, 1)
+
+    def test_view_keeps_transaction_format(self):
+        """Представление отдает словари в прежнем формате"""
+        journal = TransactionJournal()
+        journal.append('Продажа', 30, 25, 5)
+        journal.append(Operation.RESTOCK, 25, 35, 10)
+        view = journal.view()
+
+        self.assertIsInstance(view, JournalView)
+        self.assertEqual(len(view), 2)
+        self.assertEqual(view[0]['operation'], 'Продажа')
+        self.assertIsInstance(view[0]['datetime'], datetime)
+        self.assertEqual([t['new_value'] for t in view], [25, 35])
+        self.assertEqual(view[-1]['amount'], 10)
+
+        # Представление живое: новые записи видны без повторного вызова
+        journal.append('Продажа', 35, 34, 1)
+        self.assertEqual(len(view), 3)
+
+    def test_ring_buffer_keeps_last_records(self):
+        """С ограничением без файла хранятся только последние записи"""
+        journal = TransactionJournal(capacity=3)
+        self.fill(journal, 5)
+        self.assertEqual(len(journal), 3)
+        self.assertEqual([t['old_value'] for t in journal.view()], [2, 3, 4])
+        self.assertEqual(journal.view()[0]['old_value'], 2)
+
+    def test_spill_to_disk_keeps_full_history(self):
+        """С файлом вытесненные записи остаются доступны"""
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = TransactionJournal(capacity=4, spill_path=os.path.join(tmp, 'm.journal'))
+            self.fill(journal, 10)
+            self.assertEqual(len(journal._times), 2)
+            self.assertEqual(len(journal), 10)
+            self.assertEqual([t['old_value'] for t in journal.view()], list(range(10)))
+            self.assertEqual(journal.view()[5]['new_value'], 6)
+            self.assertEqual([t['old_value'] for t in journal.view()[3:6]], [3, 4, 5])
+
+    def test_spill_files_are_not_shared(self):
+        """Журналы лекарств с одним ID выгружаются в разные файлы и не портят друг друга"""
+        with tempfile.TemporaryDirectory() as tmp:
+            loaded = pickle.loads(pickle.dumps(make_journal(1, capacity=2, spill_dir=tmp)))
+            self.fill(loaded, 3)
+            fresh = make_journal(1, capacity=2, spill_dir=tmp)
+            self.assertNotEqual(fresh.spill_path, loaded.spill_path)
+            self.fill(fresh, 5)
+            self.fill(loaded, 2)
+            self.assertEqual([t['old_value'] for t in loaded.view()], [0, 1, 2, 0, 1])
+            self.assertEqual(len(os.listdir(tmp)), 2)
+
+    def test_loaded_journal_spills_to_own_file(self):
+        """Журнал из старого снимка не читает записи, выгруженные живым журналом после снимка"""
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = make_journal(1, capacity=2, spill_dir=tmp)
+            self.fill(journal, 4)
+            snapshot = pickle.dumps(journal)
+            self.fill(journal, 3)
+            loaded = pickle.loads(snapshot)
+            for value in (100, 200, 300):
+                loaded.append('Пополнение', 0, value, value)
+            journal.append('Продажа', 3, 1.5, 1.5)  # перевод в double не трогает файл снимка
+
+            self.assertEqual([t['new_value'] for t in loaded.view()], [1, 2, 3, 4, 100, 200, 300])
+            self.assertEqual([t['new_value'] for t in journal.view()], [1, 2, 3, 4, 1, 2, 3, 1.5])
+            self.assertEqual([t['new_value'] for t in pickle.loads(snapshot).view()], [1, 2, 3, 4])
+
+    def test_fractional_values(self):
+        """Дробное значение переводит журнал и файл выгрузки в double"""
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = TransactionJournal(capacity=2, spill_path=os.path.join(tmp, 'm.journal'))
+            self.fill(journal, 3)
+            journal.append('Продажа', 3, 1.5, 1.5)
+            journal.append('Продажа', 1.5, 0.5, 1)
+            self.assertEqual([t['new_value'] for t in journal.view()], [1, 2, 3, 1.5, 0.5])
+            self.assertEqual(journal.view()[1]['old_value'], 1)
+            with self.assertRaises(TypeError):
+                journal.append('Продажа', None, 0, 1)
+            self.assertEqual(len(journal), 5)
+
+    def test_pickle(self):
+        """Журнал сохраняется и загружается вместе с лекарством"""
+        journal = TransactionJournal()
+        self.fill(journal, 3)
+        loaded = pickle.loads(pickle.dumps(journal))
+        self.assertEqual(list(loaded.view()), list(journal.view()))
+
+    def test_invalid_options(self):
+        """Недопустимые параметры журнала"""
+        with self.assertRaises(ValueError):
+            TransactionJournal(capacity=0)
+        with self.assertRaises(ValueError):
+            TransactionJournal(spill_path='m.journal')
+
+
+if __name__ == '__main__':
+    unittest.main()
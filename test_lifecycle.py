@@ -0,0 +1,72 @@
+"""
+Модуль test_lifecycle содержит тесты для реестра живых объектов
+"""
+
+import gc
+import sys
+import unittest
+import weakref
+from lifecycle import LifecycleRegistry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Closable:
+    """Объект, который запоминает вызовы _safe_close"""
+
+    closed = []
+
+    def __init__(self, name):
+        self.name = name
+
+    def _safe_close(self):
+        Closable.closed.append(self.name)
+
+
+class TestLifecycleRegistry(unittest.TestCase):
+    """Тесты для LifecycleRegistry"""
+
+    def setUp(self):
+        """Подготовка реестра"""
+        Closable.closed = []
+        self.registry = LifecycleRegistry()
+
+    def test_shutdown_closes_live_objects_once(self):
+        """При выходе закрываются только живые объекты, и только один раз"""
+        alive = Closable("живой")
+        dead = Closable("удаленный")
+        self.registry.register(alive)
+        self.registry.register(dead)
+        dead_ref = weakref.ref(dead)
+        del dead
+        gc.collect()
+
+        self.assertIsNone(dead_ref())
+        self.assertEqual(len(self.registry), 1)
+        self.registry.shutdown()
+        self.registry.shutdown()
+        self.assertEqual(Closable.closed, ["живой"])
+        self.assertTrue(self.registry.shut_down)
+
+    @unittest.skipIf(resource is None, "нужен модуль resource")
+    def test_flat_rss_for_temporary_objects(self):
+        """Миллион временных объектов не увеличивает пиковый RSS процесса"""
+        def peak_rss():
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return rss if sys.platform == 'darwin' else rss * 1024  # в Linux — килобайты
+
+        for i in range(100_000):
+            self.registry.register(Closable(i))
+        baseline = peak_rss()
+        for i in range(1_000_000):
+            self.registry.register(Closable(i))
+        # При закреплении объектов (как с atexit) рост составил бы сотни мегабайт
+        self.assertLess(peak_rss() - baseline, 8 * 1024 * 1024)
+        self.assertEqual(len(self.registry), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Модуль test_log_sink содержит тесты для буферизованного журнала
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from log_sink import LogSink
+
+
+class TestLogSink(unittest.TestCase):
+    """Тесты для LogSink"""
+
+    def setUp(self):
+        """Подготовка временного каталога и журнала"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'test.log')
+        self.sink = LogSink(maxsize=100, batch_size=50)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        self.sink.close()
+        self.tmpdir.cleanup()
+
+    def read_lines(self):
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_flush_writes_all_records(self):
+        """После flush все записи из нескольких потоков находятся в файле"""
+        def worker(n):
+            for i in range(500):
+                self.sink.write(self.path, f"поток {n} запись {i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.sink.flush()
+
+        # При переполнении очереди записи идут в файл сразу, поэтому порядок строк не проверяем
+        messages = sorted(line.split(": ", 1)[1] for line in self.read_lines())
+        self.assertEqual(messages, sorted(f"поток {n} запись {i}" for n in range(4) for i in range(500)))
+
+    def test_full_queue_writes_directly(self):
+        """При полной очереди write не ждет фоновый поток, а пишет сразу"""
+        sink = LogSink(maxsize=2)
+        sink._thread = threading.Thread(target=lambda: None)  # поток, который не разбирает очередь
+        for i in range(3):
+            sink.write(self.path, f"запись {i}")
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertTrue(self.read_lines()[0].endswith("запись 2"))
+
+    def test_close_flushes_and_falls_back_to_direct_write(self):
+        """close сбрасывает очередь, после закрытия запись идет сразу в файл"""
+        self.sink.write(self.path, "до закрытия")
+        self.sink.close()
+        self.assertEqual(len(self.read_lines()), 1)
+
+        self.sink.write(self.path, "после закрытия")
+        self.assertIn("после закрытия", self.read_lines()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Модуль test_mapped_store содержит тесты для формата аптеки с индексом
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import mapped_store
+from mapped_store import MappedPharmacy, save_mapped
+from pharmacy26 import Medicine, OperationNotAllowedError, Pharmacy
+
+
+class TestMappedStore(unittest.TestCase):
+    """Тесты для save_mapped и MappedPharmacy"""
+
+    def setUp(self):
+        """Подготовка аптеки и временного файла"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'pharmacy.idx')
+        self.pharmacy = Pharmacy("Тестовая Аптека")
+        self.medicines = [Medicine(f"Лекарство {i}", 10 * i, 100, "2025-01-01") for i in range(50)]
+        for med in self.medicines:
+            self.pharmacy.add_medicine(med)
+        self.medicines[7].sell(3)
+        self.medicines[7].restock(5)
+        save_mapped(self.pharmacy, self.path)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        self.tmpdir.cleanup()
+
+    def test_lazy_access(self):
+        """Лекарства разбираются только при обращении"""
+        with MappedPharmacy(self.path) as mapped:
+            self.assertEqual(mapped.name, "Тестовая Аптека")
+            self.assertEqual(len(mapped), 50)
+            self.assertEqual(mapped.loaded, 0)
+
+            med = mapped.get(self.medicines[7].id)
+            self.assertEqual(mapped.loaded, 1)
+            self.assertEqual((med.name, med.price, med.quantity), ("Лекарство 7", 70, 102))
+            self.assertEqual([t['operation'] for t in med.get_transactions()], ['Продажа', 'Пополнение'])
+            self.assertIs(mapped[7], med)
+            self.assertIsNone(mapped.get(-1))
+
+    def test_full_load(self):
+        """Полная загрузка дает обычную аптеку с теми же данными"""
+        with MappedPharmacy(self.path) as mapped:
+            pharmacy = mapped.to_pharmacy()
+        self.assertEqual([m.id for m in pharmacy.medicines], [m.id for m in self.medicines])
+        self.assertEqual(len(pharmacy.get_transactions()), 50)
+        pharmacy.medicines[0].sell(1)
+        self.assertEqual(pharmacy.medicines[0].quantity, 99)
+
+    def test_load_from_file(self):
+        """Pharmacy.load_from_file открывает файл с индексом, журналы разбираются при обращении"""
+        pharmacy = Pharmacy.load_from_file(self.path)
+        self.assertIsInstance(pharmacy, Pharmacy)
+        self.assertEqual(len(pharmacy.medicines), 50)
+        med = pharmacy.get_medicine(self.medicines[7].id)
+        self.assertIsNotNone(med.get_transactions()._journal._packed)
+        self.assertEqual([t['operation'] for t in med.get_transactions()], ['Продажа', 'Пополнение'])
+        self.assertEqual(pharmacy.expiring_before("2100-01-01"), pharmacy.medicines.snapshot())
+
+    def test_fractional_journal(self):
+        """Журнал с дробными значениями сохраняется в double и читается обратно"""
+        self.medicines[3].sell(1.5)
+        save_mapped(self.pharmacy, self.path)
+        with MappedPharmacy(self.path) as mapped:
+            self.assertEqual([t['new_value'] for t in mapped[3].get_transactions()], [98.5])
+            self.assertEqual([t['new_value'] for t in mapped[7].get_transactions()], [97, 102])
+
+    def test_failed_save_removes_tmp(self):
+        """Ошибка при записи не оставляет временный файл и не портит прежний"""
+        with mock.patch.object(mapped_store, 'pack_records', side_effect=RuntimeError("сбой")):
+            with self.assertRaises(RuntimeError):
+                save_mapped(self.pharmacy, self.path)
+        self.assertEqual(os.listdir(self.tmpdir.name), ['pharmacy.idx'])
+        with MappedPharmacy(self.path) as mapped:
+            self.assertEqual(len(mapped), 50)
+
+    def test_invalid_files(self):
+        """Неверное расширение или формат файла"""
+        with self.assertRaises(OperationNotAllowedError):
+            save_mapped(self.pharmacy, os.path.join(self.tmpdir.name, 'pharmacy.pkl'))
+        bad = os.path.join(self.tmpdir.name, 'bad.idx')
+        with open(bad, 'wb') as f:
+            f.write(b'\0' * 64)
+        with self.assertRaises(OperationNotAllowedError):
+            MappedPharmacy(bad)
+
+
+if __name__ == '__main__':
+    unittest.main()
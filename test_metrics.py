@@ -0,0 +1,111 @@
+"""
+Модуль test_metrics содержит тесты для реестра метрик
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from metrics import Counter, Histogram, MetricsRegistry, merge_prometheus
+
+
+class TestMetrics(unittest.TestCase):
+    """Тесты для Histogram и MetricsRegistry"""
+
+    def test_percentiles(self):
+        """Перцентили оцениваются по границам корзин"""
+        histogram = Histogram(bounds=(10, 100, 1000))
+        for value in [5] * 50 + [50] * 45 + [500] * 4 + [5000]:
+            histogram.observe(value)
+        self.assertEqual(histogram.percentile(50), 10)
+        self.assertEqual(histogram.percentile(95), 100)
+        self.assertEqual(histogram.percentile(99), 1000)
+        self.assertEqual(histogram.percentile(100), 5000)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertEqual(snapshot['buckets'], {10: 50, 100: 45, 1000: 4, 'inf': 1})
+        self.assertEqual(Histogram().percentile(50), 0)
+
+    def test_timed(self):
+        """Декоратор записывает время, выключенный реестр не записывает"""
+        registry = MetricsRegistry()
+
+        @registry.timed()
+        def work(x):
+            return x * 2
+
+        self.assertEqual(work(2), 4)
+        registry.disable()
+        work(3)
+        registry.enable()
+        with self.assertRaises(TypeError):
+            work(None)
+        snapshot = registry.snapshot()
+        self.assertEqual(list(snapshot), ['TestMetrics.test_timed.<locals>.work'])
+        self.assertEqual(snapshot['TestMetrics.test_timed.<locals>.work']['count'], 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.json')
+            registry.dump(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['TestMetrics.test_timed.<locals>.work']['count'], 2)
+        registry.reset()
+        self.assertEqual(registry.histogram('TestMetrics.test_timed.<locals>.work').snapshot()['count'], 0)
+
+    def test_counter_threads(self):
+        """Увеличения из нескольких потоков не теряются"""
+        counter = Counter()
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value, 80000)
+        counter.reset()
+        self.assertEqual(counter.value, 0)
+
+    def test_prometheus_export(self):
+        """Экспорт в формате Prometheus и сложение файлов процессов"""
+        registry = MetricsRegistry()
+        registry.counter('Pharmacy.add_medicine').inc(3)
+        registry.histogram('Pharmacy.add_medicine').observe(1500)
+        text = registry.prometheus_text()
+        self.assertIn('pharmacy_calls_total{method="Pharmacy.add_medicine"} 3\n', text)
+        self.assertIn('pharmacy_call_duration_seconds_bucket{method="Pharmacy.add_medicine",le="1e-06"} 0\n', text)
+        self.assertIn('pharmacy_call_duration_seconds_bucket{method="Pharmacy.add_medicine",le="2e-06"} 1\n', text)
+        self.assertIn('pharmacy_call_duration_seconds_count{method="Pharmacy.add_medicine"} 1\n', text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second, total = (os.path.join(tmp, name) for name in ('1.prom', '2.prom', 'all.prom'))
+            registry.write_prometheus(first)
+            registry.counter('Supplier.add_supplied_medicine').inc()
+            registry.write_prometheus(second)
+            merge_prometheus([first, second], total)
+            with open(total, encoding='utf-8') as f:
+                merged = f.read()
+        self.assertEqual(merged.count('# TYPE pharmacy_calls_total counter'), 1)
+        self.assertIn('pharmacy_calls_total{method="Pharmacy.add_medicine"} 6\n', merged)
+        self.assertIn('pharmacy_calls_total{method="Supplier.add_supplied_medicine"} 1\n', merged)
+        self.assertIn('pharmacy_call_duration_seconds_count{method="Pharmacy.add_medicine"} 2\n', merged)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "нужен os.fork")
+    def test_fork_starts_from_zero(self):
+        """Дочерний процесс не наследует счет родителя"""
+        registry = MetricsRegistry()
+        registry.counter('calls').inc(5)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(registry.counter('calls').value)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertEqual(registry.counter('calls').value, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,13 @@ import unittest
 import os
 from datetime import datetime
 from pharmacy24 import Medicine, Pharmacy
+from log_sink import deletion_log
 import pickle
 
 
 class TestPharmacy(unittest.TestCase):
     def setUp(self):
-        Medicine._next_id = 1
+        Medicine.id_allocator.reset()
         self.test_medicine = Medicine("Ибупрофен", 120, 30)
         self.test_pharmacy = Pharmacy("Тестовая Аптека")
 
@@ -27,6 +28,7 @@ class TestPharmacy(unittest.TestCase):
         # Явно вызываем деструкторы
         med._safe_close()
         pharm._safe_close()
+        deletion_log.flush()  # Дожидаемся записи журнала фоновым потоком
 
         # Проверяем логи деструкторов
         self.assertTrue(os.path.exists('medicine_deleted.log'))
@@ -39,6 +41,22 @@ class TestPharmacy(unittest.TestCase):
             pharmacy_log = f.read()
         self.assertIn("Тестовая аптека для деструктора", pharmacy_log)
 
+    def test_fractional_quantity(self):
+        """Дробные количества попадают в журнал операций"""
+        medicine = Medicine("Сироп", 1, 2.5)
+        self.assertTrue(medicine.sell(1))
+        self.assertEqual(medicine.quantity, 1.5)
+        self.assertEqual(medicine.get_transactions()[0]['new_value'], 1.5)
+
+    def test_load_baseline_file(self):
+        """Лекарство из файла прежнего формата (журнал — список словарей) продается дальше"""
+        old = Medicine("Аспирин", 80, 50)
+        old.transactions = [{'datetime': datetime(2024, 1, 2), 'operation': 'Продажа',
+                             'old_value': 55, 'new_value': 50, 'amount': 5}]
+        loaded = pickle.loads(pickle.dumps(old))
+        self.assertTrue(loaded.sell(10))
+        self.assertEqual([t['new_value'] for t in loaded.get_transactions()], [50, 40])
+
     def tearDown(self):
         # Удаляем временные файлы после тестов
         for filename in ['test_pharmacy.pkl', 'medicine_deleted.log', 'pharmacy_deleted.log']:
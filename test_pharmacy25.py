@@ -7,7 +7,7 @@ import pickle
 
 class TestPharmacy(unittest.TestCase):
     def setUp(self):
-        Medicine._Medicine__next_id = 1  # Доступ к приватному атрибуту
+        Medicine.id_allocator.reset()
         self.test_medicine = Medicine("Ибупрофен", 120, 30)
         self.test_pharmacy = Pharmacy("Тестовая Аптека")
 
@@ -7,17 +7,32 @@
 
 import unittest
 import os
-from datetime import datetime
+import gc
+import subprocess
+import sys
+import weakref
+from datetime import date, datetime
 from pharmacy26 import Medicine, Pharmacy, InvalidMedicineError, OperationNotAllowedError
 import pickle
 
 
+class LegacyObject:
+    """Сохраняется как объект cls с состоянием state — так, как его записывала прежняя версия модуля"""
+
+    def __init__(self, cls, state):
+        self.cls = cls
+        self.state = state
+
+    def __reduce__(self):
+        return self.cls.__new__, (self.cls,), self.state
+
+
 class TestPharmacy(unittest.TestCase):
     """Тесты для классов аптеки"""
 
     def setUp(self):
         """Подготовка тестовых данных"""
-        Medicine._Medicine__next_id = 1
+        Medicine.id_allocator.reset()
         self.test_medicine = Medicine("Ибупрофен", 120, 30)
         self.test_pharmacy = Pharmacy("Тестовая Аптека")
 
@@ -82,6 +97,12 @@ class TestPharmacy(unittest.TestCase):
         self.test_pharmacy + med1 + med2
         self.assertEqual(len(self.test_pharmacy.medicines), 2)
 
+    def test_temporary_medicines_are_freed(self):
+        """Временные лекарства из операторов * и / не удерживаются в памяти"""
+        refs = [weakref.ref(self.test_medicine * 2), weakref.ref(self.test_medicine / 2)]
+        gc.collect()
+        self.assertEqual([ref() for ref in refs], [None, None])
+
     def test_medicine_creation(self):
         """Тестирование создания лекарства"""
         self.assertEqual(self.test_medicine.name, "Ибупрофен")
@@ -110,6 +131,19 @@ class TestPharmacy(unittest.TestCase):
         with self.assertRaises(InvalidMedicineError):
             self.test_medicine.sell(-1)
 
+    def test_journal_created_on_first_operation(self):
+        """Журнал операций создается только при первой операции или обращении к истории"""
+        self.assertIsNone(self.test_medicine._Medicine__transactions)
+        self.assertEqual(list(self.test_medicine.iter_transactions()), [])
+        self.assertEqual(list(self.test_medicine.journal_records()), [])
+        self.assertEqual(self.test_medicine.journal_position, 0)
+        self.assertIsNone(self.test_medicine._Medicine__transactions)
+
+        history = self.test_medicine.get_transactions()
+        self.test_medicine.sell(5)
+        self.assertEqual([t['amount'] for t in history], [5])
+        self.assertEqual(self.test_medicine.journal_position, 1)
+
     def test_pharmacy_operations(self):
         """Тестирование операций аптеки"""
         self.test_pharmacy.add_medicine(self.test_medicine)
@@ -118,6 +152,123 @@ class TestPharmacy(unittest.TestCase):
         with self.assertRaises(InvalidMedicineError):
             self.test_pharmacy.add_medicine("Не лекарство")
 
+    def test_storage_by_id(self):
+        """Тестирование поиска и удаления лекарств по ID"""
+        line = [Medicine(f"Лекарство {i}", 10, 1) for i in range(1000)]
+        for med in line:
+            self.test_pharmacy.add_medicine(med)
+        self.test_pharmacy.add_medicine(self.test_medicine)
+        self.assertIs(self.test_pharmacy.get_medicine(line[500].id), line[500])
+        self.assertIsNone(self.test_pharmacy.get_medicine(-1))
+        with self.assertRaises(OperationNotAllowedError):
+            self.test_pharmacy.add_medicine(self.test_medicine)
+
+        # Удаление всей линейки: лекарствами и ID вперемешку, лишние пропускаются
+        removed = self.test_pharmacy.remove_many(line[:500] + [med.id for med in line[500:]] + [-1])
+        self.assertEqual(len(removed), 1000)
+        self.assertEqual(self.test_pharmacy.medicines, [self.test_medicine])
+        self.assertEqual(self.test_pharmacy.expiring_before("2030-01-01"), [self.test_medicine])
+        self.assertEqual(self.test_pharmacy.get_transactions()[-1]['operation'], 'Удаление лекарств')
+        self.assertEqual(self.test_pharmacy.remove_many(line[:10]), [])
+
+    def test_live_views(self):
+        """Тестирование живых представлений только для чтения"""
+        medicines = self.test_pharmacy.medicines
+        transactions = self.test_pharmacy.get_transactions()
+        self.test_pharmacy + self.test_medicine
+        self.assertEqual(medicines, [self.test_medicine])
+        self.assertIn(self.test_medicine, medicines)
+        self.assertEqual(len(transactions), 1)
+
+        snapshot = medicines.snapshot()
+        self.test_pharmacy - self.test_medicine
+        self.assertEqual(len(medicines), 0)
+        self.assertEqual(snapshot, [self.test_medicine])
+        with self.assertRaises(AttributeError):
+            medicines.append(self.test_medicine)
+        with self.assertRaises(TypeError):
+            transactions[0] = None
+
+    def test_transaction_cursor(self):
+        """Тестирование потокового чтения истории по курсору"""
+        for _ in range(5):
+            self.test_medicine.sell(1)
+        page = list(self.test_medicine.iter_transactions(limit=3))
+        self.assertEqual([t['new_value'] for _, t in page], [29, 28, 27])
+        rest = list(self.test_medicine.iter_transactions(page[-1][0]))
+        self.assertEqual([t['new_value'] for _, t in rest], [26, 25])
+
+        self.test_pharmacy + self.test_medicine
+        cursor, transaction = next(self.test_pharmacy.iter_transactions())
+        self.assertEqual(transaction['operation'], 'Добавление лекарства')
+        self.assertEqual(list(self.test_pharmacy.iter_transactions(cursor)), [])
+
+    def test_reprice(self):
+        """Тестирование переоценки ассортимента"""
+        vitamin = Medicine("Витамин C", 100, 10)
+        self.test_pharmacy + self.test_medicine + vitamin
+        version = vitamin.version
+
+        self.assertEqual(self.test_pharmacy.reprice(1.03, ndigits=2), 2)
+        self.assertEqual(self.test_medicine.price, 123.6)
+        self.assertEqual(vitamin.version, version + 1)
+
+        categories = {"Витамин C": 'витамины'}
+        self.test_pharmacy.reprice(factors={'витамины': 0.5}, key=lambda med: categories.get(med.name))
+        self.assertEqual([m.price for m in self.test_pharmacy.medicines], [123.6, 51.5])
+        self.assertEqual([m.id for m in self.test_pharmacy.medicines], [self.test_medicine.id, vitamin.id])
+        self.assertEqual(self.test_pharmacy.get_transactions()[-1]['operation'], 'Переоценка')
+
+        # При ошибке в таблице множителей цены не меняются
+        with self.assertRaises(InvalidMedicineError):
+            self.test_pharmacy.reprice(factors={'витамины': -1}, key=lambda med: 'витамины')
+        with self.assertRaises(InvalidMedicineError):
+            self.test_pharmacy.reprice(factors={'витамины': 2})
+        self.assertEqual(vitamin.price, 51.5)
+
+    def test_expiry_queries(self):
+        """Тестирование запросов по сроку годности"""
+        old = Medicine("Аспирин", 80, 50, "2024-01-10")
+        soon = Medicine("Парацетамол", 50, 100, "2024-06-01")
+        fresh = Medicine("Но-шпа", 150, 20, "2026-01-01")
+        self.test_pharmacy + fresh + old + soon
+
+        self.assertEqual(self.test_pharmacy.expiring_before("2024-07-01"), [old, soon])
+        self.assertEqual(self.test_pharmacy.expired("2024-06-01"), [old])
+
+        # Удаленное лекарство пропадает из индекса
+        self.test_pharmacy - soon
+        self.assertEqual(self.test_pharmacy.expiring_before("2025-01-01"), [old])
+
+        # Списание просроченных за один проход
+        self.assertEqual(self.test_pharmacy.remove_expired("2025-01-01"), [old])
+        self.assertEqual(self.test_pharmacy.medicines, [fresh])
+        self.assertEqual(self.test_pharmacy.get_transactions()[-1]['operation'],
+                         'Списание просроченных лекарств')
+
+        with self.assertRaises(InvalidMedicineError):
+            Medicine("Аспирин", 80, 50, "31.12.2024")
+
+    def test_expiry_date_change(self):
+        """Смена срока годности лекарства в аптеке учитывается индексом"""
+        fresh = Medicine("Но-шпа", 150, 20, "2026-01-01")
+        old = Medicine("Аспирин", 80, 50, "2024-01-10")
+        self.test_pharmacy + fresh + old
+        fresh.expiry_date = "2023-01-01"
+        old.expiry_date = "2027-01-01"
+        self.assertEqual(self.test_pharmacy.expired("2024-06-01"), [fresh])
+
+        # После загрузки из файла индекс по-прежнему следит за сроками
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        loaded.medicines[1].expiry_date = "2020-01-01"
+        self.assertEqual([med.name for med in loaded.remove_expired("2024-06-01")], ["Аспирин", "Но-шпа"])
+
+        # Удаленное лекарство больше не попадает в индекс аптеки
+        self.test_pharmacy - old
+        old.expiry_date = "2020-01-01"
+        self.assertEqual(self.test_pharmacy.expired("2024-06-01"), [fresh])
+
     def test_serialization(self):
         """Тестирование сериализации"""
         self.test_pharmacy.add_medicine(self.test_medicine)
@@ -129,9 +280,154 @@ class TestPharmacy(unittest.TestCase):
         with self.assertRaises(OperationNotAllowedError):
             self.test_pharmacy.save_to_file('test_pharmacy.txt')
 
+    def test_load_baseline_file(self):
+        """Файл прежнего формата (журнал — список словарей, лекарства — список) загружается"""
+        sold_at = datetime(2024, 1, 2, 3, 4, 5, 678901)
+        medicine = LegacyObject(Medicine, {
+            '_Medicine__id': 7, '_Medicine__name': "Аспирин", '_Medicine__price': 80,
+            '_Medicine__quantity': 45, '_Medicine__expiry_date': "2025-05-30",
+            '_Medicine__transactions': [{'datetime': sold_at, 'operation': 'Продажа',
+                                         'old_value': 50, 'new_value': 45, 'amount': 5}],
+        })
+        pharmacy = LegacyObject(Pharmacy, {
+            '_Pharmacy__name': "Старая аптека", '_Pharmacy__medicines': [medicine], '_Pharmacy__transactions': [],
+        })
+        with open('test_pharmacy.pkl', 'wb') as f:
+            pickle.dump(pharmacy, f)
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        aspirin = loaded.get_medicine(7)
+        self.assertEqual(aspirin.get_transactions()[0],
+                         {'datetime': sold_at, 'operation': 'Продажа', 'old_value': 50, 'new_value': 45, 'amount': 5})
+        self.assertTrue(aspirin.sell(5))
+        self.assertEqual([t['new_value'] for t in aspirin.get_transactions()], [45, 40])
+        self.assertEqual(aspirin.expiry_ordinal, date(2025, 5, 30).toordinal())
+        self.assertEqual(loaded.expiring_before("2026-01-01"), [aspirin])
+        loaded.save_to_file('test_pharmacy.pkl', incremental=True)
+
+        # Индекс сроков годности построен и следит за лекарствами
+        aspirin.expiry_date = "2024-06-01"
+        self.assertEqual(loaded.expiring_before("2025-01-01"), [aspirin])
+        newcomer = Medicine("Но-шпа", 150, 20, "2024-01-01")
+        loaded.add_medicine(newcomer)
+        self.assertEqual(loaded.expiring_before("2025-01-01"), [newcomer, aspirin])
+
+    def test_load_then_add_after_restart(self):
+        """После загрузки новое лекарство не получает ID загруженного и добавляется"""
+        self.test_pharmacy + self.test_medicine + Medicine("Аспирин", 80, 50, "2025-05-30")
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+        Medicine.id_allocator.reset()  # как после перезапуска программы
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        medicine = Medicine("Но-шпа", 150, 20, "2026-01-01")
+        loaded.add_medicine(medicine)
+        loaded.add_many([Medicine("Нурофен", 200, 5)])
+        self.assertEqual([med.id for med in loaded.medicines], [1, 2, 3, 4])
+
+    def test_load_then_add_in_new_process(self):
+        """Лекарство, добавленное после загрузки в другом процессе, получает новый ID"""
+        self.test_pharmacy + self.test_medicine + Medicine("Аспирин", 80, 50, "2025-05-30")
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+
+        code = ("from pharmacy26 import Medicine, Pharmacy\n"
+                "pharmacy = Pharmacy.load_from_file('test_pharmacy.pkl')\n"
+                "medicine = Medicine('Но-шпа', 150, 20, '2026-01-01')\n"
+                "pharmacy.add_medicine(medicine)\n"
+                "print(medicine.id)\n")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(int(result.stdout), 3)
+
+    def test_incremental_snapshots(self):
+        """Тестирование разностных снимков"""
+        aspirin = Medicine("Аспирин", 80, 50, "2025-05-30")
+        self.test_pharmacy + self.test_medicine + aspirin
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+
+        # Изменения после полного снимка
+        self.test_medicine.sell(5)
+        aspirin.price = 90
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.test_pharmacy - aspirin
+        self.test_pharmacy + Medicine("Но-шпа", 150, 20, "2026-01-01")
+        self.test_medicine.restock(10)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.assertTrue(os.path.exists('test_pharmacy.pkl.delta'))
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        self.assertEqual([m.name for m in loaded.medicines], ["Ибупрофен", "Но-шпа"])
+        ibuprofen = loaded.medicines[0]
+        self.assertEqual(ibuprofen.quantity, 35)
+        self.assertEqual([t['operation'] for t in ibuprofen.get_transactions()], ['Продажа', 'Пополнение'])
+        self.assertEqual(len(loaded.get_transactions()), len(self.test_pharmacy.get_transactions()))
+        self.assertEqual(loaded.expiring_before("2030-01-01"), loaded.medicines)
+
+        # Загруженная аптека продолжает сохраняться разностными снимками
+        ibuprofen.sell(1)
+        loaded.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.assertEqual(Pharmacy.load_from_file('test_pharmacy.pkl').medicines[0].quantity, 34)
+
+        # Полный снимок удаляет накопленные разностные
+        loaded.save_to_file('test_pharmacy.pkl')
+        self.assertFalse(os.path.exists('test_pharmacy.pkl.delta'))
+
+    def test_incremental_snapshot_skips_torn_segment(self):
+        """Недописанный разностный снимок пропускается при загрузке"""
+        self.test_pharmacy + self.test_medicine
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+        self.test_medicine.sell(5)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.test_medicine.sell(5)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+        with open('test_pharmacy.pkl.delta', 'r+b') as f:
+            f.truncate(os.path.getsize('test_pharmacy.pkl.delta') - 10)
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        self.assertEqual(loaded.medicines[0].quantity, 25)
+
+        # Оборванный снимок обрезан: следующий дописывается за целыми и читается
+        loaded.medicines[0].sell(1)
+        loaded.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.assertEqual(Pharmacy.load_from_file('test_pharmacy.pkl').medicines[0].quantity, 24)
+
+    def test_incremental_snapshot_bounded_journal(self):
+        """Новые операции попадают в разностный снимок и при журнале ограниченного размера"""
+        self.addCleanup(setattr, Medicine, 'journal_options', Medicine.journal_options)
+        Medicine.journal_options = {'capacity': 2}
+        aspirin = Medicine("Аспирин", 80, 50, "2025-05-30")
+        self.test_pharmacy + aspirin
+        for _ in range(3):
+            aspirin.sell(1)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+        aspirin.sell(1)
+        aspirin.sell(2)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl').get_medicine(aspirin.id)
+        self.assertEqual(loaded.quantity, 44)
+        self.assertEqual([t['new_value'] for t in loaded.get_transactions()], [46, 44])
+
+    def test_incremental_snapshot_old_format(self):
+        """Разностные снимки без рамок (прежний формат) читаются и переписываются"""
+        self.test_pharmacy + self.test_medicine
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl')
+        self.test_medicine.sell(5)
+        self.test_pharmacy.save_to_file('test_pharmacy.pkl', incremental=True)
+        with open('test_pharmacy.pkl.delta', 'rb') as f:
+            data = f.read()
+        with open('test_pharmacy.pkl.delta', 'wb') as f:
+            f.write(data[16:])  # без заголовка и рамки — как писала прежняя версия
+
+        loaded = Pharmacy.load_from_file('test_pharmacy.pkl')
+        self.assertEqual(loaded.medicines[0].quantity, 25)
+        loaded.medicines[0].sell(5)
+        loaded.save_to_file('test_pharmacy.pkl', incremental=True)
+        self.assertEqual(Pharmacy.load_from_file('test_pharmacy.pkl').medicines[0].quantity, 20)
+
     def tearDown(self):
         """Очистка после тестов"""
-        for filename in ['test_pharmacy.pkl', 'medicine_deleted.log', 'pharmacy_deleted.log']:
+        for filename in ['test_pharmacy.pkl', 'test_pharmacy.pkl.delta',
+                         'medicine_deleted.log', 'pharmacy_deleted.log']:
             if os.path.exists(filename):
                 os.remove(filename)
 
@@ -7,6 +7,7 @@
 
 import unittest
 from pharmacy27 import Pharmacy, Medicine, Supplier
+from metrics import metrics
 
 class TestPharmacySystem(unittest.TestCase):
     """Тесты для системы управления аптекой"""
@@ -57,6 +58,50 @@ class TestPharmacySystem(unittest.TestCase):
         self.assertEqual(len(self.pharmacy.medicines), 1)
         self.assertEqual(self.pharmacy.medicines[0].quantity, 80)
 
+    def test_restock_indexes(self):
+        """Тестирование индексов поставщиков и лекарств при пополнении"""
+        for i in range(1000):
+            self.pharmacy.add_supplier(Supplier(f"Поставщик {i}", "88001000101"))
+            self.pharmacy.add_medicine(Medicine(f"Лекарство {i}", 100, 1, "2025-01-01"))
+        self.pharmacy.add_supplier(self.supplier)
+        self.supplier.add_supplied_medicine("Лекарство 999")
+        self.assertTrue(self.supplier.supplies("Лекарство 999"))
+        self.assertFalse(self.supplier.supplies("Лекарство 1"))
+
+        self.pharmacy.restock_from_supplier(self.supplier, "Лекарство 999", 5)
+        self.assertEqual(self.pharmacy.medicines[999].quantity, 6)
+        self.assertIs(self.pharmacy.medicines[999].supplier, self.supplier)
+        with self.assertRaises(ValueError):
+            self.pharmacy.restock_from_supplier(self.supplier, "Лекарство 1", 5)
+
+    def test_restock_from_manifest(self):
+        """Тестирование пополнения по накладной"""
+        self.pharmacy.add_supplier(self.supplier)
+        self.pharmacy.add_medicine(self.medicine)
+        for name in ["Тестовое Лекарство", "Аспирин", "Ибупрофен"]:
+            self.supplier.add_supplied_medicine(name)
+
+        result = self.pharmacy.restock_from_manifest(
+            self.supplier, [("Тестовое Лекарство", 5), ("Аспирин", 100), ("Аспирин", 20)])
+        self.assertIn("пополнено позиций 2, единиц 125 (новых лекарств: 1)", result)
+        self.assertEqual(self.medicine.quantity, 15)
+        self.assertIs(self.medicine.supplier, self.supplier)
+        aspirin = self.pharmacy.medicines[-1]
+        self.assertEqual((aspirin.name, aspirin.quantity), ("Аспирин", 120))
+        self.assertIs(aspirin.supplier, self.supplier)
+
+        # Накладная с ошибками не меняет запасы
+        with self.assertRaises(ValueError) as context:
+            self.pharmacy.restock_from_manifest(
+                self.supplier, [("Ибупрофен", 10), ("Парацетамол", 5), ("Аспирин", 0)])
+        self.assertIn("строка 2", str(context.exception))
+        self.assertIn("строка 3", str(context.exception))
+        self.assertEqual(len(self.pharmacy.medicines), 2)
+        self.assertEqual(aspirin.quantity, 120)
+
+        with self.assertRaises(ValueError):
+            self.pharmacy.restock_from_manifest(Supplier("Чужой", "880"), [])
+
     def test_decorators(self):
         """Тестирование работы декораторов"""
         # Проверяем счетчик вызовов для add_supplied_medicine
@@ -69,6 +114,32 @@ class TestPharmacySystem(unittest.TestCase):
         self.pharmacy.add_supplier(self.supplier)
         self.assertEqual(self.pharmacy.get_call_count('add_supplier'), initial_count + 1)
 
+    def test_shared_call_counters(self):
+        """Общий счетчик вызовов складывается по всем объектам"""
+        counter = metrics.counter('Supplier.add_supplied_medicine')
+        before = counter.value
+        for i in range(3):
+            Supplier(f"Поставщик {i}", "88001000101").add_supplied_medicine("Аспирин")
+        self.assertEqual(counter.value, before + 3)
+        self.assertIn('method="Supplier.add_supplied_medicine"', metrics.prometheus_text())
+
+    def test_timing_metrics(self):
+        """Тестирование замеров времени в реестре метрик"""
+        histogram = metrics.histogram('Pharmacy.restock_from_supplier')
+        before = histogram.snapshot()['count']
+        self.pharmacy.add_supplier(self.supplier)
+        self.supplier.add_supplied_medicine("Тестовое Лекарство")
+        self.pharmacy.restock_from_supplier(self.supplier, "Тестовое Лекарство", 5)
+        self.assertEqual(histogram.snapshot()['count'], before + 1)
+        self.assertIn('Medicine.set_supplier', metrics.snapshot())
+
+        metrics.disable()
+        try:
+            self.pharmacy.restock_from_supplier(self.supplier, "Тестовое Лекарство", 5)
+        finally:
+            metrics.enable()
+        self.assertEqual(histogram.snapshot()['count'], before + 1)
+
     def test_error_cases(self):
         """Тестирование обработки ошибок"""
         # Попытка добавить неверный тип
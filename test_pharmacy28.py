@@ -7,7 +7,10 @@
 
 import unittest
 import os
-from pharmacy28 import Medicine, Supplier, MedicineDatabase, SupplierDatabase
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+from pharmacy28 import Medicine, Supplier, MedicineDatabase, SupplierDatabase, PharmacyManager
 
 
 class TestPharmacySystem(unittest.TestCase):
@@ -16,7 +19,8 @@ class TestPharmacySystem(unittest.TestCase):
     def setUp(self):
         """Подготовка тестовых данных"""
         # Очищаем файлы перед тестами
-        for filename in ['medicines.pkl', 'suppliers.pkl']:
+        for filename in ['medicines.pkl', 'suppliers.pkl', 'medicines.pkl.wal', 'suppliers.pkl.wal',
+                         'medicines.pkl.lock', 'suppliers.pkl.lock']:
             if os.path.exists(filename):
                 os.remove(filename)
 
@@ -45,6 +49,18 @@ class TestPharmacySystem(unittest.TestCase):
         self.assertTrue(self.med_db.remove("Аспирин"))
         self.assertEqual(len(self.med_db), 0)
 
+    def test_medicine_search(self):
+        """Тестирование поиска лекарств по началу названия"""
+        self.med_db.add(self.medicine)
+        self.med_db.add(Medicine("Аскорбиновая кислота", 30.0, 10, "2026-01-01"))
+        self.assertEqual([m.name for m in self.med_db.search("АС")],
+                         ["Аскорбиновая кислота", "Аспирин"])
+
+        # Индекс восстанавливается при загрузке и обновляется при удалении
+        new_med_db = MedicineDatabase()
+        new_med_db.remove("Аспирин")
+        self.assertEqual([m.name for m in new_med_db.search("ас")], ["Аскорбиновая кислота"])
+
     def test_supplier_container(self):
         """Тестирование контейнера для поставщиков"""
         # Добавление
@@ -92,9 +108,30 @@ class TestPharmacySystem(unittest.TestCase):
         self.assertEqual(new_med_db.get("Аспирин").name, "Аспирин")
         self.assertEqual(new_sup_db.get("Фармакор").name, "Фармакор")
 
+    def test_assign_supplier(self):
+        """Назначение поставщика записывается в обе базы одной группой"""
+        self.med_db.add(self.medicine)
+        self.sup_db.add(self.supplier)
+        manager = PharmacyManager()
+        with mock.patch('builtins.input', side_effect=["Аспирин", "Фармакор"]), \
+                redirect_stdout(StringIO()):
+            manager.assign_supplier()
+
+        self.assertEqual(MedicineDatabase().get("Аспирин").supplier.name, "Фармакор")
+        self.assertEqual(SupplierDatabase().get("Фармакор").supplied_medicines, ["Аспирин"])
+
+    def test_batch(self):
+        """Изменения в batch() сохраняются при выходе из блока"""
+        with self.med_db.batch():
+            self.med_db.add(self.medicine)
+            self.med_db.add(Medicine("Ибупрофен", 80.0, 20, "2026-06-30"))
+            self.assertEqual(len(self.med_db), 2)
+        self.assertEqual(len(MedicineDatabase()), 2)
+
     def tearDown(self):
         """Очистка после тестов"""
-        for filename in ['medicines.pkl', 'suppliers.pkl']:
+        for filename in ['medicines.pkl', 'suppliers.pkl', 'medicines.pkl.wal', 'suppliers.pkl.wal',
+                         'medicines.pkl.lock', 'suppliers.pkl.lock']:
             if os.path.exists(filename):
                 os.remove(filename)
 
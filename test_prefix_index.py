@@ -0,0 +1,44 @@
+"""
+Модуль test_prefix_index содержит тесты для индекса поиска по префиксу
+"""
+
+import unittest
+from prefix_index import PrefixIndex, normalize
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Тесты для PrefixIndex"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        names = ["Аспирин", "Аскорбинка", "Ацикловир", "Ёрш", "Ибупрофен"]
+        self.index = PrefixIndex((name, name.upper()) for name in names)
+
+    def test_normalize(self):
+        """Нормализация убирает регистр и различие ё/е"""
+        self.assertEqual(normalize("ЁЖиК"), "ежик")
+
+    def test_search(self):
+        """Поиск возвращает совпадения по алфавиту, не больше k"""
+        self.assertEqual(self.index.search("ас"), ["АСКОРБИНКА", "АСПИРИН"])
+        self.assertEqual(self.index.search("А", k=2), ["АСКОРБИНКА", "АСПИРИН"])
+        self.assertEqual(self.index.search("ер"), ["ЁРШ"])
+        self.assertEqual(self.index.search("х"), [])
+
+    def test_add_and_remove(self):
+        """Индекс поддерживается при добавлении и удалении"""
+        self.index.add("Аспаркам", "новый")
+        self.assertEqual(self.index.search("асп"), ["новый", "АСПИРИН"])
+        self.assertTrue(self.index.remove("Аспирин"))
+        self.assertFalse(self.index.remove("Аспирин"))
+        self.assertEqual(self.index.search("асп"), ["новый"])
+        self.assertEqual(len(self.index), 5)
+
+    def test_update(self):
+        """Пачка названий добавляется с одной сортировкой"""
+        self.index.update([("Аспаркам", "новый"), ("Аспирин", "замена"), ("Аскорбинка", "еще")])
+        self.assertEqual(self.index.search("ас"), ["еще", "новый", "замена"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Модуль test_snapshot_codec содержит тесты для формата снимков на pickle 5
+"""
+
+import io
+import pickle
+import unittest
+import snapshot_codec
+from compact_medicine import MedicineColumns
+from journal import TransactionJournal
+from pharmacy26 import Medicine, Pharmacy
+
+
+class TestSnapshotCodec(unittest.TestCase):
+    """Тесты для snapshot_codec"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.columns = MedicineColumns()
+        for i in range(100):
+            self.columns.append(f"Лекарство {i}", 10.5 * i, i, "2025-01-01")
+
+    def roundtrip(self, obj, compression=None):
+        buffer = io.BytesIO()
+        snapshot_codec.dump(obj, buffer, compression)
+        buffer.seek(0)
+        return snapshot_codec.load(buffer)
+
+    def test_codecs_roundtrip(self):
+        """Снимок восстанавливается при любом алгоритме сжатия"""
+        for compression in [None, 'zlib', 'lzma', 'bz2']:
+            with self.subTest(compression=compression):
+                loaded = self.roundtrip(self.columns, compression)
+                self.assertEqual(loaded.names, self.columns.names)
+                self.assertEqual(loaded.prices, self.columns.prices)
+                self.assertEqual(loaded.quantities, self.columns.quantities)
+
+    def test_arrays_are_out_of_band(self):
+        """Массивы уходят во внеполосные буферы, а не в основной поток"""
+        buffers = []
+        pickle.dumps(self.columns, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 4)
+
+        journal = TransactionJournal()
+        journal.append('Продажа', 10, 9, 1)
+        loaded = self.roundtrip(journal)
+        self.assertEqual(loaded.view()[0]['new_value'], 9)
+
+    def test_plain_pickle_still_loads(self):
+        """Файлы обычного pickle загружаются"""
+        buffer = io.BytesIO(pickle.dumps({"Аспирин": 1}))
+        self.assertEqual(snapshot_codec.load(buffer), {"Аспирин": 1})
+
+    def test_pharmacy_with_compression(self):
+        """Аптека сохраняется со сжатием и загружается"""
+        pharmacy = Pharmacy("Тестовая Аптека")
+        medicine = Medicine("Ибупрофен", 120, 30)
+        medicine.sell(5)
+        pharmacy.add_medicine(medicine)
+        loaded = self.roundtrip(pharmacy, 'lzma')
+        self.assertEqual(loaded.medicines[0].get_transactions()[0]['amount'], 5)
+
+    def test_unknown_codec(self):
+        """Неизвестный алгоритм сжатия"""
+        with self.assertRaises(ValueError):
+            snapshot_codec.dump(self.columns, io.BytesIO(), 'zip')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Модуль test_sqlite_store содержит тесты для хранилища в файле SQLite
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+import pharmacy28
+from sqlite_store import SqliteStore
+
+
+class TestSqliteStore(unittest.TestCase):
+    """Тесты для SqliteStore"""
+
+    def setUp(self):
+        """Подготовка временного каталога"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'pharmacy.db')
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        self.tmp.cleanup()
+
+    def open(self, table='items'):
+        store = SqliteStore(self.path, table)
+        self.addCleanup(store.close)
+        return store
+
+    def test_mapping(self):
+        """Чтение, замена и удаление; порядок перебора — порядок добавления"""
+        store = self.open()
+        store.put('b', [1])
+        store.put_many([('a', [2]), ('c', [3])])
+        store.put('b', [10])
+        self.assertEqual(store['b'], [10])
+        self.assertIsNone(store.get('x'))
+        self.assertRaises(KeyError, lambda: store['x'])
+        self.assertIn('a', store)
+        self.assertTrue(store.delete('a'))
+        self.assertFalse(store.delete('a'))
+        self.assertEqual(len(store), 2)
+        self.assertEqual(list(store.items()), [('b', [10]), ('c', [3])])
+
+        reopened = self.open()
+        self.assertEqual(list(reopened), ['b', 'c'])
+        self.assertEqual(list(reopened.values()), [[10], [3]])
+
+    def test_streaming(self):
+        """Перебор читает таблицу пачками и не мешает записи"""
+        store = self.open()
+        store.put_many((f'{i:05}', i) for i in range(2000))
+        seen = 0
+        for key, value in store.items():
+            if value % 500 == 0:
+                store.put(f'new-{value}', value)
+            seen += 1
+        self.assertGreaterEqual(seen, 2000)
+        self.assertEqual(len(store), 2004)
+
+    def test_batch(self):
+        """batch() объединяет изменения в одну транзакцию"""
+        store = self.open()
+        with store.batch():
+            store.put('a', 1)
+            with store.batch():
+                store.put('b', 2)
+            self.assertEqual(len(self.open()), 0)  # другое соединение еще не видит изменений
+        self.assertEqual(len(self.open()), 2)
+
+    def test_batch_excludes_other_threads(self):
+        """Запись другого потока ждет конца batch() и не попадает в его транзакцию"""
+        store = self.open()
+        writer = threading.Thread(target=store.put, args=('b', 2))
+        with store.batch():
+            store.put('a', 1)
+            writer.start()
+            writer.join(0.1)
+            self.assertTrue(writer.is_alive())
+            self.assertNotIn('b', store)
+        writer.join()
+        self.assertEqual(dict(self.open().items()), {'a': 1, 'b': 2})
+
+    def test_search(self):
+        """Поиск по началу ключа идет по индексу нормализованных названий"""
+        store = self.open()
+        store.put_many([('Аспирин', 1), ('Аскорбинка', 2), ('Ёрш', 3), ('Ибупрофен', 4)])
+        self.assertEqual(store.search('АС'), [2, 1])
+        self.assertEqual(store.search('ас', k=1), [2])
+        self.assertEqual(store.search('ер'), [3])
+        self.assertEqual(store.search('х'), [])
+
+    def test_tables(self):
+        """Несколько хранилищ в одном файле; имя таблицы проверяется"""
+        self.open('medicines').put('a', 1)
+        self.assertEqual(len(self.open('suppliers')), 0)
+        self.assertRaises(ValueError, SqliteStore, self.path, 'x; DROP TABLE medicines')
+
+    def test_pharmacy28_backend(self):
+        """Базы pharmacy28 работают поверх SQLite"""
+        med_db = pharmacy28.MedicineDatabase(self.open('medicines'))
+        sup_db = pharmacy28.SupplierDatabase(self.open('suppliers'))
+        med_db.add(pharmacy28.Medicine("Аспирин", 50.0, 100, "2025-12-31"))
+        med_db.add_many([pharmacy28.Medicine("Аскорбинка", 30.0, 10, "2026-01-01")])
+        sup_db.add(pharmacy28.Supplier("Фармакор", "88002000600"))
+        with med_db.batch():
+            self.assertTrue(med_db.remove("Аскорбинка"))
+        med_db.save()
+
+        reopened = pharmacy28.MedicineDatabase(self.open('medicines'))
+        self.assertEqual([med.name for med in reopened], ["Аспирин"])
+        self.assertEqual(reopened.get("Аспирин").price, 50.0)
+        self.assertEqual([med.name for med in reopened.search("асп")], ["Аспирин"])
+        self.assertEqual(len(pharmacy28.SupplierDatabase(self.open('suppliers'))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
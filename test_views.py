@@ -0,0 +1,42 @@
+"""
+Модуль test_views содержит тесты для представлений только для чтения
+"""
+
+import unittest
+from views import ListView, ValuesView
+
+
+class TestViews(unittest.TestCase):
+    """Тесты для ListView и ValuesView"""
+
+    def test_list_view(self):
+        """Представление списка видит изменения и не дает изменять список"""
+        items = [1, 2]
+        view = ListView(items)
+        items.append(3)
+        self.assertEqual(view, [1, 2, 3])
+        self.assertEqual(view[-1], 3)
+        self.assertEqual(view[::2], [1, 3])
+        self.assertEqual(list(reversed(view)), [3, 2, 1])
+        self.assertIsNot(view.snapshot(), items)
+        with self.assertRaises(TypeError):
+            view[0] = 0
+
+    def test_values_view(self):
+        """Представление значений словаря как последовательности"""
+        mapping = {key: key * 10 for key in range(7)}
+        view = ValuesView(mapping, key=lambda value: value // 10)
+        self.assertEqual(len(view), 7)
+        self.assertEqual([view[i] for i in range(-7, 7)], list(mapping.values()) * 2)
+        self.assertEqual(view[1:3], [10, 20])
+        self.assertIn(30, view)
+        self.assertNotIn(35, view)
+        with self.assertRaises(IndexError):
+            view[7]
+        del mapping[0]
+        self.assertEqual(view[0], 10)
+        self.assertNotEqual(view, [10])
+
+
+if __name__ == '__main__':
+    unittest.main()
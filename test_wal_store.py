@@ -0,0 +1,211 @@
+"""
+Модуль test_wal_store содержит тесты для хранилища с журналом предзаписи
+"""
+
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import wal_store
+from wal_store import WalStore
+
+
+def _writer_process(path, n):
+    store = WalStore(path, min_compact_bytes=512)
+    for i in range(50):
+        store.put((n, i), i)
+        if i % 10 == 0:
+            with store.batch():
+                store.delete((n, i))
+    store.close()
+
+
+class TestWalStore(unittest.TestCase):
+    """Тесты для WalStore"""
+
+    def setUp(self):
+        """Подготовка временного каталога"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'data.pkl')
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        self.tmp.cleanup()
+
+    def open(self, **kwargs):
+        store = WalStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_replay(self):
+        """Изменения дописываются в журнал и восстанавливаются при открытии"""
+        store = self.open()
+        store.put('a', 1)
+        store.put_many([('b', 2), ('c', 3)])
+        store.put('a', 10)
+        self.assertTrue(store.delete('b'))
+        self.assertFalse(store.delete('b'))
+        self.assertFalse(os.path.exists(self.path))  # снимок еще не писался
+
+        reopened = self.open()
+        self.assertEqual(dict(reopened), {'a': 10, 'c': 3})
+        self.assertEqual(len(reopened), 2)
+        self.assertIn('c', reopened)
+
+    def test_append_is_small(self):
+        """Запись одного изменения не зависит от размера хранилища"""
+        store = self.open(min_compact_bytes=1 << 30)
+        store.put_many((str(i), i) for i in range(1000))
+        before = os.path.getsize(store.log_path)
+        store.put('x', 1)
+        self.assertLess(os.path.getsize(store.log_path) - before, 100)
+
+    def test_compaction(self):
+        """Журнал больше снимка уплотняется в снимок"""
+        store = self.open(min_compact_bytes=0)
+        store.put('a', 1)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(os.path.getsize(store.log_path), 0)
+        store.put('b', 2)
+        store.compact()
+        self.assertEqual(dict(self.open()), {'a': 1, 'b': 2})
+
+    def test_torn_tail(self):
+        """Недописанная последняя запись отбрасывается и обрезается"""
+        store = self.open()
+        store.put('a', 1)
+        store.put('b', 2)
+        store.close()
+        size = os.path.getsize(self.path + '.wal')
+        with open(self.path + '.wal', 'r+b') as f:
+            f.truncate(size - 3)
+
+        reopened = self.open()
+        self.assertEqual(dict(reopened), {'a': 1})
+        reopened.put('c', 3)
+        self.assertEqual(dict(self.open()), {'a': 1, 'c': 3})
+
+    def test_legacy_snapshot(self):
+        """Файл, сохраненный целиком прежним способом, открывается как снимок"""
+        with open(self.path, 'wb') as f:
+            pickle.dump({'a': 1}, f)
+        store = self.open()
+        store.put('b', 2)
+        self.assertEqual(dict(self.open()), {'a': 1, 'b': 2})
+
+    def test_batch(self):
+        """Изменения в batch() видны сразу, а в журнал пишутся одной записью при выходе"""
+        store = self.open()
+        with store.batch():
+            store.put('a', 1)
+            with store.batch():
+                store.put('b', 2)
+                store.delete('a')
+            self.assertEqual(dict(store), {'b': 2})
+            self.assertEqual(os.path.getsize(store.log_path), 0)
+        self.assertEqual(dict(self.open()), {'b': 2})
+
+        # Группа проигрывается целиком или не проигрывается вовсе
+        with store.batch():
+            store.put('c', 3)
+            store.put('d', 4)
+        store.close()
+        with open(self.path + '.wal', 'r+b') as f:
+            f.truncate(os.path.getsize(self.path + '.wal') - 1)
+        self.assertEqual(dict(self.open()), {'b': 2})
+
+    def test_batch_exception(self):
+        """При исключении в блоке сделанные изменения все равно записываются"""
+        store = self.open()
+        with self.assertRaises(KeyError):
+            with store.batch():
+                store.put('a', 1)
+                raise KeyError('a')
+        self.assertEqual(dict(self.open()), {'a': 1})
+
+    def test_group_commit(self):
+        """Одновременные записи потоков сбрасываются на диск общими fsync"""
+        store = self.open()
+        fsync = os.fsync
+        calls = []
+
+        def slow_fsync(fd):
+            calls.append(fd)
+            time.sleep(0.005)
+            fsync(fd)
+
+        def writer(n):
+            for i in range(20):
+                store.put((n, i), i)
+
+        with mock.patch.object(wal_store.os, 'fsync', slow_fsync):
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(self.open()), 160)
+        self.assertLess(len(calls), 160)
+
+    def test_other_writer(self):
+        """Записи другого экземпляра подхватываются при чтении, в том числе после уплотнения"""
+        first, second = self.open(), self.open()
+        first.put('a', 1)
+        self.assertEqual(second.get('a'), 1)
+        self.assertFalse(second.refresh())
+
+        first.compact()
+        first.put('b', 2)
+        self.assertEqual(dict(second), {'a': 1, 'b': 2})
+        second.delete('a')
+        second.compact()
+        self.assertEqual(dict(first), {'b': 2})
+        first.put('c', 3)
+        self.assertEqual(dict(self.open()), {'b': 2, 'c': 3})
+
+    def test_read_while_iterating(self):
+        """Чтение внутри цикла, подхватывающее чужие записи, не ломает итерацию"""
+        first, second = self.open(), self.open()
+        first.put_many((str(i), i) for i in range(3))
+        for method in (iter, WalStore.values, WalStore.items):
+            with self.subTest(method=method.__name__):
+                seen = 0
+                for _ in method(second):
+                    first.put('new%d' % seen, seen)
+                    second.get('0')
+                    second.put('own%d' % seen, seen)
+                    seen += 1
+                self.assertEqual(len(second), len(first))
+
+    @unittest.skipUnless(wal_store.fcntl and 'fork' in multiprocessing.get_all_start_methods(),
+                         "нужны fcntl и fork")
+    def test_processes(self):
+        """Несколько процессов пишут в одно хранилище, не теряя чужих записей"""
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_writer_process, args=(self.path, n)) for n in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        store = self.open()
+        self.assertEqual(len(store), 4 * 45)
+        self.assertEqual(store[(3, 49)], 49)
+        self.assertNotIn((3, 10), store)
+
+    def test_search(self):
+        """Поиск по началу ключа учитывает изменения"""
+        store = self.open()
+        store.put_many([('Аспирин', 1), ('Аскорбинка', 2), ('Ибупрофен', 3)])
+        self.assertEqual(store.search('ас'), [2, 1])
+        store.delete('Аспирин')
+        store.put('Асептолин', 4)
+        self.assertEqual(store.search('ас'), [4, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Модуль views реализует живые представления коллекций только для чтения.
+
+Свойство medicines и метод get_transactions() аптек возвращают такие
+представления вместо копии списка: опрос стоит O(1) памяти, а изменения
+аптеки сразу видны через уже полученное представление. Изменить коллекцию
+через представление нельзя. Если нужна независимая от дальнейших изменений
+копия (например, для перебора с одновременным изменением аптеки), следует
+вызвать snapshot().
+"""
+
+from collections.abc import Sequence
+from itertools import islice
+
+
+class _ReadOnlyView(Sequence):
+    """Общая часть представлений: сравнение со списками, repr и snapshot()"""
+
+    __slots__ = ()
+    __hash__ = None
+
+    def __eq__(self, other):
+        if isinstance(other, (_ReadOnlyView, list, tuple)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.snapshot()!r})"
+
+    def snapshot(self):
+        """Возвращает независимую копию в виде списка"""
+        return list(self)
+
+
+class ListView(_ReadOnlyView):
+    """Живое представление списка только для чтения"""
+
+    __slots__ = ('_items',)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        # Срез возвращает новый список, как у обычного списка
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+
+class ValuesView(_ReadOnlyView):
+    """
+    Живое представление значений словаря как последовательности только для чтения.
+
+    Перебор, len() и доступ к первому и последнему элементу занимают O(1);
+    доступ к элементу по произвольной позиции — O(позиции).
+    Проверка вхождения через key() (если задан) — O(1).
+    """
+
+    __slots__ = ('_mapping', '_key')
+
+    def __init__(self, mapping, key=None):
+        """
+        Args:
+            mapping (dict): Словарь, значения которого представляются
+            key: Функция, возвращающая ключ значения в словаре (для быстрой проверки вхождения)
+        """
+        self._mapping = mapping
+        self._key = key
+
+    def __len__(self):
+        return len(self._mapping)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self._mapping)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Индекс вне диапазона")
+        if index >= size // 2:
+            return next(islice(reversed(self._mapping.values()), size - 1 - index, None))
+        return next(islice(self._mapping.values(), index, None))
+
+    def __iter__(self):
+        return iter(self._mapping.values())
+
+    def __reversed__(self):
+        return reversed(self._mapping.values())
+
+    def __contains__(self, item):
+        if self._key is not None:
+            try:
+                return self._mapping.get(self._key(item)) is item
+            except AttributeError:
+                return False
+        return any(value is item or value == item for value in self._mapping.values())
@@ -0,0 +1,380 @@
+"""
+Модуль wal_store реализует хранилище «ключ -> объект» со снимком и журналом
+предзаписи (write-ahead log).
+
+Каждое изменение дописывается в конец журнала <path>.wal небольшой записью
+(длина, CRC32 и pickle операции), поэтому стоит O(1) ввода-вывода независимо
+от размера хранилища. Когда журнал становится больше снимка, хранилище
+уплотняется: текущее состояние атомарно записывается в снимок <path>
+(формат snapshot_codec), а журнал начинается заново. Так суммарный объем
+записи остается линейным по числу изменений.
+
+Изменения внутри `with store.batch():` применяются в памяти сразу, а в
+журнал пишутся одной записью при выходе из блока (и при сбое проигрываются
+целиком или не проигрываются вовсе). Одновременные записи из разных потоков
+сбрасываются на диск общим fsync (group commit): пока один поток ждет
+fsync, остальные дописывают свои записи, и следующий fsync покрывает их все.
+
+С одними файлами могут работать несколько процессов. Запись идет под
+блокировкой файла <path>.lock: процесс сначала дочитывает чужие записи
+журнала, затем дописывает свою. Снимок и новый журнал при уплотнении
+заменяют прежние атомарным переименованием. Чтение блокировок не берет:
+оно сверяет stat() журнала с прочитанным и, только если другой процесс
+что-то записал, дочитывает новые записи журнала (или перечитывает снимок,
+если журнал заменен уплотнением: оно всегда заменяет журнал вслед за снимком).
+
+При открытии читается снимок и проигрываются записи журнала; недописанная
+последняя запись (после сбоя) отбрасывается и обрезается при следующей
+записи. Снимок — тот же словарь, что раньше сохранялся целиком, поэтому
+прежние файлы открываются без преобразования.
+"""
+
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка между процессами недоступна
+    fcntl = None
+
+from prefix_index import PrefixIndex
+import snapshot_codec
+
+_FRAME = struct.Struct('<II')  # длина записи, CRC32 записи; запись — список операций
+_PUT, _DELETE = 0, 1
+
+
+def _file_id(path):
+    """Версия файла (None, если его нет): другой inode — файл заменен, другие время или размер — изменен"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class WalStore(Mapping):
+    """
+    Хранилище объектов по ключу: чтение из памяти, изменения — в журнал.
+
+    Атрибуты:
+    - path: файл снимка (журнал — path + '.wal', блокировка записи — path + '.lock')
+    - compression: сжатие снимка (None, 'zlib', 'lzma' или 'bz2')
+    - min_compact_bytes: журнал меньше этого размера не уплотняется
+
+    Методы:
+    - put(), put_many(), delete(): изменения с записью в журнал
+    - batch(): контекст, откладывающий запись в журнал до выхода из блока
+    - search(): поиск до k объектов по началу ключа
+    - refresh(): подхват изменений других процессов (чтение вызывает его само)
+    - compact(): запись снимка и очистка журнала
+    - load(): перечитывание снимка и журнала
+    """
+
+    def __init__(self, path, compression=None, min_compact_bytes=1 << 20):
+        """
+        Открывает хранилище, загружая снимок и журнал (если они есть).
+
+        Args:
+            path (str): Файл снимка
+            compression (str): Сжатие снимка
+            min_compact_bytes (int): Наименьший размер журнала для уплотнения
+        """
+        self.path = path
+        self.log_path = path + '.wal'
+        self.compression = compression
+        self.min_compact_bytes = min_compact_bytes
+        self._lock = threading.RLock()
+        self._lock_file = open(path + '.lock', 'ab') if fcntl else None
+        self._write_depth = 0
+        self._log = None
+        self._batch_depth = 0
+        self._pending = []  # операции открытого batch()
+        # Номера записей: дописанных в файл и гарантированно сброшенных на диск
+        self._written = self._synced = 0
+        self._syncing = False
+        self._sync_done = threading.Condition()
+        self.load()
+
+    def __getitem__(self, key):
+        self.refresh()
+        return self._data[key]
+
+    # Итерация идет по копии: чтения внутри цикла вызывают refresh(), а тот
+    # проигрывает чужие записи в тот же словарь
+    def __iter__(self):
+        self.refresh()
+        return iter(list(self._data))
+
+    def __len__(self):
+        self.refresh()
+        return len(self._data)
+
+    def __contains__(self, key):
+        self.refresh()
+        return key in self._data
+
+    def get(self, key, default=None):
+        self.refresh()
+        return self._data.get(key, default)
+
+    def values(self):
+        self.refresh()
+        return list(self._data.values())
+
+    def items(self):
+        self.refresh()
+        return list(self._data.items())
+
+    def load(self):
+        """Загружает снимок и проигрывает журнал"""
+        with self._lock:
+            while True:
+                data, snapshot_id = {}, None
+                try:
+                    f = open(self.path, 'rb')
+                except FileNotFoundError:
+                    pass
+                else:
+                    with f:
+                        stat = os.fstat(f.fileno())
+                        snapshot_id = stat.st_ino, stat.st_mtime_ns, stat.st_size
+                        data = dict(snapshot_codec.load(f))
+                log = open(self.log_path, 'a+b', buffering=0)
+                self._close_log()
+                self._log = log
+                self._log_inode = os.fstat(log.fileno()).st_ino
+                self._data = data
+                self._prefixes = None
+                self._log_size = self._replay(0)
+                # Если снимок заменили, пока его читали, открытый журнал мог быть уже новым
+                if _file_id(self.path) == snapshot_id:
+                    break
+            self._snapshot_size = snapshot_id[2] if snapshot_id else 0
+
+    def _replay(self, offset):
+        """Применяет записи журнала с offset; возвращает смещение конца последней целой записи"""
+        self._log.seek(offset)
+        tail = self._log.read()
+        position = 0
+        while position + _FRAME.size <= len(tail):
+            length, crc = _FRAME.unpack_from(tail, position)
+            start = position + _FRAME.size
+            payload = tail[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break  # запись еще дописывается другим процессом или оборвана сбоем
+            self._apply(pickle.loads(payload))
+            position = start + length
+        return offset + position
+
+    def _changes(self):
+        """Что изменили другие процессы: None — ничего, 'tail' — дописан журнал, 'reload' — журнал заменен"""
+        log = _file_id(self.log_path)
+        if log is None or log[0] != self._log_inode or log[2] < self._log_size:
+            return 'reload'
+        return 'tail' if log[2] > self._log_size else None
+
+    def refresh(self):
+        """
+        Подхватывает изменения, записанные другими процессами.
+
+        Если журнал не менялся, стоит одного вызова stat(). Если журнал только
+        дополнился, читаются лишь новые записи; если журнал заменен (после
+        уплотнения), хранилище загружается заново.
+
+        Returns:
+            bool: Были ли изменения
+        """
+        if self._changes() is None:
+            return False
+        with self._lock:
+            changes = self._changes()
+            if changes == 'reload':
+                self.load()
+            elif changes == 'tail':
+                self._log_size = self._replay(self._log_size)
+            return changes is not None
+
+    @contextmanager
+    def _writing(self):
+        """Блокировка записи: потоков процесса и (через файл блокировки) других процессов"""
+        with self._lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            if fcntl:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._write_depth = 1
+            try:
+                self.refresh()
+                # Под блокировкой другие процессы не пишут: неполная запись в конце оставлена сбоем
+                if os.fstat(self._log.fileno()).st_size > self._log_size:
+                    self._log.truncate(self._log_size)
+                yield
+            finally:
+                self._write_depth = 0
+                if fcntl:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _apply(self, operations):
+        data, prefixes = self._data, self._prefixes
+        for operation, key, value in operations:
+            if operation == _PUT:
+                data[key] = value
+                if prefixes is not None:
+                    prefixes.add(key, value)
+            else:
+                data.pop(key, None)
+                if prefixes is not None:
+                    prefixes.remove(key)
+
+    def put(self, key, value):
+        """Сохраняет объект под ключом key (заменяет прежний)"""
+        self._commit([(_PUT, key, value)])
+
+    def put_many(self, items):
+        """Сохраняет пары (ключ, объект) одной записью в журнал"""
+        self._commit([(_PUT, key, value) for key, value in items])
+
+    def delete(self, key):
+        """Удаляет объект. Возвращает True, если он был в хранилище"""
+        with self._writing():
+            if key not in self._data:
+                return False
+            written = self._append([(_DELETE, key, None)])
+        self._sync(written)
+        return True
+
+    @contextmanager
+    def batch(self):
+        """
+        Контекст группы изменений: запись в журнал и fsync — один раз при выходе.
+
+        Изменения видны в памяти сразу. Блоки можно вкладывать друг в друга:
+        запись делает внешний блок. Открытый блок держит блокировку записи,
+        поэтому изменения других потоков и процессов ждут его окончания.
+        При исключении внутри блока уже сделанные изменения все равно записываются.
+        """
+        written = 0
+        try:
+            with self._writing():
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                    if not self._batch_depth and self._pending:
+                        operations, self._pending = self._pending, []
+                        written = self._write(operations)
+        finally:
+            self._sync(written)
+
+    def _commit(self, operations):
+        with self._lock:
+            if self._batch_depth:
+                # Блокировку записи уже держит открытый batch() этого потока
+                self._append(operations)
+                return
+        with self._writing():
+            written = self._append(operations)
+        self._sync(written)
+
+    def _append(self, operations):
+        """Применяет операции; возвращает номер записи в журнале (0 — отложены до конца batch())"""
+        self._apply(operations)
+        if self._batch_depth:
+            self._pending += operations
+            return 0
+        return self._write(operations)
+
+    def _write(self, operations):
+        # Вызывается под _writing(); только дописывает в файл, fsync делает _sync()
+        payload = pickle.dumps(operations, protocol=5)
+        frame = _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+        self._log.write(frame)
+        self._log_size += len(frame)
+        self._written += 1
+        written = self._written
+        if self._log_size > max(self._snapshot_size, self.min_compact_bytes):
+            self._compact()
+        return written
+
+    def _sync(self, written):
+        """Ждет, пока запись номер written окажется на диске; fsync делает один поток за всех"""
+        with self._sync_done:
+            while self._synced < written:
+                if self._syncing:
+                    self._sync_done.wait()
+                    continue
+                # Этот поток — ведущий: его fsync покрывает все уже дописанные записи
+                self._syncing = True
+                target, log = self._written, self._log
+                self._sync_done.release()
+                try:
+                    os.fsync(log.fileno())
+                finally:
+                    self._sync_done.acquire()
+                    self._syncing = False
+                    self._sync_done.notify_all()
+                self._synced = max(self._synced, target)
+
+    def compact(self):
+        """Атомарно записывает текущее состояние в снимок и начинает журнал заново"""
+        with self._writing():
+            self._compact()
+
+    def _compact(self):
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            snapshot_codec.dump(self._data, f, self.compression)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._snapshot_size = os.path.getsize(self.path)
+
+        # Записи журнала уже вошли в снимок. Новый пустой журнал заменяет прежний
+        # переименованием, и другие процессы видят смену файла; при сбое до замены
+        # прежний журнал проиграется поверх снимка повторно, что не меняет результат
+        tmp = f'{self.log_path}.{os.getpid()}.tmp'
+        log = open(tmp, 'a+b', buffering=0)
+        os.replace(tmp, self.log_path)
+        self._close_log()
+        self._log = log
+        self._log_inode = os.fstat(log.fileno()).st_ino
+        self._log_size = 0
+        with self._sync_done:
+            self._synced = max(self._synced, self._written)
+
+    def search(self, prefix, k=10):
+        """Возвращает до k объектов, ключи которых начинаются с prefix (регистр и ё/е не важны)"""
+        self.refresh()
+        with self._lock:
+            if self._prefixes is None:
+                self._prefixes = PrefixIndex(self._data.items())
+            return self._prefixes.search(prefix, k)
+
+    def _close_log(self):
+        # Дожидаемся fsync, который ведущий поток делает вне self._lock
+        with self._lock, self._sync_done:
+            while self._syncing:
+                self._sync_done.wait()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def close(self):
+        """Закрывает файлы журнала и блокировки"""
+        with self._lock:
+            self._close_log()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None